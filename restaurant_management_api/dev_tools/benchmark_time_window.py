@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-order cost of Clover order date filtering.
+
+Compares the old path (a timezone-converted datetime plus an INFO log line per
+order in CloverService.get_orders, then a datetime comparison per order in
+DashboardService._filter_orders_by_date) against TimeWindow, which computes
+epoch-ms bounds once and filters by integer comparison.
+
+Usage: python dev_tools/benchmark_time_window.py [--orders 100000] [--repeat 5]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytz
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.time_window import TimeWindow
+
+# The old filter logged every included order at INFO; send it nowhere so only formatting cost is measured
+logging.basicConfig(level=logging.INFO, handlers=[logging.NullHandler()])
+
+
+def make_orders(count, start_ms, end_ms):
+    """Synthetic orders spread over a slightly wider range than the window"""
+    span = end_ms - start_ms
+    return [
+        {'id': f'ORDER{i}', 'createdTime': random.randint(start_ms - span // 10, end_ms + span // 10)}
+        for i in range(count)
+    ]
+
+
+def legacy_filter(orders, start_date, end_date):
+    """The two datetime-based passes the orders used to go through"""
+    central = pytz.timezone('America/Chicago')
+    filtered_orders = []
+    for order in orders:
+        order_time_ms = int(order.get('createdTime', 0))
+        order_dt_utc = datetime.utcfromtimestamp(order_time_ms / 1000).replace(tzinfo=pytz.utc)
+        order_dt_central = order_dt_utc.astimezone(central)
+        if start_date <= order_dt_central <= end_date:
+            logging.info(f"Including order {order.get('id')} with local date {order_dt_central.date()} and time {order_dt_central}")
+            filtered_orders.append(order)
+
+    result = []
+    for order in filtered_orders:
+        order_date = datetime.fromtimestamp(order['createdTime'] / 1000, tz=timezone.utc)
+        if start_date and order_date < start_date:
+            continue
+        if end_date and order_date > end_date:
+            continue
+        result.append(order)
+    return result
+
+
+def best_of(repeat, fn):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--orders', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    end = datetime.now(pytz.utc)
+    window = TimeWindow.for_days(end - timedelta(days=90), end)
+    orders = make_orders(args.orders, window.start_ms, window.end_ms)
+
+    legacy_seconds, legacy_result = best_of(args.repeat, lambda: legacy_filter(orders, window.start, window.end))
+    window_seconds, window_result = best_of(args.repeat, lambda: window.filter(orders))
+
+    assert [o['id'] for o in legacy_result] == [o['id'] for o in window_result], "filters disagree"
+
+    print(f"Orders: {args.orders}, kept: {len(window_result)}, best of {args.repeat}")
+    print(f"  legacy datetime filter: {legacy_seconds * 1000:9.1f} ms  ({legacy_seconds / args.orders * 1e6:.2f} us/order)")
+    print(f"  TimeWindow filter:      {window_seconds * 1000:9.1f} ms  ({window_seconds / args.orders * 1e6:.2f} us/order)")
+    print(f"  speedup: {legacy_seconds / window_seconds:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Clover v3 REST API, for benchmarks and load tests.
+
+Serves deterministic synthetic merchants (same seed, same data) over plain HTTP:
+
+    GET /v3/merchants/{mid}
+    GET /v3/merchants/{mid}/orders                   limit/offset, filter=createdTime>=/<=, expand=lineItems
+    GET /v3/merchants/{mid}/orders/{id}
+    GET /v3/merchants/{mid}/orders/{id}/line_items
+    GET /v3/merchants/{mid}/orders/{id}/payments
+    GET /v3/merchants/{mid}/items                    limit/offset, expand=categories
+    GET /v3/merchants/{mid}/categories | employees | customers
+
+Every Nth request (--rate-limit-every) or any request over --max-rps is answered
+with 429, and --latency-ms adds a fixed delay to every response, so client retry
+and pacing behaviour can be exercised without touching api.clover.com.
+
+Point the app at it with CLOVER_API_BASE_URL=http://127.0.0.1:<port> and
+CLOVER_MERCHANT_ID=<one of the served merchant ids>.
+
+Usage: python dev_tools/fake_clover.py [--port 8765] [--merchants FAKEMERCHANT0] [--orders 2000]
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Chef names the dashboard's Clover chef-performance view attributes sales to
+CHEF_NAMES = ["Sarva&Ram", "Savithri", "Wasim", "Chef_miscellanies"]
+CATEGORY_NAMES = ["Appetizers", "Entrees", "Breads", "Desserts", "Beverages", "Sides"]
+
+_FILTER = re.compile(r'^(\w+)(>=|<=|>|<|=)(\d+)$')
+_PATH = re.compile(r'^/v3/merchants/(?P<merchant>[^/]+)(?:/(?P<resource>[^/]+)(?:/(?P<id>[^/]+)(?:/(?P<sub>[^/]+))?)?)?/?$')
+
+
+class FakeMerchant:
+    """Synthetic catalogue and order history for one merchant"""
+
+    def __init__(self, merchant_id, orders=2000, line_items=3, items=200, employees=8, customers=50,
+                 days=30, seed=0, end_ms=None):
+        rng = random.Random(f"{seed}:{merchant_id}")
+        self.merchant_id = merchant_id
+        end_ms = end_ms or int(time.time() * 1000)
+        start_ms = end_ms - days * 24 * 3600 * 1000
+
+        self.categories = [
+            {'id': f'CAT{merchant_id[-4:]}{i:04d}', 'name': name, 'sortOrder': i}
+            for i, name in enumerate(CATEGORY_NAMES)
+        ]
+        self.items = []
+        for i in range(items):
+            category = self.categories[i % len(self.categories)]
+            self.items.append({
+                'id': f'ITM{merchant_id[-4:]}{i:06d}',
+                'name': f'Item {i:04d}',
+                'price': rng.randrange(299, 2999),
+                'priceType': 'FIXED',
+                'stockCount': rng.randrange(0, 200),
+                'reorderPoint': 10,
+                'hidden': False,
+                'categories': {'elements': [{'id': category['id'], 'name': category['name']}]}
+            })
+        self.employees = [
+            {'id': f'EMP{merchant_id[-4:]}{i:04d}', 'name': CHEF_NAMES[i] if i < len(CHEF_NAMES) else f'Employee {i}',
+             'role': 'EMPLOYEE'}
+            for i in range(employees)
+        ]
+        self.customers = [
+            {'id': f'CUS{merchant_id[-4:]}{i:06d}', 'firstName': f'First{i}', 'lastName': f'Last{i}'}
+            for i in range(customers)
+        ]
+
+        self.orders = []
+        self.line_items = {}
+        for i in range(orders):
+            order_id = f'ORD{merchant_id[-4:]}{i:08d}'
+            employee = rng.choice(self.employees)
+            elements = []
+            for j in range(line_items):
+                item = rng.choice(self.items)
+                quantity = rng.randint(1, 3)
+                elements.append({
+                    'id': f'LI{i:08d}{j:03d}',
+                    'name': item['name'],
+                    'price': item['price'],
+                    'quantity': quantity,
+                    'total': item['price'] * quantity,
+                    'item': {'id': item['id'], 'name': item['name'], 'categories': item['categories']}
+                })
+            self.line_items[order_id] = elements
+            self.orders.append({
+                'id': order_id,
+                'createdTime': rng.randrange(start_ms, end_ms),
+                'total': sum(li['total'] for li in elements),
+                'state': 'locked',
+                'paymentState': 'PAID',
+                'employee': {'id': employee['id'], 'name': employee['name']},
+                'device': {'id': 'DEVICE0001'},
+                'note': ''
+            })
+        # Clover returns orders newest first
+        self.orders.sort(key=lambda o: o['createdTime'], reverse=True)
+        self._orders_by_id = {o['id']: o for o in self.orders}
+
+    def merchant_info(self):
+        return {'id': self.merchant_id, 'name': f'Fake Merchant {self.merchant_id}', 'currency': 'USD'}
+
+    def find_orders(self, filters, expands):
+        orders = self.orders
+        for field, op, value in filters:
+            orders = [o for o in orders if _compare(o.get(field, 0), op, value)]
+        if 'lineItems' in expands or any(e.startswith('lineItems.') for e in expands):
+            orders = [dict(o, lineItems={'elements': self.line_items[o['id']]}) for o in orders]
+        return orders
+
+    def order(self, order_id):
+        return self._orders_by_id.get(order_id)
+
+    def payments(self, order_id):
+        order = self._orders_by_id[order_id]
+        return [{'id': f'PAY{order_id[3:]}', 'amount': order['total'], 'result': 'SUCCESS'}]
+
+
+def _compare(left, op, right):
+    if op == '>=':
+        return left >= right
+    if op == '<=':
+        return left <= right
+    if op == '>':
+        return left > right
+    if op == '<':
+        return left < right
+    return left == right
+
+
+class FakeCloverServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the merchants and the 429/latency knobs"""
+
+    daemon_threads = True
+
+    def __init__(self, address, merchants, rate_limit_every=0, max_rps=0, latency_ms=0):
+        super().__init__(address, FakeCloverHandler)
+        self.merchants = {m.merchant_id: m for m in merchants}
+        self.rate_limit_every = rate_limit_every
+        self.max_rps = max_rps
+        self.latency = latency_ms / 1000
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self.request_count = 0
+        self.rate_limited_count = 0
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def should_rate_limit(self):
+        with self._lock:
+            self.request_count += 1
+            limited = bool(self.rate_limit_every) and self.request_count % self.rate_limit_every == 0
+            if self.max_rps:
+                now = time.monotonic()
+                if now - self._window_start >= 1:
+                    self._window_start = now
+                    self._window_count = 0
+                self._window_count += 1
+                limited = limited or self._window_count > self.max_rps
+            if limited:
+                self.rate_limited_count += 1
+            return limited
+
+    def start_background(self):
+        """Serve from a daemon thread; returns the thread"""
+        thread = threading.Thread(target=self.serve_forever, name='fake-clover', daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self):
+        return {'requests': self.request_count, 'rate_limited': self.rate_limited_count}
+
+
+class FakeCloverHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this, keep-alive clients wait on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.should_rate_limit():
+            return self._send(429, {'message': 'Too Many Requests'})
+
+        parts = urlsplit(self.path)
+        match = _PATH.match(parts.path)
+        if not match:
+            return self._send(404, {'message': 'Not Found'})
+        merchant = self.server.merchants.get(match['merchant'])
+        if merchant is None:
+            return self._send(401, {'message': 'Unauthorized'})
+
+        query = parse_qs(parts.query)
+        resource, object_id, sub = match['resource'], match['id'], match['sub']
+        if resource is None:
+            return self._send(200, merchant.merchant_info())
+        if resource == 'orders' and object_id:
+            order = merchant.order(object_id)
+            if order is None:
+                return self._send(404, {'message': 'Not Found'})
+            if sub == 'line_items':
+                return self._send(200, {'elements': merchant.line_items[object_id]})
+            if sub == 'payments':
+                return self._send(200, {'elements': merchant.payments(object_id)})
+            return self._send(200, order)
+        if resource == 'orders':
+            filters = []
+            for expression in query.get('filter', []):
+                filter_match = _FILTER.match(expression.replace(' ', ''))
+                if filter_match:
+                    field, op, value = filter_match.groups()
+                    filters.append((field, op, int(value)))
+            elements = merchant.find_orders(filters, set(query.get('expand', [])))
+        elif resource == 'items':
+            elements = merchant.items
+        elif resource == 'categories':
+            elements = merchant.categories
+        elif resource == 'employees':
+            elements = merchant.employees
+        elif resource == 'customers':
+            elements = merchant.customers
+        else:
+            return self._send(404, {'message': 'Not Found'})
+
+        offset = int(query.get('offset', ['0'])[0])
+        limit = min(int(query.get('limit', ['100'])[0]), 1000)
+        return self._send(200, {'elements': elements[offset:offset + limit]})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if status == 429:
+            self.send_header('Retry-After', '1')
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def build_server(merchant_ids=('FAKEMERCHANT0',), host='127.0.0.1', port=0, orders=2000, line_items=3,
+                 items=200, days=30, seed=0, rate_limit_every=0, max_rps=0, latency_ms=0):
+    """Build (but do not start) a server; port 0 picks a free port"""
+    merchants = [
+        FakeMerchant(merchant_id, orders=orders, line_items=line_items, items=items, days=days, seed=seed)
+        for merchant_id in merchant_ids
+    ]
+    return FakeCloverServer((host, port), merchants, rate_limit_every=rate_limit_every,
+                            max_rps=max_rps, latency_ms=latency_ms)
+
+
+def add_data_arguments(parser):
+    """Dataset and 429 options shared by the fake server and the benchmark runner"""
+    parser.add_argument('--orders', type=int, default=2000, help='orders per merchant')
+    parser.add_argument('--line-items', type=int, default=3, help='line items per order')
+    parser.add_argument('--items', type=int, default=200, help='catalogue items per merchant')
+    parser.add_argument('--days', type=int, default=30, help='orders are spread over the last N days')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rate-limit-every', type=int, default=0, help='answer every Nth request with 429')
+    parser.add_argument('--max-rps', type=int, default=0, help='answer requests over this rate with 429')
+    parser.add_argument('--latency-ms', type=float, default=0, help='added delay per response')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--merchants', default='FAKEMERCHANT0', help='comma-separated merchant ids')
+    add_data_arguments(parser)
+    args = parser.parse_args()
+
+    server = build_server(
+        merchant_ids=[m.strip() for m in args.merchants.split(',') if m.strip()],
+        host=args.host, port=args.port, orders=args.orders, line_items=args.line_items, items=args.items,
+        days=args.days, seed=args.seed, rate_limit_every=args.rate_limit_every, max_rps=args.max_rps,
+        latency_ms=args.latency_ms
+    )
+    print(f"Fake Clover API on {server.base_url} serving {', '.join(server.merchants)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
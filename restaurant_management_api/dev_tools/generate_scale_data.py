@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+Fill a database with realistic multi-tenant volume for index, rollup and query-plan work.
+
+Creates N tenants, each with a tenant admin and staff users, a menu of items, chefs, chef-dish
+mappings, monthly expenses and years of sales with weekly and yearly seasonality,
+a lunch/dinner daily curve, skewed item popularity and tenants of different sizes.
+Rows are generated in batches and written with bulk inserts: COPY on Postgres,
+executemany in large transactions on SQLite. Everything is deterministic for a
+given --seed.
+
+With --export-dir it also writes Clover-format upload files for the first
+--export-tenants tenants (the same rows that went into the database):
+
+    LineItemsExport-<tenant>.csv        sales, as the Clover line items export (for /api/upload/sales)
+    inventory-<tenant>.xlsx             'Items' sheet (for /api/upload/inventory)
+    chef-mapping-<tenant>.xlsx          Chef Name / Item Name / Clover ID (for /api/upload/chef-mapping)
+    expenses-<tenant>.xlsx              Date / Amount / Category / Vendor / Invoice (for /api/upload/expenses)
+
+Usage:
+    python dev_tools/generate_scale_data.py --database-url postgresql://localhost/plateiq_scale \\
+        --tenants 200 --years 3 --orders-per-day 150
+    python dev_tools/generate_scale_data.py --database-url sqlite:///scale.db --tenants 5 --years 1 \\
+        --export-dir /tmp/scale-files
+    python dev_tools/generate_scale_data.py --skip-db --tenants 1 --export-dir /tmp/scale-files
+    python dev_tools/generate_scale_data.py --database-url ... --reset        # remove a previous run first
+
+Generated tenants are identified by --prefix (contact emails <prefix>-<n>@example.test);
+tenant admins log in as <prefix>_admin_<n> and staff as <prefix>_user_<n>_<k>, all
+with --password (dev_tools/load_test.py uses these accounts).
+"""
+
+import argparse
+import csv
+import io
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, delete, event, select, text
+from werkzeug.security import generate_password_hash
+
+from src.models import db, Chef, ChefDishMapping, Expense, Item, Sale, Tenant, User
+
+CATEGORIES = {
+    'Appetizers': (5, 12), 'Entrees': (14, 32), 'Breads': (3, 6), 'Biryani': (15, 24),
+    'Desserts': (5, 10), 'Beverages': (2, 7), 'Sides': (3, 8), 'Specials': (18, 40),
+}
+CHEF_NAMES = ["Sarva&Ram", "Savithri", "Wasim", "Chef_miscellanies", "Anita", "Marco", "Lena", "Tomas"]
+EXPENSE_CATEGORIES = {
+    'Food': (0.30, ['Sysco', 'Restaurant Depot', 'Local Farms Co']),
+    'Labor': (0.28, ['Payroll']),
+    'Rent': (0.08, ['Landlord LLC']),
+    'Utilities': (0.04, ['City Power', 'Gas Co', 'Water Dept']),
+    'Supplies': (0.03, ['Uline', 'WebstaurantStore']),
+    'Marketing': (0.02, ['Yelp', 'Google Ads']),
+}
+# Mon..Sun order volume relative to the weekly mean
+WEEKDAY_FACTOR = (0.80, 0.85, 0.90, 1.00, 1.30, 1.45, 1.10)
+# Orders per hour of the business day: lunch and dinner peaks
+HOUR_WEIGHTS = {11: 6, 12: 10, 13: 8, 14: 4, 15: 2, 16: 3, 17: 6, 18: 10, 19: 11, 20: 8, 21: 4, 22: 2}
+TAX_RATE = 0.0825
+SALE_COLUMNS = ('clover_id', 'item_id', 'line_item_date', 'order_employee_id', 'order_employee_name', 'order_id',
+                'quantity', 'item_revenue', 'modifiers_revenue', 'total_revenue', 'discounts', 'tax_amount',
+                'item_total_with_tax', 'payment_state', 'created_at', 'updated_at', 'tenant_id')
+CLOVER_LINE_ITEM_COLUMNS = ('Line Item Date', 'Order Employee ID', 'Order Employee Name', 'Order ID',
+                            'Order Payment State', 'Item Name', 'Item SKU', 'Per Unit Quantity', 'Item Revenue',
+                            'Modifiers Revenue', 'Total Revenue', 'Discounts', 'Tax Amount', 'Item Total with Tax',
+                            'Currency')
+
+
+class BulkLoader:
+    """Batched inserts: COPY on Postgres (psycopg2), DB-API executemany on SQLite, Core executemany elsewhere"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.method = 'executemany'
+        if engine.dialect.name == 'postgresql' and engine.dialect.driver == 'psycopg2':
+            self.method = 'copy'
+        elif engine.dialect.name == 'sqlite':
+            self.method = 'dbapi'
+        self.rows_written = 0
+
+    def insert(self, table, rows, columns=None):
+        if not rows:
+            return
+        columns = columns or tuple(rows[0].keys())
+        if self.method == 'executemany':
+            if len(rows[0]) != len(columns):
+                rows = [{column: row[column] for column in columns} for row in rows]
+            with self.engine.begin() as connection:
+                connection.execute(table.insert(), rows)
+        else:
+            # Raw driver calls skip SQLAlchemy's per-row parameter processing, which dominates at this volume
+            connection = self.engine.raw_connection()
+            try:
+                cursor = connection.cursor()
+                if self.method == 'copy':
+                    buffer = io.StringIO()
+                    writer = csv.writer(buffer)
+                    for row in rows:
+                        writer.writerow([_copy_value(row.get(column)) for column in columns])
+                    buffer.seek(0)
+                    cursor.copy_expert(f'COPY "{table.name}" ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)', buffer)
+                else:
+                    cursor.executemany(
+                        f'INSERT INTO "{table.name}" ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})',
+                        [tuple(_sqlite_value(row.get(column)) for column in columns) for row in rows]
+                    )
+                cursor.close()
+                connection.commit()
+            finally:
+                connection.close()
+        self.rows_written += len(rows)
+
+
+def _copy_value(value):
+    # An unquoted empty field is NULL in COPY's csv format
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return value
+
+
+def _sqlite_value(value):
+    # Same text form SQLAlchemy's SQLite DateTime type stores and parses
+    if isinstance(value, datetime):
+        return str(value)
+    return value
+
+
+def make_engine(database_url):
+    if database_url.startswith('postgres://'):
+        database_url = database_url.replace('postgres://', 'postgresql://', 1)
+    engine = create_engine(database_url)
+    if engine.dialect.name == 'sqlite':
+        @event.listens_for(engine, 'connect')
+        def fast_sqlite(dbapi_connection, connection_record):
+            # Load-only settings: a crash mid-run can corrupt the file, which is fine for generated data
+            cursor = dbapi_connection.cursor()
+            cursor.execute('PRAGMA journal_mode=MEMORY')
+            cursor.execute('PRAGMA synchronous=OFF')
+            cursor.execute('PRAGMA cache_size=-200000')
+            cursor.close()
+    return engine
+
+
+def reset(engine, prefix):
+    """Delete every row belonging to tenants from a previous run with this prefix"""
+    tenants = Tenant.__table__
+    generated = tenants.c.contact_email.like(f"{prefix}-%@example.test")
+    with engine.begin() as connection:
+        for model in (Sale, ChefDishMapping, Expense, Chef, Item, User):
+            table = model.__table__
+            deleted = connection.execute(
+                delete(table).where(table.c.tenant_id.in_(select(tenants.c.id).where(generated)))
+            ).rowcount
+            print(f"  deleted {deleted} rows from {table.name}")
+        deleted = connection.execute(delete(tenants).where(generated)).rowcount
+        print(f"  deleted {deleted} tenants")
+
+
+class TenantGenerator:
+    """Deterministic catalogue, staff, expenses and sales for one tenant"""
+
+    def __init__(self, index, args, start_day, end_day):
+        self.index = index
+        self.args = args
+        self.rng = random.Random(f"{args.seed}:{index}")
+        self.start_day = start_day
+        self.end_day = end_day
+        self.tenant_id = str(uuid.UUID(int=random.Random(f"{args.prefix}:{index}").getrandbits(128)))
+        self.code = f"{args.prefix[:6].upper()}{index:05d}"
+        # Tenants differ in size: a lognormal multiplier around the median restaurant
+        self.size = min(max(self.rng.lognormvariate(0, 0.6), 0.2), 6.0)
+
+    def tenant_row(self, now):
+        return {
+            'id': self.tenant_id, 'name': f"Scale Test Kitchen {self.index}", 'business_type': 'restaurant',
+            'contact_email': f"{self.args.prefix}-{self.index}@example.test", 'country': 'US',
+            'city': 'Chicago', 'state': 'IL', 'subscription_plan': 'premium', 'subscription_status': 'active',
+            'billing_cycle': 'monthly', 'api_calls_this_month': 0, 'storage_used_mb': 0.0, 'max_users': 10,
+            'timezone': 'America/Chicago', 'currency': 'USD', 'language': 'en', 'primary_color': '#3B82F6',
+            'is_active': True, 'is_trial': False, 'created_at': now, 'updated_at': now,
+        }
+
+    def user_rows(self, password_hash, now):
+        """The tenant admin plus --staff-per-tenant regular users"""
+        prefix = self.args.prefix
+        rows = [{
+            'username': f"{prefix}_admin_{self.index}", 'password': password_hash,
+            'email': f"{prefix}-admin-{self.index}@example.test", 'role': 'admin', 'is_admin': True,
+            'tenant_id': self.tenant_id, 'created_at': now, 'updated_at': now,
+        }]
+        for staff in range(self.args.staff_per_tenant):
+            rows.append({
+                'username': f"{prefix}_user_{self.index}_{staff}", 'password': password_hash,
+                'email': f"{prefix}-user-{self.index}-{staff}@example.test", 'role': 'user', 'is_admin': False,
+                'tenant_id': self.tenant_id, 'created_at': now, 'updated_at': now,
+            })
+        return rows
+
+    def item_rows(self, now):
+        rows = []
+        categories = list(CATEGORIES)
+        for i in range(self.args.items):
+            category = categories[i % len(categories)]
+            low, high = CATEGORIES[category]
+            price = round(self.rng.uniform(low, high), 2)
+            rows.append({
+                'clover_id': f"{self.code}I{i:05d}", 'name': f"{category[:-1] if category.endswith('s') else category} {i:04d}",
+                'price': price, 'cost': round(price * self.rng.uniform(0.25, 0.4), 2), 'sku': f"SKU{i:05d}",
+                'quantity': self.rng.randrange(0, 200), 'reorder_point': 10, 'is_hidden': False,
+                'default_tax_rates': True, 'non_revenue_item': False, 'category': category, 'is_active': True,
+                'created_at': now, 'updated_at': now, 'tenant_id': self.tenant_id,
+            })
+        return rows
+
+    def chef_rows(self, now):
+        return [
+            {'clover_id': f"{self.code}C{i:03d}", 'name': CHEF_NAMES[i % len(CHEF_NAMES)], 'is_active': True,
+             'tenant_id': self.tenant_id, 'created_at': now, 'updated_at': now}
+            for i in range(self.args.chefs)
+        ]
+
+    def mapping_rows(self, items, chefs, now):
+        # Each chef owns a contiguous slice of the menu, like a station
+        return [
+            {'chef_id': chefs[i * len(chefs) // len(items)]['id'], 'item_id': item['id'], 'clover_id': item['clover_id'],
+             'item_name': item['name'], 'is_active': True, 'tenant_id': self.tenant_id, 'created_at': now,
+             'updated_at': now}
+            for i, item in enumerate(items)
+        ]
+
+    def expense_rows(self, now):
+        monthly_revenue = self.args.orders_per_day * self.size * 30 * 35
+        rows = []
+        month = date(self.start_day.year, self.start_day.month, 1)
+        invoice = 0
+        while month <= self.end_day:
+            for category, (share, vendors) in EXPENSE_CATEGORIES.items():
+                per_month = max(1, self.args.expenses_per_month // len(EXPENSE_CATEGORIES))
+                for _ in range(per_month):
+                    invoice += 1
+                    day = month + timedelta(days=self.rng.randrange(28))
+                    vendor = self.rng.choice(vendors)
+                    rows.append({
+                        'description': f"{category} - {vendor}", 'vendor': vendor, 'category': category,
+                        'amount': round(monthly_revenue * share / per_month * self.rng.uniform(0.8, 1.2), 2),
+                        'date': datetime.combine(day, datetime.min.time()), 'invoice': f"INV{self.index:05d}{invoice:06d}",
+                        'is_active': True, 'tenant_id': self.tenant_id, 'created_at': now, 'updated_at': now,
+                    })
+            month = (month + timedelta(days=32)).replace(day=1)
+        return rows
+
+    def orders_on(self, day):
+        """Number of orders for a day: weekday, yearly season, December bump and growth over the range"""
+        season = 1 + 0.15 * math.sin(2 * math.pi * (day.timetuple().tm_yday - 80) / 365.25)
+        if day.month == 12 and day.day >= 15:
+            season *= 1.25
+        years_in = (day - self.start_day).days / 365.25
+        mean = self.args.orders_per_day * self.size * WEEKDAY_FACTOR[day.weekday()] * season * (1.08 ** years_in)
+        return max(0, int(self.rng.gauss(mean, math.sqrt(mean))))
+
+    def sales(self, items, chefs, now):
+        """Yield sale rows day by day; line items per order and item popularity are skewed like real menus"""
+        rng = self.rng
+        hours = list(HOUR_WEIGHTS)
+        hour_weights = list(HOUR_WEIGHTS.values())
+        # Zipf-like popularity: a few best sellers, a long tail
+        popularity = [1 / (rank + 1) ** 0.9 for rank in range(len(items))]
+        rng.shuffle(popularity)
+        cumulative = []
+        total = 0
+        for weight in popularity:
+            total += weight
+            cumulative.append(total)
+        employees = [(chef['clover_id'], chef['name']) for chef in chefs]
+        sequence = 0
+        day = self.start_day
+        while day <= self.end_day:
+            for order_number in range(self.orders_on(day)):
+                order_id = f"{self.code}O{day:%y%m%d}{order_number:05d}"
+                when = datetime(day.year, day.month, day.day, rng.choices(hours, hour_weights)[0], rng.randrange(60),
+                                rng.randrange(60))
+                employee_id, employee_name = rng.choice(employees)
+                for item in rng.choices(items, cum_weights=cumulative, k=rng.choices((1, 2, 3, 4, 5), (30, 30, 20, 12, 8))[0]):
+                    sequence += 1
+                    quantity = rng.choices((1, 2, 3), (80, 15, 5))[0]
+                    revenue = round(item['price'] * quantity, 2)
+                    discount = round(revenue * 0.1, 2) if rng.random() < 0.05 else 0.0
+                    tax = round((revenue - discount) * TAX_RATE, 2)
+                    yield {
+                        'clover_id': f"{self.code}S{sequence:011d}", 'item_id': item['id'], 'line_item_date': when,
+                        'order_employee_id': employee_id, 'order_employee_name': employee_name, 'order_id': order_id,
+                        'quantity': quantity, 'item_revenue': item['price'], 'modifiers_revenue': 0.0,
+                        'total_revenue': revenue - discount, 'discounts': discount, 'tax_amount': tax,
+                        'item_total_with_tax': round(revenue - discount + tax, 2), 'payment_state': 'PAID',
+                        'created_at': now, 'updated_at': now, 'tenant_id': self.tenant_id,
+                        '_item': item,
+                    }
+            day += timedelta(days=1)
+
+
+class CloverExport:
+    """Clover-format upload files for one tenant"""
+
+    def __init__(self, directory, generator):
+        self.directory = directory
+        self.code = generator.code
+        os.makedirs(directory, exist_ok=True)
+        self._sales_file = open(os.path.join(directory, f"LineItemsExport-{self.code}.csv"), 'w', newline='')
+        self._sales = csv.writer(self._sales_file)
+        self._sales.writerow(CLOVER_LINE_ITEM_COLUMNS)
+
+    def sale(self, row):
+        item = row['_item']
+        self._sales.writerow((
+            row['line_item_date'].strftime('%d-%b-%Y %I:%M %p CDT'), row['order_employee_id'],
+            row['order_employee_name'], row['order_id'], 'Paid', item['name'], item['sku'], row['quantity'],
+            row['item_revenue'], row['modifiers_revenue'], row['total_revenue'], row['discounts'], row['tax_amount'],
+            row['item_total_with_tax'], 'USD'
+        ))
+
+    def catalogue(self, items, chefs_by_id, mappings, expenses):
+        import pandas as pd
+        pd.DataFrame({
+            'Clover ID': [i['clover_id'] for i in items], 'Name': [i['name'] for i in items],
+            'Price': [i['price'] for i in items], 'Cost': [i['cost'] for i in items], 'SKU': [i['sku'] for i in items],
+            'Quantity': [i['quantity'] for i in items], 'Categories': [i['category'] for i in items],
+        }).to_excel(os.path.join(self.directory, f"inventory-{self.code}.xlsx"), sheet_name='Items', index=False)
+        pd.DataFrame({
+            'Chef Name': [chefs_by_id[m['chef_id']] for m in mappings], 'Item Name': [m['item_name'] for m in mappings],
+            'Clover ID': [m['clover_id'] for m in mappings],
+        }).to_excel(os.path.join(self.directory, f"chef-mapping-{self.code}.xlsx"), index=False)
+        pd.DataFrame({
+            'Date': [e['date'].date() for e in expenses], 'Amount': [e['amount'] for e in expenses],
+            'Category': [e['category'] for e in expenses], 'Vendor': [e['vendor'] for e in expenses],
+            'Invoice': [e['invoice'] for e in expenses], 'Description': [e['description'] for e in expenses],
+        }).to_excel(os.path.join(self.directory, f"expenses-{self.code}.xlsx"), index=False)
+
+    def close(self):
+        self._sales_file.close()
+
+
+def assign_ids(loader, table, rows, key='clover_id'):
+    """Insert rows and read back their generated primary keys by a unique key"""
+    if loader is None:
+        for position, row in enumerate(rows, 1):
+            row['id'] = position
+        return rows
+    loader.insert(table, rows)
+    keys = [row[key] for row in rows]
+    ids = {}
+    with loader.engine.connect() as connection:
+        for start in range(0, len(keys), 1000):
+            chunk = keys[start:start + 1000]
+            ids.update(connection.execute(
+                table.select().with_only_columns(table.c[key], table.c.id).where(table.c[key].in_(chunk))
+            ).all())
+    for row in rows:
+        row['id'] = ids[row[key]]
+    return rows
+
+
+def generate_tenant(generator, loader, args, password_hash, export_dir):
+    now = datetime.utcnow()
+    counts = {}
+    if loader:
+        loader.insert(Tenant.__table__, [generator.tenant_row(now)])
+        loader.insert(User.__table__, generator.user_rows(password_hash, now))
+    items = assign_ids(loader, Item.__table__, generator.item_rows(now))
+    chefs = assign_ids(loader, Chef.__table__, generator.chef_rows(now))
+    mappings = generator.mapping_rows(items, chefs, now)
+    expenses = generator.expense_rows(now)
+    if loader:
+        loader.insert(ChefDishMapping.__table__, mappings)
+        loader.insert(Expense.__table__, expenses)
+    counts.update(items=len(items), chefs=len(chefs), mappings=len(mappings), expenses=len(expenses))
+
+    export = CloverExport(export_dir, generator) if export_dir else None
+    batch = []
+    sales = 0
+    for row in generator.sales(items, chefs, now):
+        sales += 1
+        if export:
+            export.sale(row)
+        if loader:
+            batch.append(row)
+            if len(batch) >= args.batch_size:
+                loader.insert(Sale.__table__, batch, columns=SALE_COLUMNS)
+                batch = []
+    if loader:
+        loader.insert(Sale.__table__, batch, columns=SALE_COLUMNS)
+    if export:
+        export.catalogue(items, {chef['id']: chef['name'] for chef in chefs}, mappings, expenses)
+        export.close()
+    counts['sales'] = sales
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', default=os.environ.get('DATABASE_URL'))
+    parser.add_argument('--tenants', type=int, default=10)
+    parser.add_argument('--years', type=float, default=2)
+    parser.add_argument('--orders-per-day', type=float, default=120, help='mean daily orders of a median-sized tenant')
+    parser.add_argument('--items', type=int, default=120, help='menu items per tenant')
+    parser.add_argument('--chefs', type=int, default=4, help='chefs per tenant')
+    parser.add_argument('--expenses-per-month', type=int, default=24)
+    parser.add_argument('--end-date', type=lambda s: datetime.strptime(s, '%Y-%m-%d').date(), default=date.today())
+    parser.add_argument('--batch-size', type=int, default=20000, help='sale rows per bulk insert')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--prefix', default='scale', help='marks generated tenants; used by --reset')
+    parser.add_argument('--staff-per-tenant', type=int, default=2, help='regular (role user) accounts per tenant')
+    parser.add_argument('--password', default='scale-test', help='password for every generated account')
+    parser.add_argument('--reset', action='store_true', help='delete tenants from a previous run with this prefix first')
+    parser.add_argument('--skip-db', action='store_true', help='only write the export files')
+    parser.add_argument('--export-dir', help='write Clover-format upload files here')
+    parser.add_argument('--export-tenants', type=int, default=1, help='how many tenants get export files')
+    args = parser.parse_args()
+
+    if not args.skip_db and not args.database_url:
+        parser.error('--database-url (or DATABASE_URL) is required unless --skip-db is given')
+    if args.skip_db and not args.export_dir:
+        parser.error('--skip-db needs --export-dir')
+
+    end_day = args.end_date
+    start_day = end_day - timedelta(days=int(args.years * 365))
+    estimate = int(args.tenants * args.orders_per_day * 2.3 * (end_day - start_day).days)
+    print(f"Generating {args.tenants} tenants, {start_day} to {end_day}: roughly {estimate:,} sale rows")
+
+    loader = None
+    if not args.skip_db:
+        engine = make_engine(args.database_url)
+        db.metadata.create_all(engine)
+        if args.reset:
+            reset(engine, args.prefix)
+        loader = BulkLoader(engine)
+        print(f"Writing to {engine.url.render_as_string(hide_password=True)} using "
+              f"{loader.method}")
+
+    password_hash = generate_password_hash(args.password)
+    started = time.perf_counter()
+    totals = {}
+    for index in range(args.tenants):
+        generator = TenantGenerator(index, args, start_day, end_day)
+        export_dir = args.export_dir if args.export_dir and index < args.export_tenants else None
+        counts = generate_tenant(generator, loader, args, password_hash, export_dir)
+        for key, value in counts.items():
+            totals[key] = totals.get(key, 0) + value
+        elapsed = time.perf_counter() - started
+        print(f"  tenant {index + 1}/{args.tenants} {generator.code}: {counts['sales']:,} sales "
+              f"(total {totals['sales']:,}, {totals['sales'] / elapsed:,.0f} rows/s)")
+
+    if loader:
+        # Fresh statistics so query plans reflect the new volume
+        with loader.engine.begin() as connection:
+            connection.execute(text('ANALYZE'))
+    elapsed = time.perf_counter() - started
+    print(f"Done in {elapsed:.1f}s: " + ', '.join(f"{value:,} {key}" for key, value in totals.items()))
+    if args.export_dir:
+        print(f"Clover-format files in {args.export_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""
+Load-test scenarios for dev_tools/load_test.py, written in the Locust style.
+
+A scenario is one kind of user: the role it logs in as, how often it appears
+relative to the others (`weight`), how long it thinks between actions
+(`wait_time`, seconds) and a set of @task methods picked by weight. Tasks call
+self.client.get/post with a `name` so URLs with varying query strings are
+grouped under one endpoint in the report.
+
+Traffic mix (per 10 users): 6 dashboard viewers, 2 tenant admins, 2 AI analysts.
+"""
+
+import io
+import random
+import uuid
+from datetime import date, timedelta
+
+
+def task(weight=1):
+    """Mark a scenario method as a task picked with relative `weight`"""
+    def mark(fn):
+        fn.task_weight = weight
+        return fn
+    return mark
+
+
+def date_range(rng):
+    """The ranges people actually pick on the dashboard: today, a week, a month, a quarter"""
+    days = rng.choices((0, 6, 29, 89), (3, 4, 5, 1))[0]
+    end = date.today()
+    return {'start_date': (end - timedelta(days=days)).isoformat(), 'end_date': end.isoformat()}
+
+
+class Scenario:
+    role = 'user'
+    weight = 1
+    wait_time = (2, 8)
+
+    def __init__(self, client, rng=None):
+        self.client = client
+        self.rng = rng or random.Random()
+
+    @classmethod
+    def tasks(cls):
+        found = []
+        for name in dir(cls):
+            fn = getattr(cls, name)
+            if callable(fn) and hasattr(fn, 'task_weight'):
+                found.append((fn, fn.task_weight))
+        return found
+
+    def on_start(self):
+        """Runs once after login, like a browser loading the app shell"""
+        self.client.get('/api/auth/me', name='/api/auth/me')
+
+
+class DashboardViewer(Scenario):
+    """Owners and managers watching the dashboard and pulling reports"""
+    role = 'user'
+    weight = 6
+    wait_time = (3, 10)
+
+    def on_start(self):
+        super().on_start()
+        self.client.get('/api/dashboard/bundle', params=date_range(self.rng), name='/api/dashboard/bundle')
+
+    @task(5)
+    def overview(self):
+        self.client.get('/api/dashboard/overview', params=date_range(self.rng), name='/api/dashboard/overview')
+
+    @task(4)
+    def sales_summary(self):
+        self.client.get('/api/dashboard/sales-summary', params=date_range(self.rng), name='/api/dashboard/sales-summary')
+
+    @task(3)
+    def chef_performance(self):
+        self.client.get('/api/dashboard/chef-performance', params=date_range(self.rng),
+                        name='/api/dashboard/chef-performance')
+
+    @task(2)
+    def staff_performance(self):
+        self.client.get('/api/dashboard/staff-performance', params=date_range(self.rng),
+                        name='/api/dashboard/staff-performance')
+
+    @task(2)
+    def profitability(self):
+        self.client.get('/api/dashboard/profitability', params=date_range(self.rng), name='/api/dashboard/profitability')
+
+    @task(2)
+    def recent_activity(self):
+        self.client.get('/api/dashboard/recent-activity', name='/api/dashboard/recent-activity')
+
+    @task(2)
+    def inventory(self):
+        self.client.get('/api/inventory', name='/api/inventory')
+
+    @task(1)
+    def sales_report(self):
+        params = dict(date_range(self.rng), format='csv')
+        self.client.get('/api/reports/reports/sales', params=params, name='/api/reports/reports/sales')
+
+    @task(1)
+    def chef_report(self):
+        self.client.get('/api/reports/reports/chef-performance', params=date_range(self.rng),
+                        name='/api/reports/reports/chef-performance')
+
+
+class TenantAdmin(Scenario):
+    """Tenant admins: dashboard plus uploads and configuration"""
+    role = 'admin'
+    weight = 2
+    wait_time = (5, 15)
+
+    @task(4)
+    def bundle(self):
+        self.client.get('/api/dashboard/bundle', params=date_range(self.rng), name='/api/dashboard/bundle')
+
+    @task(2)
+    def expenses(self):
+        self.client.get('/api/dashboard/expenses', params=date_range(self.rng), name='/api/dashboard/expenses')
+
+    @task(2)
+    def data_source_config(self):
+        self.client.get('/api/dashboard/data-source-config', name='/api/dashboard/data-source-config')
+
+    @task(1)
+    def profitability_report(self):
+        self.client.get('/api/reports/reports/profitability', params=date_range(self.rng),
+                        name='/api/reports/reports/profitability')
+
+    @task(1)
+    def upload_expenses(self):
+        self.client.post('/api/upload/expenses', files={'file': (f'loadtest-{uuid.uuid4().hex}.xlsx', expenses_xlsx())},
+                         name='/api/upload/expenses')
+
+    @task(1)
+    def upload_sales(self):
+        self.client.post('/api/upload/sales', files={'file': (f'loadtest-{uuid.uuid4().hex}.csv', sales_csv(self.rng))},
+                         name='/api/upload/sales')
+
+
+class AIAnalyst(Scenario):
+    """Users on the AI insights pages; each call is CPU-heavy on the server"""
+    role = 'user'
+    weight = 2
+    wait_time = (5, 20)
+
+    @task(3)
+    def predictions(self):
+        self.client.get('/api/ai/predictions/sales', params={'days': self.rng.choice((7, 14, 30))},
+                        name='/api/ai/predictions/sales')
+
+    @task(3)
+    def insights(self):
+        self.client.get('/api/ai/insights/automated', name='/api/ai/insights/automated')
+
+    @task(2)
+    def anomalies(self):
+        self.client.get('/api/ai/anomalies/detect', name='/api/ai/anomalies/detect')
+
+    @task(1)
+    def inventory_optimization(self):
+        self.client.get('/api/ai/inventory/optimize', name='/api/ai/inventory/optimize')
+
+    @task(1)
+    def customer_segments(self):
+        self.client.get('/api/ai/customers/segments', name='/api/ai/customers/segments')
+
+    @task(1)
+    def model_status(self):
+        self.client.get('/api/ai/models/status', name='/api/ai/models/status')
+
+
+SCENARIOS = [DashboardViewer, TenantAdmin, AIAnalyst]
+
+_expenses_xlsx = None
+
+
+def expenses_xlsx():
+    """A small expenses workbook, built once"""
+    global _expenses_xlsx
+    if _expenses_xlsx is None:
+        import pandas as pd
+        today = date.today()
+        buffer = io.BytesIO()
+        pd.DataFrame({
+            'Date': [today - timedelta(days=i) for i in range(20)],
+            'Amount': [50 + 10 * i for i in range(20)],
+            'Category': [('Food', 'Supplies', 'Utilities', 'Marketing')[i % 4] for i in range(20)],
+            'Description': [f'Load test expense {i}' for i in range(20)],
+        }).to_excel(buffer, index=False)
+        _expenses_xlsx = buffer.getvalue()
+    return io.BytesIO(_expenses_xlsx)
+
+
+def sales_csv(rng, rows=50):
+    """A small Clover line items export; order ids are unique per upload so sale ids never collide"""
+    batch = uuid.uuid4().hex[:10]
+    lines = ['Line Item Date,Order ID,Item Name,Per Unit Quantity,Item Revenue,Total Revenue']
+    for i in range(rows):
+        price = rng.choice((4.5, 9.0, 12.5, 16.0))
+        quantity = rng.randint(1, 3)
+        lines.append(f"{date.today():%d-%b-%Y} 12:{i % 60:02d} PM CDT,LT{batch}{i // 3:03d},"
+                     f"Load Test Item {i % 12},{quantity},{price},{price * quantity}")
+    return io.BytesIO('\n'.join(lines).encode('utf-8'))
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Headless load test for the API using the scenarios in dev_tools/load_scenarios.py.
+
+Spawns --users virtual users at --spawn-rate per second. Each picks a scenario
+by weight, logs in through /api/auth/login with an account of the scenario's
+role, then runs weighted tasks with think time until --duration ends. At the end
+it prints and saves (--output) per-endpoint request counts, error rates and
+p50/p95/p99 latency, plus worker saturation sampled from the server's /metrics:
+
+    in-flight   plateiq_http_requests_in_flight (scrape included), sampled every --sample-interval
+    utilisation server-side request seconds / (wall seconds x worker slots)
+
+Worker slots are --workers x --threads (what gunicorn runs). Utilisation near
+100%, or in-flight pinned at the slot count while p95 climbs, means requests
+are queueing for a worker.
+
+Accounts default to the ones dev_tools/generate_scale_data.py creates:
+<prefix>_admin_<n> (role admin) and <prefix>_user_<n>_<k> (role user), all
+with --password. Or pass --credentials users.csv with username,password,role.
+
+Run against a local server with seeded data, not production:
+
+    python dev_tools/generate_scale_data.py --database-url sqlite:///scale.db --tenants 5 --years 1
+    DATABASE_URL=sqlite:///scale.db FLASK_CONFIG=development gunicorn -w 4 -b 127.0.0.1:5000 src.main:app
+    python dev_tools/load_test.py --host http://127.0.0.1:5000 --users 50 --duration 120 --workers 4
+
+FLASK_CONFIG=development matters locally: production session cookies are
+Secure and are not sent over plain http.
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from load_scenarios import SCENARIOS
+
+
+class Stats:
+    """Latencies and failures per endpoint name"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.failures = defaultdict(int)
+        self.errors = defaultdict(lambda: defaultdict(int))
+
+    def record(self, name, milliseconds, error=None):
+        with self._lock:
+            self.latencies[name].append(milliseconds)
+            if error:
+                self.failures[name] += 1
+                self.errors[name][error] += 1
+
+    def totals(self):
+        with self._lock:
+            return sum(len(v) for v in self.latencies.values()), sum(self.failures.values())
+
+    def report(self, elapsed):
+        rows = {}
+        with self._lock:
+            every = []
+            for name, values in self.latencies.items():
+                every.extend(values)
+                rows[name] = summarize(values, self.failures[name], elapsed)
+                rows[name]['errors'] = dict(self.errors[name])
+            rows['Aggregated'] = summarize(every, sum(self.failures.values()), elapsed)
+        return rows
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return None
+    index = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(values, failures, elapsed):
+    ordered = sorted(values)
+    count = len(ordered)
+    return {
+        'requests': count,
+        'failures': failures,
+        'error_rate': round(failures / count, 4) if count else 0.0,
+        'rps': round(count / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(ordered, 0.50), 1) if count else None,
+        'p95_ms': round(percentile(ordered, 0.95), 1) if count else None,
+        'p99_ms': round(percentile(ordered, 0.99), 1) if count else None,
+        'max_ms': round(ordered[-1], 1) if count else None,
+    }
+
+
+class HttpClient:
+    """requests.Session bound to the host that records every call under its endpoint name"""
+
+    def __init__(self, host, stats, timeout):
+        self.host = host.rstrip('/')
+        self.stats = stats
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.unauthorized = False
+
+    def request(self, method, path, name=None, **kwargs):
+        name = f"{method} {name or path}"
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, self.host + path, timeout=self.timeout, **kwargs)
+            # Read the whole body so downloads are timed like a browser sees them
+            response.content
+        except requests.RequestException as e:
+            self.stats.record(name, (time.perf_counter() - started) * 1000, type(e).__name__)
+            return None
+        error = f"HTTP {response.status_code}" if response.status_code >= 400 else None
+        self.stats.record(name, (time.perf_counter() - started) * 1000, error)
+        if response.status_code == 401:
+            self.unauthorized = True
+        return response
+
+    def get(self, path, name=None, **kwargs):
+        return self.request('GET', path, name=name, **kwargs)
+
+    def post(self, path, name=None, **kwargs):
+        return self.request('POST', path, name=name, **kwargs)
+
+
+class VirtualUser(threading.Thread):
+    def __init__(self, number, scenario_cls, account, args, stats, stop):
+        super().__init__(name=f'vu-{number}', daemon=True)
+        self.scenario_cls = scenario_cls
+        self.account = account
+        self.args = args
+        self.stats = stats
+        self.stop = stop
+        self.rng = random.Random(f"{args.seed}:{number}")
+
+    def login(self, client):
+        username, password = self.account
+        response = client.post('/api/auth/login', json={'username': username, 'password': password},
+                               name='/api/auth/login')
+        client.unauthorized = False
+        return response is not None and response.status_code == 200
+
+    def run(self):
+        client = HttpClient(self.args.host, self.stats, self.args.timeout)
+        if not self.login(client):
+            return
+        scenario = self.scenario_cls(client, self.rng)
+        tasks = self.scenario_cls.tasks()
+        functions = [fn for fn, _ in tasks]
+        weights = [weight for _, weight in tasks]
+        scenario.on_start()
+        while not self.stop.is_set():
+            self.rng.choices(functions, weights)[0](scenario)
+            if client.unauthorized and not self.login(client):
+                return
+            low, high = self.scenario_cls.wait_time
+            self.stop.wait(self.rng.uniform(low, high) * self.args.think_time_scale)
+
+
+class SaturationSampler(threading.Thread):
+    """Scrapes /metrics for requests in flight and accumulated server-side request time"""
+
+    def __init__(self, url, token, interval, stop):
+        super().__init__(name='metrics-sampler', daemon=True)
+        self.url = url
+        self.headers = {'Authorization': f'Bearer {token}'} if token else {}
+        self.interval = interval
+        self.stop = stop
+        self.in_flight = []
+        self.busy_seconds = []
+        self.error = None
+
+    def scrape(self):
+        from prometheus_client.parser import text_string_to_metric_families
+        response = requests.get(self.url, headers=self.headers, timeout=10)
+        response.raise_for_status()
+        in_flight = busy = 0.0
+        for family in text_string_to_metric_families(response.text):
+            for sample in family.samples:
+                if sample.name == 'plateiq_http_requests_in_flight':
+                    in_flight += sample.value
+                elif sample.name == 'plateiq_http_request_duration_seconds_sum':
+                    busy += sample.value
+        # Includes the scrape itself, which holds a worker slot like any other request
+        return in_flight, busy
+
+    def sample(self):
+        try:
+            in_flight, busy = self.scrape()
+        except Exception as e:
+            self.error = str(e)
+            return
+        self.in_flight.append(in_flight)
+        self.busy_seconds.append(busy)
+
+    def run(self):
+        self.sample()
+        while not self.stop.wait(self.interval):
+            self.sample()
+        self.sample()
+
+    def report(self, elapsed, slots):
+        if len(self.busy_seconds) < 2:
+            return {'available': False, 'error': self.error or 'no samples'}
+        busy = self.busy_seconds[-1] - self.busy_seconds[0]
+        return {
+            'available': True,
+            'worker_slots': slots,
+            'utilisation': round(busy / (elapsed * slots), 3),
+            'in_flight_mean': round(sum(self.in_flight) / len(self.in_flight), 2),
+            'in_flight_max': max(self.in_flight),
+            'samples_at_capacity': round(sum(1 for v in self.in_flight if v >= slots) / len(self.in_flight), 3),
+        }
+
+
+def load_accounts(args):
+    """{role: [(username, password)]}"""
+    accounts = defaultdict(list)
+    if args.credentials:
+        with open(args.credentials, newline='') as f:
+            for row in csv.DictReader(f):
+                accounts[row.get('role') or 'user'].append((row['username'], row['password']))
+        return accounts
+    for tenant in range(args.tenants):
+        accounts['admin'].append((f"{args.prefix}_admin_{tenant}", args.password))
+        for staff in range(args.staff_per_tenant):
+            accounts['user'].append((f"{args.prefix}_user_{tenant}_{staff}", args.password))
+    return accounts
+
+
+def print_report(endpoints, saturation, elapsed):
+    print(f"\n{'Endpoint':<52} {'reqs':>7} {'fail%':>6} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for name, row in sorted(endpoints.items(), key=lambda item: (item[0] == 'Aggregated', item[0])):
+        if not row['requests']:
+            continue
+        print(f"{name[:52]:<52} {row['requests']:>7} {row['error_rate'] * 100:>5.1f}% {row['rps']:>7.2f} "
+              f"{row['p50_ms']:>8.0f} {row['p95_ms']:>8.0f} {row['p99_ms']:>8.0f} {row['max_ms']:>8.0f}")
+    failing = {name: row['errors'] for name, row in endpoints.items() if row.get('errors')}
+    if failing:
+        print("\nErrors:")
+        for name, errors in sorted(failing.items()):
+            print(f"  {name}: " + ', '.join(f"{error} x{count}" for error, count in errors.items()))
+    print(f"\nDuration {elapsed:.0f}s. Worker saturation:")
+    if saturation['available']:
+        print(f"  utilisation {saturation['utilisation']:.0%} of {saturation['worker_slots']} worker slots, "
+              f"in flight mean {saturation['in_flight_mean']} / max {saturation['in_flight_max']:.0f}, "
+              f"at capacity in {saturation['samples_at_capacity']:.0%} of samples")
+    else:
+        print(f"  unavailable ({saturation['error']}); is /metrics reachable?")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='http://127.0.0.1:5000')
+    parser.add_argument('--users', type=int, default=20, help='concurrent virtual users')
+    parser.add_argument('--spawn-rate', type=float, default=2, help='users started per second')
+    parser.add_argument('--duration', type=float, default=60, help='seconds, counted from the first user')
+    parser.add_argument('--think-time-scale', type=float, default=1.0, help='multiply scenario wait times (0 = no think time)')
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scenario', action='append', default=[], help='only run these scenario classes (repeatable)')
+    parser.add_argument('--credentials', help='CSV with username,password,role columns')
+    parser.add_argument('--prefix', default='scale', help='account prefix used by generate_scale_data.py')
+    parser.add_argument('--tenants', type=int, default=5)
+    parser.add_argument('--staff-per-tenant', type=int, default=2)
+    parser.add_argument('--password', default='scale-test')
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_CONCURRENCY', 1)), help='server worker processes')
+    parser.add_argument('--threads', type=int, default=1, help='threads per server worker')
+    parser.add_argument('--metrics-url', help='defaults to <host>/metrics')
+    parser.add_argument('--metrics-token', default=os.environ.get('METRICS_TOKEN'))
+    parser.add_argument('--sample-interval', type=float, default=2.0)
+    parser.add_argument('--output', help='write the report as JSON here')
+    args = parser.parse_args()
+
+    scenarios = [s for s in SCENARIOS if not args.scenario or s.__name__ in args.scenario]
+    accounts = load_accounts(args)
+    missing = sorted({s.role for s in scenarios} - set(accounts))
+    if missing:
+        sys.exit(f"No accounts for role(s) {', '.join(missing)}; see --credentials")
+
+    stats = Stats()
+    stop = threading.Event()
+    sampler = SaturationSampler(args.metrics_url or args.host.rstrip('/') + '/metrics', args.metrics_token,
+                                args.sample_interval, stop)
+    sampler.start()
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    users = []
+    print(f"Starting {args.users} users at {args.spawn_rate}/s against {args.host} for {args.duration:.0f}s")
+    try:
+        for number in range(args.users):
+            if time.perf_counter() - started >= args.duration:
+                break
+            scenario = rng.choices(scenarios, [s.weight for s in scenarios])[0]
+            account = accounts[scenario.role][number % len(accounts[scenario.role])]
+            user = VirtualUser(number, scenario, account, args, stats, stop)
+            user.start()
+            users.append(user)
+            time.sleep(1 / args.spawn_rate)
+        while time.perf_counter() - started < args.duration:
+            time.sleep(min(10.0, args.duration - (time.perf_counter() - started)))
+            requests_made, failures = stats.totals()
+            print(f"  {time.perf_counter() - started:5.0f}s  {len(users)} users  {requests_made} requests  {failures} failures")
+    except KeyboardInterrupt:
+        print("Interrupted, stopping users")
+    stop.set()
+    for user in users:
+        user.join(timeout=args.timeout)
+    sampler.join(timeout=15)
+    elapsed = time.perf_counter() - started
+
+    endpoints = stats.report(elapsed)
+    saturation = sampler.report(elapsed, args.workers * args.threads)
+    print_report(endpoints, saturation, elapsed)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'params': {k: v for k, v in vars(args).items() if k not in ('password', 'metrics_token')},
+                'duration_s': round(elapsed, 1),
+                'endpoints': endpoints,
+                'saturation': saturation,
+            }, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Reproducible performance benchmarks against a local Clover API stand-in.
+
+Starts dev_tools/fake_clover.py in-process, builds the app with the testing
+config (in-memory SQLite) pointed at it, seeds a tenant, chefs and chef-dish
+mappings for the synthetic catalogue, and times:
+
+    clover.get_orders, clover.get_orders_async, clover.sync_sales_data,
+    clover.sync_inventory_data, dashboard.process_clover_orders,
+    api.dashboard.* (sales-summary, chef-performance, overview, profitability,
+    staff-performance, bundle), api.upload.* (sales, inventory, expenses) and
+    startup.* (a new interpreter importing src.main, with and without the
+    schema/admin bootstrap)
+
+Each benchmark runs once untimed, then --repeat timed iterations. Results (per
+benchmark min/median/mean/max seconds, rows/second, SQL statements and Clover
+calls per iteration) are written as JSON to dev_tools/benchmark_results/ with
+the git commit in the file name, so two commits can be compared:
+
+    python dev_tools/run_benchmarks.py                       # writes <timestamp>_<commit>.json
+    python dev_tools/run_benchmarks.py --compare dev_tools/benchmark_results/<baseline>.json
+    python dev_tools/run_benchmarks.py --only clover. --orders 5000 --rate-limit-every 50
+
+With --compare, benchmarks whose median is more than --threshold slower than the
+baseline are reported and the script exits with status 1.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from fake_clover import add_data_arguments, build_server
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_results')
+MERCHANT_ID = 'BENCHMERCHANT0'
+TENANT_ADMIN = ('bench_admin', 'bench-password')
+
+BENCHMARKS = []
+
+
+def benchmark(name, setup=None):
+    """Register fn(ctx) -> rows processed; setup(ctx) runs untimed before every iteration"""
+    def register(fn):
+        BENCHMARKS.append((name, fn, setup))
+        return fn
+    return register
+
+
+class Context:
+    """Everything a benchmark needs: the app, a logged-in client and the fake server"""
+
+    def __init__(self, args, server, app, client, tenant_id):
+        self.args = args
+        self.server = server
+        self.app = app
+        self.client = client
+        self.tenant_id = tenant_id
+        self.end_date = datetime.now()
+        self.start_date = self.end_date - timedelta(days=args.days)
+        self.sync_start_date = self.end_date - timedelta(days=args.sync_days)
+        self.orders = None
+
+    def date_params(self):
+        return {'start_date': self.start_date.strftime('%Y-%m-%d'), 'end_date': self.end_date.strftime('%Y-%m-%d')}
+
+
+def git_commit():
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, text=True).strip()
+        dirty = bool(subprocess.check_output(['git', 'status', '--porcelain', '--', '.'], cwd=REPO_DIR, text=True).strip())
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+    return commit, dirty
+
+
+# --- Clover client and sync -------------------------------------------------
+
+@benchmark('clover.get_orders')
+def bench_get_orders(ctx):
+    from src.services.clover_registry import clover_registry
+    return len(clover_registry.get().get_orders(ctx.start_date, ctx.end_date))
+
+
+@benchmark('clover.get_orders_async')
+def bench_get_orders_async(ctx):
+    from src.services.clover_registry import clover_registry
+    return len(clover_registry.get_async().get_orders(ctx.start_date, ctx.end_date))
+
+
+def clear_sales(ctx):
+    from src.models import db, Sale
+    Sale.query.delete()
+    db.session.commit()
+
+
+@benchmark('clover.sync_sales_data', setup=clear_sales)
+def bench_sync_sales(ctx):
+    from src.services.clover_registry import clover_registry
+    result = clover_registry.get().sync_sales_data(ctx.sync_start_date, ctx.end_date)
+    if result.get('status') != 'success':
+        raise RuntimeError(result.get('message'))
+    return result['total_processed']
+
+
+@benchmark('clover.sync_inventory_data')
+def bench_sync_inventory(ctx):
+    from src.services.clover_registry import clover_registry
+    result = clover_registry.get().sync_inventory_data()
+    if result.get('status') != 'success':
+        raise RuntimeError(result.get('message'))
+    return result['total_items']
+
+
+def fetch_orders_once(ctx):
+    if ctx.orders is None:
+        from src.services.clover_registry import clover_registry
+        ctx.orders = clover_registry.get().get_orders(ctx.start_date, ctx.end_date)
+
+
+@benchmark('dashboard.process_clover_orders', setup=fetch_orders_once)
+def bench_process_orders(ctx):
+    from src.routes.dashboard import dashboard_service
+    dashboard_service._process_clover_orders(ctx.orders)
+    return len(ctx.orders)
+
+
+# --- Dashboard endpoints ------------------------------------------------------
+
+def clear_clover_cache(ctx):
+    from src.routes.dashboard import dashboard_service
+    dashboard_service.clear_clover_cache()
+
+
+def dashboard_endpoint(path):
+    def run(ctx):
+        response = ctx.client.get(f'/api/dashboard/{path}', query_string=ctx.date_params())
+        if response.status_code != 200:
+            raise RuntimeError(f"/api/dashboard/{path} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        return 0
+    return run
+
+
+for _path in ('sales-summary', 'chef-performance', 'overview', 'profitability', 'staff-performance', 'bundle'):
+    benchmark(f'api.dashboard.{_path}', setup=clear_clover_cache)(dashboard_endpoint(_path))
+
+
+# --- Upload routes ------------------------------------------------------------
+
+def upload(ctx, route, filename, payload):
+    response = ctx.client.post(f'/api/upload/{route}', data={'file': (io.BytesIO(payload), filename)},
+                               content_type='multipart/form-data')
+    if response.status_code != 200:
+        raise RuntimeError(f"/api/upload/{route} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+
+
+def sales_csv(rows, items):
+    import pandas as pd
+    now = datetime.now()
+    frame = pd.DataFrame({
+        'Line Item Date': [(now - timedelta(minutes=i)).strftime('%d-%b-%Y %I:%M %p CDT') for i in range(rows)],
+        'Order ID': [f'UPLOAD{i // 3:08d}' for i in range(rows)],
+        'Item Name': [f'Item {i % items:04d}' for i in range(rows)],
+        'Per Unit Quantity': [1 + i % 3 for i in range(rows)],
+        'Item Revenue': [12.5] * rows,
+        'Total Revenue': [12.5 * (1 + i % 3) for i in range(rows)],
+    })
+    return frame.to_csv(index=False).encode('utf-8')
+
+
+def excel(sheets):
+    import pandas as pd
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        for sheet_name, frame in sheets.items():
+            frame.to_excel(writer, sheet_name=sheet_name, index=False)
+    return buffer.getvalue()
+
+
+def clear_tenant_sales(ctx):
+    from src.models import db, Sale
+    Sale.query.filter_by(tenant_id=ctx.tenant_id).delete()
+    db.session.commit()
+
+
+@benchmark('api.upload.sales', setup=clear_tenant_sales)
+def bench_upload_sales(ctx):
+    upload(ctx, 'sales', 'sales.csv', sales_csv(ctx.args.upload_rows, ctx.args.items))
+    return ctx.args.upload_rows
+
+
+@benchmark('api.upload.inventory')
+def bench_upload_inventory(ctx):
+    import pandas as pd
+    rows = ctx.args.upload_rows
+    frame = pd.DataFrame({
+        'Clover ID': [f'UPLOADITEM{i:06d}' for i in range(rows)],
+        'Name': [f'Uploaded Item {i:05d}' for i in range(rows)],
+        'Price': [9.99] * rows,
+        'Quantity': [i % 50 for i in range(rows)],
+        'Categories': ['Entrees'] * rows,
+    })
+    upload(ctx, 'inventory', 'inventory.xlsx', excel({'Items': frame}))
+    return rows
+
+
+@benchmark('api.upload.expenses')
+def bench_upload_expenses(ctx):
+    import pandas as pd
+    rows = ctx.args.upload_rows
+    today = datetime.now().date()
+    frame = pd.DataFrame({
+        'Date': [today - timedelta(days=i % 30) for i in range(rows)],
+        'Amount': [100 + i % 250 for i in range(rows)],
+        'Category': [('Food', 'Labor', 'Utilities', 'Rent')[i % 4] for i in range(rows)],
+        'Description': [f'Expense {i}' for i in range(rows)],
+    })
+    upload(ctx, 'expenses', 'expenses.xlsx', excel({'Sheet1': frame}))
+    return rows
+
+
+# --- Startup ------------------------------------------------------------------
+
+def import_app(bootstrap):
+    """Fresh interpreter importing src.main the way a gunicorn worker boots"""
+    env = dict(os.environ, PYTHONPATH=REPO_DIR, BOOTSTRAP_ON_STARTUP='true' if bootstrap else 'false')
+    subprocess.run([sys.executable, '-c', 'import src.main'], env=env, check=True, capture_output=True)
+    return 0
+
+
+@benchmark('startup.cold_import')
+def bench_cold_import(ctx):
+    return import_app(bootstrap=False)
+
+
+@benchmark('startup.cold_import_with_bootstrap')
+def bench_cold_import_with_bootstrap(ctx):
+    return import_app(bootstrap=True)
+
+
+# --- Harness ------------------------------------------------------------------
+
+def seed(app, server):
+    """Tenant admin, the four chefs and a chef mapping for every fake catalogue item"""
+    from src.models import db, Item, Chef, ChefDishMapping
+    from src.models.tenant import Tenant
+    from src.models.user import User
+    from fake_clover import CHEF_NAMES
+
+    merchant = server.merchants[MERCHANT_ID]
+    with app.app_context():
+        tenant = Tenant(name='Benchmark Bistro', business_type='restaurant', contact_email='bench@example.com')
+        db.session.add(tenant)
+        db.session.flush()
+        user = User(username=TENANT_ADMIN[0], email='bench-admin@example.com', role='admin', is_admin=True,
+                    tenant_id=tenant.id)
+        user.set_password(TENANT_ADMIN[1])
+        db.session.add(user)
+
+        chefs = [Chef(clover_id=f'CHEF{i:04d}', name=name) for i, name in enumerate(CHEF_NAMES)]
+        db.session.add_all(chefs)
+        items = [
+            Item(clover_id=item['id'], name=item['name'], price=item['price'] / 100,
+                 category=item['categories']['elements'][0]['name'])
+            for item in merchant.items
+        ]
+        db.session.add_all(items)
+        db.session.flush()
+        db.session.add_all([
+            ChefDishMapping(chef_id=chefs[i % len(chefs)].id, item_id=item.id, clover_id=item.clover_id,
+                            item_name=item.name)
+            for i, item in enumerate(items)
+        ])
+        db.session.commit()
+        return tenant.id
+
+
+def run_benchmark(ctx, name, fn, setup, repeat):
+    from src.utils.query_stats import count_queries
+
+    timings, queries, clover_calls = [], [], []
+    rows = 0
+    with ctx.app.app_context():
+        for iteration in range(repeat + 1):
+            if setup:
+                setup(ctx)
+            requests_before = ctx.server.request_count
+            with count_queries() as stats:
+                started = time.perf_counter()
+                rows = fn(ctx)
+                elapsed = time.perf_counter() - started
+            # The first iteration warms pools and caches and is not recorded
+            if iteration:
+                timings.append(elapsed)
+                queries.append(stats.count)
+                clover_calls.append(ctx.server.request_count - requests_before)
+    median = statistics.median(timings)
+    return {
+        'iterations': repeat,
+        'min_s': round(min(timings), 6),
+        'median_s': round(median, 6),
+        'mean_s': round(statistics.mean(timings), 6),
+        'max_s': round(max(timings), 6),
+        'rows': rows,
+        'rows_per_s': round(rows / median, 1) if rows and median else None,
+        'sql_statements': max(queries),
+        'clover_calls': max(clover_calls),
+    }
+
+
+def compare(results, baseline_path, threshold):
+    """Print median changes against a baseline file; return the names that regressed"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    if baseline['meta']['params'] != results['meta']['params']:
+        print("warning: baseline was run with different parameters; timings may not be comparable")
+    print(f"\nCompared with {baseline['meta']['commit']} ({os.path.basename(baseline_path)}), threshold {threshold:.0%}:")
+    regressions = []
+    for name, current in results['benchmarks'].items():
+        previous = baseline['benchmarks'].get(name)
+        if not previous or 'median_s' not in previous or 'median_s' not in current:
+            continue
+        change = current['median_s'] / previous['median_s'] - 1 if previous['median_s'] else 0
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        elif change < -threshold:
+            flag = '  faster'
+        print(f"  {name:<36} {previous['median_s'] * 1000:10.1f} ms -> {current['median_s'] * 1000:10.1f} ms  "
+              f"({change:+.1%}){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_data_arguments(parser)
+    parser.add_argument('--sync-days', type=int, default=3, help='days of orders pulled by clover.sync_sales_data')
+    parser.add_argument('--upload-rows', type=int, default=1000, help='rows per uploaded file')
+    parser.add_argument('--repeat', type=int, default=3, help='timed iterations per benchmark')
+    parser.add_argument('--only', action='append', default=[], help='run benchmarks whose name starts with this (repeatable)')
+    parser.add_argument('--client-interval', type=float, default=0.0,
+                        help='CLOVER_MIN_REQUEST_INTERVAL for the app under test (production default 0.1)')
+    parser.add_argument('--log-level', default='WARNING')
+    parser.add_argument('--output', help='results file (default dev_tools/benchmark_results/<timestamp>_<commit>.json)')
+    parser.add_argument('--compare', help='baseline results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='relative median slowdown reported as a regression')
+    args = parser.parse_args()
+    # Resolved before switching to the scratch directory below
+    for path_arg in ('output', 'compare'):
+        if getattr(args, path_arg):
+            setattr(args, path_arg, os.path.abspath(getattr(args, path_arg)))
+
+    server = build_server(
+        merchant_ids=[MERCHANT_ID], orders=args.orders, line_items=args.line_items, items=args.items,
+        days=args.days, seed=args.seed, rate_limit_every=args.rate_limit_every, max_rps=args.max_rps,
+        latency_ms=args.latency_ms
+    )
+    server.start_background()
+
+    # The app reads its configuration at import time; logs, sessions and uploads go to a scratch directory
+    workdir = tempfile.mkdtemp(prefix='plateiq-bench-')
+    os.chdir(workdir)
+    os.environ.update({
+        'FLASK_CONFIG': 'testing',
+        'SECRET_KEY': 'benchmark',
+        'ADMIN_USERNAME': 'admin',
+        'ADMIN_PASSWORD': 'admin-benchmark',
+        'LOG_LEVEL': args.log_level,
+        'CLOVER_API_BASE_URL': server.base_url,
+        'CLOVER_MERCHANT_ID': MERCHANT_ID,
+        'CLOVER_ACCESS_TOKEN': 'benchmark-token',
+        'CLOVER_MIN_REQUEST_INTERVAL': str(args.client_interval),
+    })
+    from src.main import app
+
+    tenant_id = seed(app, server)
+    client = app.test_client()
+    response = client.post('/api/auth/login', json={'username': TENANT_ADMIN[0], 'password': TENANT_ADMIN[1]})
+    if response.status_code != 200:
+        sys.exit(f"Login failed: {response.status_code} {response.get_data(as_text=True)[:200]}")
+    ctx = Context(args, server, app, client, tenant_id)
+
+    commit, dirty = git_commit()
+    results = {
+        'meta': {
+            'commit': commit + ('-dirty' if dirty else ''),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'params': {k: v for k, v in vars(args).items() if k not in ('output', 'compare', 'threshold', 'only')},
+        },
+        'benchmarks': {},
+    }
+    selected = [b for b in BENCHMARKS if not args.only or any(b[0].startswith(prefix) for prefix in args.only)]
+    for name, fn, setup in selected:
+        try:
+            result = run_benchmark(ctx, name, fn, setup, args.repeat)
+        except Exception as e:
+            result = {'error': str(e)}
+            print(f"  {name:<36} FAILED: {e}")
+        else:
+            rate = f"{result['rows_per_s']:>12,.0f} rows/s" if result['rows_per_s'] else ''
+            print(f"  {name:<36} {result['median_s'] * 1000:10.1f} ms  {rate}  "
+                  f"{result['sql_statements']} SQL, {result['clover_calls']} Clover calls")
+        results['benchmarks'][name] = result
+    results['fake_clover'] = server.stats()
+    server.shutdown()
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}_{results['meta']['commit']}.json")
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""
+Gunicorn settings for production: gunicorn -c gunicorn.conf.py src.main:app
+
+The app is imported once in the master (preload) and workers are forked from it,
+so imported modules and the built app are shared copy-on-write instead of being
+rebuilt per worker. To keep those pages shared, the master never runs the cyclic
+GC and freezes everything it allocated before forking (gc.freeze); each worker
+re-enables GC and reopens what must not cross a fork: DB connection pools, Clover
+HTTP sessions, the async event loop thread and the log listener thread.
+
+Worker count and class come from the CPUs and memory available to the container:
+
+    workers = min(2 x CPUs + 1, (memory - GUNICORN_MEMORY_RESERVE_MB) / GUNICORN_WORKER_MEMORY_MB)
+
+When memory allows fewer workers than 2 x CPUs + 1, the gthread class fills the
+gap with threads per worker. Each open live dashboard (/api/dashboard/stream) holds
+a thread for minutes, so while DASHBOARD_STREAM_ENABLED is on (the default) workers
+are gthread with at least GUNICORN_STREAM_THREADS threads, and each worker holds
+at most DASHBOARD_STREAM_MAX_PER_WORKER streams (half its threads by default) so
+the rest stay free for other requests. On sync workers, or past that cap, the
+stream answers 503 and the dashboard polls instead. WEB_CONCURRENCY,
+GUNICORN_THREADS and GUNICORN_WORKER_CLASS override the computed values;
+GUNICORN_PRELOAD=false turns preloading off.
+
+The AI service imports pandas/scikit-learn on first use, so by default each worker
+that serves AI traffic loads its own copy (~130 MB). On dynos where most workers
+do, import them once in the master instead and share them:
+
+    GUNICORN_PRELOAD_MODULES=pandas,numpy,sklearn.ensemble,sklearn.cluster,sklearn.preprocessing,joblib
+"""
+
+import gc
+import glob
+import importlib
+import math
+import os
+
+# Budget per worker: ~80 MB after boot, ~210 MB once it has served AI requests (ML stack loaded)
+WORKER_MEMORY_MB = int(os.environ.get('GUNICORN_WORKER_MEMORY_MB', 250))
+# Left for the master, the OS and page cache
+MEMORY_RESERVE_MB = int(os.environ.get('GUNICORN_MEMORY_RESERVE_MB', 150))
+MAX_THREADS = int(os.environ.get('GUNICORN_MAX_THREADS', 8))
+# Live dashboard streams each hold a thread while open (see src/services/dashboard_stream.py)
+STREAM_ENABLED = os.environ.get('DASHBOARD_STREAM_ENABLED', 'true').lower() != 'false'
+# Threads per worker at least while streams are enabled, so open dashboards leave room for other requests
+STREAM_MIN_THREADS = int(os.environ.get('GUNICORN_STREAM_THREADS', 4))
+
+
+def available_cpus():
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    # cgroup v2 CPU quota, e.g. "200000 100000" for 2 CPUs
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def available_memory_mb():
+    """Container memory limit (cgroup v2, then v1), else physical memory"""
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+            # v1 reports a huge number when unlimited
+            if value != 'max' and int(value) < 1 << 50:
+                return int(value) // (1024 * 1024)
+        except (OSError, ValueError):
+            continue
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemTotal:'):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def plan_workers(cpus, memory_mb):
+    """As many workers as the CPUs want (2 x CPUs + 1) and the memory allows"""
+    workers = 2 * cpus + 1
+    if memory_mb is not None:
+        workers = min(workers, max(1, (memory_mb - MEMORY_RESERVE_MB) // WORKER_MEMORY_MB))
+    return workers
+
+
+def plan_threads(cpus, workers):
+    """Threads per worker making up for workers the memory couldn't fit, and enough for open streams"""
+    threads = min(MAX_THREADS, math.ceil((2 * cpus + 1) / workers))
+    if STREAM_ENABLED:
+        threads = max(threads, STREAM_MIN_THREADS)
+    return threads
+
+
+_cpus = available_cpus()
+_memory_mb = available_memory_mb()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY') or plan_workers(_cpus, _memory_mb))
+threads = int(os.environ.get('GUNICORN_THREADS') or plan_threads(_cpus, workers))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS') or ('gthread' if threads > 1 else 'sync')
+# Read by src/services/dashboard_stream.py when the app is imported (after this file, with or without preload)
+os.environ.setdefault('DASHBOARD_STREAM_MAX_PER_WORKER', str(max(1, threads // 2)))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+# Recycle workers now and then so memory that grew after fork (ML stack, caches) is returned
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() != 'false'
+preload_modules = [m.strip() for m in os.environ.get('GUNICORN_PRELOAD_MODULES', '').split(',') if m.strip()]
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+# Prometheus multiprocess files from a previous run would be summed into this one
+_prometheus_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+if _prometheus_dir:
+    os.makedirs(_prometheus_dir, exist_ok=True)
+    for stale in glob.glob(os.path.join(_prometheus_dir, '*.db')):
+        os.remove(stale)
+
+if preload_app:
+    # Collections in the master would write to (and un-share) every page holding an object header
+    gc.disable()
+
+
+def when_ready(server):
+    if preload_app:
+        for module in preload_modules:
+            importlib.import_module(module)
+    server.log.info(
+        "Serving with %d %s worker(s) x %d thread(s), preload=%s%s (%s CPUs, %s MB memory detected)",
+        workers, worker_class, threads, preload_app,
+        f" +{','.join(preload_modules)}" if preload_app and preload_modules else '',
+        _cpus, _memory_mb if _memory_mb is not None else 'unknown'
+    )
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        # Move everything allocated so far out of the GC's reach so workers never touch it
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    gc.enable()
+    if not preload_app:
+        return
+    from src.main import app
+    from src.models import db
+    from src.services.async_clover_service import event_loop_thread
+    from src.services.clover_registry import clover_registry
+    from src.utils.logger import start_log_listener
+
+    # Connections opened by the master must not be shared; start fresh pools in this worker
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    clover_registry.clear()
+    event_loop_thread.reset()
+    start_log_listener()
+
+
+def worker_exit(server, worker):
+    # Write API calls counted since the last batched flush before the worker goes away
+    from src.services.usage_meter import usage_meter
+    usage_meter.stop()
+
+
+def child_exit(server, worker):
+    from src.utils.metrics import mark_worker_dead
+    mark_worker_dead(worker.pid)
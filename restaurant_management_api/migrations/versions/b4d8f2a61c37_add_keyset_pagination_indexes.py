@@ -0,0 +1,54 @@
+"""Add composite indexes for keyset pagination and tenant_id to file_upload
+
+Revision ID: b4d8f2a61c37
+Revises: a7c3e9d41b20
+Create Date: 2026-10-18 21:40:12.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4d8f2a61c37'
+down_revision = 'a7c3e9d41b20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('file_upload', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('tenant_id', sa.String(length=36), nullable=True))
+        batch_op.create_foreign_key('fk_file_upload_tenant_id', 'tenants', ['tenant_id'], ['id'])
+        batch_op.create_index('ix_file_upload_tenant_date_id', ['tenant_id', 'upload_date', 'id'], unique=False)
+
+    with op.batch_alter_table('item', schema=None) as batch_op:
+        batch_op.create_index('ix_item_tenant_name_id', ['tenant_id', 'name', 'id'], unique=False)
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.create_index('ix_user_tenant_id_id', ['tenant_id', 'id'], unique=False)
+
+    # sale and expense are the large, busy tables: build their indexes without
+    # blocking writes. CREATE INDEX CONCURRENTLY can't run inside a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_sale_tenant_date_id', 'sale', ['tenant_id', 'line_item_date', 'id'],
+                        unique=False, postgresql_concurrently=True)
+        op.create_index('ix_expense_tenant_date_id', 'expense', ['tenant_id', 'date', 'id'],
+                        unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_expense_tenant_date_id', table_name='expense', postgresql_concurrently=True)
+        op.drop_index('ix_sale_tenant_date_id', table_name='sale', postgresql_concurrently=True)
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_tenant_id_id')
+
+    with op.batch_alter_table('item', schema=None) as batch_op:
+        batch_op.drop_index('ix_item_tenant_name_id')
+
+    with op.batch_alter_table('file_upload', schema=None) as batch_op:
+        batch_op.drop_index('ix_file_upload_tenant_date_id')
+        batch_op.drop_constraint('fk_file_upload_tenant_id', type_='foreignkey')
+        batch_op.drop_column('tenant_id')
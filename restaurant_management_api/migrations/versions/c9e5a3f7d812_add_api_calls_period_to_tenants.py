@@ -0,0 +1,26 @@
+"""Add api_calls_period to tenants for monthly API usage metering
+
+Revision ID: c9e5a3f7d812
+Revises: b4d8f2a61c37
+Create Date: 2026-10-18 22:05:37.640118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9e5a3f7d812'
+down_revision = 'b4d8f2a61c37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tenants', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('api_calls_period', sa.String(length=7), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('tenants', schema=None) as batch_op:
+        batch_op.drop_column('api_calls_period')
@@ -0,0 +1,85 @@
+"""
+One-time schema and admin bootstrap, run as a release step rather than on every boot.
+
+    python -m src.bootstrap
+
+Brings the schema to the latest migration first: a brand-new database (no
+alembic_version table and no application tables) is built with create_all and
+stamped at head, because the baseline migration only alters existing tables;
+any other database is upgraded. Then makes sure the ADMIN_USERNAME account
+exists, resetting its password to ADMIN_PASSWORD only if it no longer matches.
+Safe to run repeatedly. Web processes skip this work when BOOTSTRAP_ON_STARTUP
+is false (the production default), so a worker can serve requests without
+touching the schema or hashing a password.
+"""
+
+import logging
+import os
+import sys
+import time
+
+from flask_migrate import stamp, upgrade
+from sqlalchemy import inspect
+
+from src.models import db
+from src.models.user import User
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+
+def migrate_database(app):
+    """Create and stamp an empty database, or upgrade an existing one to the latest migration"""
+    with app.app_context():
+        inspector = inspect(db.engine)
+        if inspector.has_table('alembic_version') or inspector.has_table(User.__tablename__):
+            # Databases created by create_all before migrations existed are upgraded from the baseline
+            logger.info('Upgrading database schema to the latest migration...')
+            upgrade(directory=MIGRATIONS_DIR)
+        else:
+            logger.info('Empty database: creating all tables and stamping the latest migration...')
+            db.create_all(bind_key=None)
+            stamp(directory=MIGRATIONS_DIR, revision='head')
+
+
+def bootstrap_database(app):
+    """Create missing tables and make sure the admin account exists with ADMIN_PASSWORD"""
+    started = time.perf_counter()
+    with app.app_context():
+        logger.info('Ensuring all database tables exist...')
+        db.create_all(bind_key=None)  # the replica bind is read-only
+        logger.info('Database tables created or already exist')
+        admin = User.query.filter_by(username=app.config['ADMIN_USERNAME']).first()
+        if not admin:
+            admin = User(
+                username=app.config['ADMIN_USERNAME'],
+                role='admin',
+                is_admin=True
+            )
+            admin.set_password(app.config['ADMIN_PASSWORD'])
+            db.session.add(admin)
+            db.session.commit()
+            logger.info('Admin user created successfully')
+        elif not admin.check_password(app.config['ADMIN_PASSWORD']):
+            admin.set_password(app.config['ADMIN_PASSWORD'])
+            db.session.commit()
+            logger.info('Admin user password updated')
+    logger.info('Database bootstrap finished in %.0f ms', (time.perf_counter() - started) * 1000)
+
+
+def main():
+    from src.main import app
+    try:
+        migrate_database(app)
+        bootstrap_database(app)
+    except Exception as e:
+        logger.error(f"Database bootstrap failed: {str(e)}")
+        print(f"Database bootstrap failed: {e}", file=sys.stderr)
+        return 1
+    print('Database bootstrap complete')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
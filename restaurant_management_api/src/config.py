@@ -8,11 +8,39 @@ import urllib.parse
 # Load environment variables
 # load_dotenv()  # Temporarily disabled due to .env file encoding issues
 
-def get_database_uri():
-    db_url = os.environ.get('DATABASE_URL')
+def get_database_uri(env_var='DATABASE_URL', default='sqlite:///restaurant_management.db'):
+    db_url = os.environ.get(env_var)
     if db_url and db_url.startswith('postgres://'):
         db_url = db_url.replace('postgres://', 'postgresql://', 1)
-    return db_url or 'sqlite:///restaurant_management.db'
+    return db_url or default
+
+def get_engine_options(db_url, statement_timeout_ms=0):
+    """
+    Pool settings from the environment; the statement timeout is only applied on PostgreSQL.
+
+    Every worker process (and the replica bind, when set) has its own pool, so a dyno
+    opens up to workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections per database.
+    5 + 5 covers gunicorn's threads per worker (at most GUNICORN_MAX_THREADS, 8) plus
+    the background flushers and refreshers.
+    """
+    options = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),  # connections kept open per worker process
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 5)),  # extra connections allowed under bursts
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),  # seconds to wait for a free connection
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 3600)),  # reconnect connections older than this
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    }
+    if statement_timeout_ms and db_url.startswith('postgresql'):
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout_ms}'}
+    return options
+
+def get_database_binds():
+    """The read replica as the 'replica' bind when DATABASE_REPLICA_URL is set (see src/models/routing.py)"""
+    replica_url = get_database_uri('DATABASE_REPLICA_URL', default=None)
+    if not replica_url:
+        return {}
+    timeout_ms = int(os.environ.get('DB_REPLICA_STATEMENT_TIMEOUT_MS') or os.environ.get('DB_STATEMENT_TIMEOUT_MS', 0))
+    return {'replica': dict(get_engine_options(replica_url, timeout_ms), url=replica_url)}
 
 class Config:
     """Base configuration class"""
@@ -77,12 +105,15 @@ class Config:
     # Admin configuration
     ADMIN_USERNAME = os.environ.get('ADMIN_USERNAME') or 'admin'
     ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD') or 'admin123'
+    # Create tables and the admin account in create_app; off in production, where `python -m src.bootstrap` runs at release
+    BOOTSTRAP_ON_STARTUP = os.environ.get('BOOTSTRAP_ON_STARTUP', 'true').lower() != 'false'
     
     # Clover API configuration
     CLOVER_MERCHANT_ID = os.environ.get('CLOVER_MERCHANT_ID') or ''
     CLOVER_ACCESS_TOKEN = os.environ.get('CLOVER_ACCESS_TOKEN') or ''
-    CLOVER_API_BASE_URL = 'https://api.clover.com'
+    CLOVER_API_BASE_URL = os.environ.get('CLOVER_API_BASE_URL') or 'https://api.clover.com'  # e.g. the sandbox or dev_tools/fake_clover.py
     CLOVER_API_VERSION = 'v3'
+    CLOVER_MIN_REQUEST_INTERVAL = float(os.environ.get('CLOVER_MIN_REQUEST_INTERVAL', 0.1))  # minimum spacing between calls from one client (seconds)
     
     # Data source configuration
     DEFAULT_SALES_SOURCE = os.environ.get('DEFAULT_SALES_SOURCE') or 'clover'
@@ -91,13 +122,40 @@ class Config:
     DEFAULT_CHEF_MAPPING_SOURCE = 'local'  # Always local
     
     # Cache configuration
-    CLOVER_CACHE_TTL = 600  # 10 minutes
+    CLOVER_CACHE_TTL = int(os.environ.get('CLOVER_CACHE_TTL', 600))  # 10 minutes
+    CLOVER_CACHE_MAX_STALENESS = int(os.environ.get('CLOVER_CACHE_MAX_STALENESS', 3600))  # never serve inventory older than 1 hour
+    CLOVER_CACHE_REFRESH_INTERVAL = int(os.environ.get('CLOVER_CACHE_REFRESH_INTERVAL', 60))  # proactive refresher tick
     DASHBOARD_CACHE_TTL = 300  # 5 minutes
     
     # Logging configuration
     LOG_LEVEL = os.environ.get('LOG_LEVEL') or 'INFO'
     LOG_FILE = 'logs/app.log'
     ERROR_LOG_FILE = 'logs/error.log'
+    LOG_ASYNC = os.environ.get('LOG_ASYNC', 'true').lower() != 'false'  # queue records; file I/O happens off the request thread
+    LOG_RATE_LIMIT = float(os.environ.get('LOG_RATE_LIMIT', 10))  # records/second per call site below ERROR (0 disables)
+    LOG_RATE_BURST = int(os.environ.get('LOG_RATE_BURST', 50))
+    LOG_SAMPLING = os.environ.get('LOG_SAMPLING', '')  # e.g. 'root=0.1,src.services.clover_service=0.5'
+    
+    # Query instrumentation
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))  # log any single statement slower than this
+    REQUEST_QUERY_COUNT_THRESHOLD = int(os.environ.get('REQUEST_QUERY_COUNT_THRESHOLD', 50))  # log requests running more queries
+    REQUEST_DB_TIME_THRESHOLD_MS = float(os.environ.get('REQUEST_DB_TIME_THRESHOLD_MS', 500))  # ...or spending longer in the DB
+    QUERY_STATS_HEADERS = True  # X-DB-Query-Count / X-DB-Time-Ms response headers
+    
+    # On-demand request profiling (armed through /api/admin/profiling)
+    PROFILE_FOLDER = os.environ.get('PROFILE_FOLDER') or 'profiles'  # shared by all workers on the host
+    PROFILE_MAX_REQUESTS = int(os.environ.get('PROFILE_MAX_REQUESTS', 100))  # cap on requests per session
+    PROFILE_CHECK_INTERVAL = float(os.environ.get('PROFILE_CHECK_INTERVAL', 1.0))  # seconds between armed-state checks
+    
+    # API usage metering (Tenant.api_calls_this_month)
+    USAGE_FLUSH_INTERVAL = float(os.environ.get('USAGE_FLUSH_INTERVAL', 10))  # seconds between batched counter writes
+    API_QUOTA_ENFORCED = os.environ.get('API_QUOTA_ENFORCED', 'false').lower() == 'true'  # 429 once a plan's monthly calls are used
+    
+    # Response encoding (src/utils/responses.py)
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))  # bytes; smaller bodies aren't worth compressing (0 disables)
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 4))  # 4-5 keeps per-request CPU close to gzip -6
+    RESPONSE_MSGPACK_ENABLED = os.environ.get('RESPONSE_MSGPACK_ENABLED', 'true').lower() != 'false'  # honour Accept: application/msgpack
     
     # File upload configuration
     UPLOAD_FOLDER = 'uploads'
@@ -121,11 +179,11 @@ class Config:
     RATELIMIT_STORAGE_URL = 'memory://'
     
     # Database connection pool
-    SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_size': 10,
-        'pool_recycle': 3600,
-        'pool_pre_ping': True
-    }
+    SQLALCHEMY_ENGINE_OPTIONS = get_engine_options(
+        SQLALCHEMY_DATABASE_URI, int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 0))
+    )
+    # Read replica for dashboard, report and AI reads
+    SQLALCHEMY_BINDS = get_database_binds()
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -153,6 +211,7 @@ class ProductionConfig(Config):
     
     # Production logging
     LOG_LEVEL = 'WARNING'
+    QUERY_STATS_HEADERS = False
     
     # Production Clover settings
     CLOVER_MERCHANT_ID = os.environ.get('CLOVER_MERCHANT_ID')
@@ -161,6 +220,7 @@ class ProductionConfig(Config):
     # Production admin settings
     ADMIN_USERNAME = os.environ.get('ADMIN_USERNAME')
     ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD')
+    BOOTSTRAP_ON_STARTUP = os.environ.get('BOOTSTRAP_ON_STARTUP', 'false').lower() == 'true'
     
     def __init__(self):
         super().__init__()
@@ -193,7 +253,12 @@ class TestingConfig(Config):
     TESTING = True
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {}  # in-memory SQLite uses a single static connection; pool options don't apply
+    SQLALCHEMY_BINDS = {}
     WTF_CSRF_ENABLED = False
+    LOG_ASYNC = False  # keep log output in step with the test that produced it
+    LOG_RATE_LIMIT = 0
+    USAGE_FLUSH_INTERVAL = 0  # no background flusher; tests call usage_meter.flush()
     
     # Test CORS settings
     CORS_ORIGINS = ['http://localhost:3000']
@@ -1,3 +1,6 @@
+import time
+_import_started = time.perf_counter()
+
 import os
 import sys
 from flask import Flask, jsonify, request, session, g
@@ -24,6 +27,7 @@ from src.routes.inventory import inventory_bp
 from src.routes.ai import ai_bp
 from src.routes.tenant import tenant_bp
 from src.routes.tenant_data import tenant_data_bp
+from src.routes.data import data_bp
 from src.routes.clover import clover_bp
 from src.models import db
 from src.models.user import User
@@ -39,9 +43,17 @@ from src.models.tenant import Tenant
 from src.config import config
 from src.utils.logger import setup_logger, log_request_info
 from src.utils.error_handlers import setup_error_handlers, log_request_error
+from src.utils.auth import current_identity
+from src.utils.metrics import init_metrics, observe_startup
+from src.utils.query_stats import init_query_stats
+from src.utils.profiling import init_profiling
+from src.utils.responses import init_responses
+from src.services.usage_meter import init_usage_metering
+from src.bootstrap import bootstrap_database
 
 def create_app(config_name=None):
     """Create and configure the Flask application with enhanced security."""
+    create_started = time.perf_counter()
     
     if not config_name:
         config_name = os.environ.get('FLASK_CONFIG', 'production')
@@ -62,6 +74,8 @@ def create_app(config_name=None):
     
     # Setup error handlers
     setup_error_handlers(app)
+    # orjson/msgpack encoding and gzip/brotli; registered first so compression is the last after_request to run
+    init_responses(app)
     
     # Initialize extensions
     db.init_app(app)
@@ -70,26 +84,9 @@ def create_app(config_name=None):
     # Initialize Flask-Session (config-driven)
     Session(app)
     
-    # Create database tables and admin user
-    with app.app_context():
-        logger.info('Ensuring all database tables exist...')
-        db.create_all()
-        logger.info('Database tables created or already exist')
-        admin = User.query.filter_by(username=app.config['ADMIN_USERNAME']).first()
-        if not admin:
-            admin = User(
-                username=app.config['ADMIN_USERNAME'], 
-                role='admin', 
-                is_admin=True
-            )
-            admin.set_password(app.config['ADMIN_PASSWORD'])
-            db.session.add(admin)
-            db.session.commit()
-            logger.info('Admin user created successfully')
-        else:
-            admin.set_password(app.config['ADMIN_PASSWORD'])
-            db.session.commit()
-            logger.info('Admin user password updated')
+    # Schema and admin account; in production this runs once at release (python -m src.bootstrap)
+    if app.config.get('BOOTSTRAP_ON_STARTUP', True):
+        bootstrap_database(app)
 
     # Robust CORS setup: allow all backend endpoints for the Vercel frontend and Heroku
     # NOTE: If you change your frontend domain, update this list!
@@ -109,17 +106,25 @@ def create_app(config_name=None):
         max_age=app.config['CORS_MAX_AGE']
     )
 
+    # Per-request SQL counting/slow-query capture, then Prometheus metrics built on it.
+    # Registered before the identity lookup below so its queries and time are counted too.
+    init_query_stats(app)
+    init_metrics(app)
+    # On-demand cProfile/stack sampling of selected requests
+    init_profiling(app)
+
     # Enhanced request logging middleware
     @app.before_request
     def before_request():
         try:
             g.request_id = str(uuid.uuid4())
-            g.user = None
-            if 'user_id' in session:
-                g.user = User.query.get(session['user_id'])
-            logger.info(f"Request: {request.method} {request.path} - Origin: {request.headers.get('Origin', 'None')}")
-            logger.info(f"Headers: {dict(request.headers)}")
-            logger.info(f"Session: {dict(session)}")
+            # Identity snapshot (cached per session user); decorators reuse it from g
+            g.user = current_identity()
+            logger.debug("Request: %s %s - Origin: %s", request.method, request.path, request.headers.get('Origin', 'None'))
+            # Headers and session carry cookies and identity; only dump them when debugging
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Headers: %s", dict(request.headers))
+                logger.debug("Session keys: %s", sorted(session.keys()))
             if request.method in ['POST', 'PUT', 'DELETE']:
                 log_request_info()
         except Exception as e:
@@ -138,8 +143,12 @@ def create_app(config_name=None):
     app.register_blueprint(clover_bp, url_prefix='/api/clover')
     app.register_blueprint(tenant_bp, url_prefix='/api/tenant')
     app.register_blueprint(tenant_data_bp, url_prefix='/api/tenant-data')
+    app.register_blueprint(data_bp, url_prefix='/api/data')
     logger.info("Blueprints registered successfully")
 
+    # Per-tenant API call counting, flushed to the tenants table in batches
+    init_usage_metering(app)
+
     # Global after_request CORS handler
     @app.after_request
     def add_cors_headers(response):
@@ -253,10 +262,17 @@ def create_app(config_name=None):
                 'headers': {k: v for k, v in request.headers.items() if k.lower() in ['cookie', 'origin', 'referer']}
             }), 200
 
+    create_seconds = time.perf_counter() - create_started
+    observe_startup('create_app', create_seconds)
+    logger.info("create_app finished in %.0f ms", create_seconds * 1000)
     return app
 
 # Expose app for Gunicorn/Heroku
+_imports_seconds = time.perf_counter() - _import_started
 app = create_app()
+observe_startup('imports', _imports_seconds)
+app.logger.warning("Cold start: imports %.0f ms, total %.0f ms",
+                   _imports_seconds * 1000, (time.perf_counter() - _import_started) * 1000)
 
 if __name__ == '__main__':
     # Only runs for local development
@@ -1,7 +1,9 @@
 from flask_sqlalchemy import SQLAlchemy
 
-# Initialize SQLAlchemy
-db = SQLAlchemy()
+from .routing import RoutingSession
+
+# Initialize SQLAlchemy; the session sends reads in replica scopes to the read replica
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # Import models after db is initialized
 from .user import User
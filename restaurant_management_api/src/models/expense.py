@@ -3,7 +3,11 @@ from . import db
 
 class Expense(db.Model):
     __tablename__ = 'expense'
-    __table_args__ = {'extend_existing': True}  # Allow table redefinition
+    __table_args__ = (
+        # Keyset pagination and date-range reads per tenant (/api/data/expenses)
+        db.Index('ix_expense_tenant_date_id', 'tenant_id', 'date', 'id'),
+        {'extend_existing': True}  # Allow table redefinition
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     description = db.Column(db.String(255))  # Made optional
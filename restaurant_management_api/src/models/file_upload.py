@@ -3,7 +3,11 @@ from . import db
 
 class FileUpload(db.Model):
     __tablename__ = 'file_upload'
-    __table_args__ = {'extend_existing': True}  # Allow table redefinition
+    __table_args__ = (
+        # Keyset pagination of upload history per tenant (/api/data/uploads)
+        db.Index('ix_file_upload_tenant_date_id', 'tenant_id', 'upload_date', 'id'),
+        {'extend_existing': True}  # Allow table redefinition
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(255), nullable=False)
@@ -14,6 +18,9 @@ class FileUpload(db.Model):
     status = db.Column(db.String(20), default='processing')  # 'processing', 'completed', 'failed'
     error_message = db.Column(db.Text)
 
+    # Add tenant_id for multi-tenancy
+    tenant_id = db.Column(db.String(36), db.ForeignKey('tenants.id'), nullable=True)
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -23,5 +30,6 @@ class FileUpload(db.Model):
             'processed_records': self.processed_records,
             'failed_records': self.failed_records,
             'status': self.status,
-            'error_message': self.error_message
+            'error_message': self.error_message,
+            'tenant_id': self.tenant_id
         } 
\ No newline at end of file
@@ -3,7 +3,11 @@ from . import db
 
 class Item(db.Model):
     __tablename__ = 'item'
-    __table_args__ = {'extend_existing': True}  # Allow table redefinition
+    __table_args__ = (
+        # Keyset pagination by name per tenant (/api/data/items)
+        db.Index('ix_item_tenant_name_id', 'tenant_id', 'name', 'id'),
+        {'extend_existing': True}  # Allow table redefinition
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     clover_id = db.Column(db.String(255), unique=True, nullable=False)
@@ -0,0 +1,68 @@
+"""
+Read-replica routing for db.session.
+
+When DATABASE_REPLICA_URL is set, config.py registers it as the 'replica' bind.
+Views wrapped in @read_replica (or code inside `with replica_reads():`) send
+their queries there. Everything else goes to the primary: flushes, INSERT/UPDATE/DELETE
+statements, every query after the request's first flush, so a request always
+reads its own writes, and code inside `with primary_reads():`, which wins over
+replica scopes. Without a replica all queries go to the primary.
+"""
+
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND_KEY = 'replica'
+
+
+def _replica_requested():
+    return has_app_context() and g.get('db_replica', False) and not g.get('db_primary', False)
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that picks the replica engine for reads in replica scopes"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing:
+                self.info['wrote'] = True
+            elif (_replica_requested() and not self.info.get('wrote')
+                  and not getattr(clause, 'is_dml', False)):
+                engine = self._db.engines.get(REPLICA_BIND_KEY)
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@contextmanager
+def replica_reads():
+    """Route this block's reads to the replica, if one is configured"""
+    previous = g.get('db_replica', False)
+    g.db_replica = True
+    try:
+        yield
+    finally:
+        g.db_replica = previous
+
+
+@contextmanager
+def primary_reads():
+    """Keep this block's reads on the primary, even inside @read_replica views"""
+    previous = g.get('db_primary', False)
+    g.db_primary = True
+    try:
+        yield
+    finally:
+        g.db_primary = previous
+
+
+def read_replica(f):
+    """Decorator for read-only views; apply below the auth decorators so auth checks hit the primary"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        with replica_reads():
+            return f(*args, **kwargs)
+    return decorated_function
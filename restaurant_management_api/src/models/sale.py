@@ -3,7 +3,11 @@ from . import db
 
 class Sale(db.Model):
     __tablename__ = 'sale'
-    __table_args__ = {'extend_existing': True}  # Allow table redefinition
+    __table_args__ = (
+        # Keyset pagination and date-range reads per tenant (/api/data/sales)
+        db.Index('ix_sale_tenant_date_id', 'tenant_id', 'line_item_date', 'id'),
+        {'extend_existing': True}  # Allow table redefinition
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     clover_id = db.Column(db.String(50), unique=True, nullable=False)
@@ -2,6 +2,34 @@ from src.models import db
 from datetime import datetime
 import uuid
 
+# Limits per subscription plan; -1 means unlimited
+PLAN_LIMITS = {
+    'free': {
+        'max_users': 3,
+        'max_api_calls_per_month': 1000,
+        'max_storage_mb': 100,
+        'features': ['basic_analytics', 'inventory_management']
+    },
+    'basic': {
+        'max_users': 10,
+        'max_api_calls_per_month': 10000,
+        'max_storage_mb': 1000,
+        'features': ['basic_analytics', 'inventory_management', 'ai_insights', 'basic_reports']
+    },
+    'premium': {
+        'max_users': 25,
+        'max_api_calls_per_month': 50000,
+        'max_storage_mb': 5000,
+        'features': ['basic_analytics', 'inventory_management', 'ai_insights', 'advanced_reports', 'predictive_analytics', 'custom_branding']
+    },
+    'enterprise': {
+        'max_users': -1,  # unlimited
+        'max_api_calls_per_month': -1,  # unlimited
+        'max_storage_mb': -1,  # unlimited
+        'features': ['all_features', 'custom_integrations', 'dedicated_support', 'white_labeling']
+    }
+}
+
 class Tenant(db.Model):
     """Tenant model for multi-tenant SaaS architecture"""
     __tablename__ = 'tenants'
@@ -24,7 +52,8 @@ class Tenant(db.Model):
     next_billing_date = db.Column(db.DateTime)
     
     # Usage tracking
-    api_calls_this_month = db.Column(db.Integer, default=0)
+    api_calls_this_month = db.Column(db.Integer, default=0)  # maintained by services/usage_meter.py
+    api_calls_period = db.Column(db.String(7))  # 'YYYY-MM' the counter belongs to
     storage_used_mb = db.Column(db.Float, default=0.0)
     max_users = db.Column(db.Integer, default=5)
     
@@ -33,6 +62,10 @@ class Tenant(db.Model):
     currency = db.Column(db.String(3), default='USD')
     language = db.Column(db.String(10), default='en')
     
+    # Clover POS credentials (per merchant)
+    clover_merchant_id = db.Column(db.String(64))
+    clover_access_token = db.Column(db.String(255))
+    
     # Branding (for white-labeling)
     logo_url = db.Column(db.String(500))
     primary_color = db.Column(db.String(7), default='#3B82F6')  # hex color
@@ -77,6 +110,8 @@ class Tenant(db.Model):
             'logo_url': self.logo_url,
             'primary_color': self.primary_color,
             'custom_domain': self.custom_domain,
+            'clover_merchant_id': self.clover_merchant_id,
+            'clover_configured': self.has_clover_credentials,
             'is_active': self.is_active,
             'is_trial': self.is_trial,
             'trial_ends_at': self.trial_ends_at.isoformat() if self.trial_ends_at else None,
@@ -91,6 +126,11 @@ class Tenant(db.Model):
             return False
         return datetime.utcnow() > self.trial_ends_at
     
+    @property
+    def has_clover_credentials(self):
+        """Check if tenant has its own Clover merchant credentials"""
+        return bool(self.clover_merchant_id and self.clover_access_token)
+    
     @property
     def can_add_users(self):
         """Check if tenant can add more users"""
@@ -101,30 +141,4 @@ class Tenant(db.Model):
     
     def get_plan_limits(self):
         """Get plan limits based on subscription"""
-        limits = {
-            'free': {
-                'max_users': 3,
-                'max_api_calls_per_month': 1000,
-                'max_storage_mb': 100,
-                'features': ['basic_analytics', 'inventory_management']
-            },
-            'basic': {
-                'max_users': 10,
-                'max_api_calls_per_month': 10000,
-                'max_storage_mb': 1000,
-                'features': ['basic_analytics', 'inventory_management', 'ai_insights', 'basic_reports']
-            },
-            'premium': {
-                'max_users': 25,
-                'max_api_calls_per_month': 50000,
-                'max_storage_mb': 5000,
-                'features': ['basic_analytics', 'inventory_management', 'ai_insights', 'advanced_reports', 'predictive_analytics', 'custom_branding']
-            },
-            'enterprise': {
-                'max_users': -1,  # unlimited
-                'max_api_calls_per_month': -1,  # unlimited
-                'max_storage_mb': -1,  # unlimited
-                'features': ['all_features', 'custom_integrations', 'dedicated_support', 'white_labeling']
-            }
-        }
-        return limits.get(self.subscription_plan, limits['free']) 
\ No newline at end of file
+        return PLAN_LIMITS.get(self.subscription_plan, PLAN_LIMITS['free'])
@@ -4,7 +4,11 @@ from . import db
 
 class User(db.Model):
     __tablename__ = 'user'
-    __table_args__ = {'extend_existing': True}  # Allow table redefinition
+    __table_args__ = (
+        # Keyset pagination of a tenant's users (/api/data/users)
+        db.Index('ix_user_tenant_id_id', 'tenant_id', 'id'),
+        {'extend_existing': True}  # Allow table redefinition
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
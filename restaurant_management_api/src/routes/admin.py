@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify, request, current_app, session
+from flask import Blueprint, jsonify, request, current_app, session, send_file
 from datetime import datetime, timedelta
 from ..models import db
 from ..models.sale import Sale
@@ -9,8 +9,12 @@ from ..models.file_upload import FileUpload
 from ..models.tenant import Tenant
 from ..models.user import User
 from ..utils.auth import super_admin_required, admin_required
+from ..utils.profiling import profiler, MODES as PROFILE_MODES
+from ..utils.validation import validate_request_data, CursorPaginationSchema
+from .data import page_response
 from sqlalchemy import func, case
 import logging
+import time
 import pytz
 from flask_login import login_required, current_user
 from src.models import Chef
@@ -274,10 +278,14 @@ def delete_tenant(tenant_id):
 
 @admin_bp.route('/users', methods=['GET'])
 @super_admin_required
+@validate_request_data(CursorPaginationSchema)
 def get_all_users():
-    """Get all users across all tenants (for super admin)"""
+    """Get all users across all tenants (for super admin); pass limit/cursor for keyset pages"""
     try:
-        users = User.query.options(db.joinedload(User.tenant)).all()
+        query = User.query.options(db.joinedload(User.tenant))
+        if 'limit' in request.args or 'cursor' in request.args:
+            return page_response(query, [User.id])
+        users = query.all()
         return jsonify([user.to_dict() for user in users])
     except Exception as e:
         current_app.logger.error(f"Error getting all users: {str(e)}")
@@ -376,4 +384,96 @@ def sync_chef_mappings():
         'created_mappings': created_count,
         'unassigned_chef_id': unassigned_chef.id,
         'tenant_id': tenant_id
-    }) 
\ No newline at end of file
+    }) 
+
+
+@admin_bp.route('/profiling', methods=['GET'])
+@super_admin_required
+def get_profiling_status():
+    """Get the armed profiling session, if any"""
+    try:
+        return jsonify({'armed': profiler.status()})
+    except Exception as e:
+        current_app.logger.error(f"Error getting profiling status: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/profiling', methods=['POST'])
+@super_admin_required
+def arm_profiling():
+    """Profile the next N requests matching a path pattern and/or tenant.
+
+    Body: {"mode": "cprofile"|"sampling", "route": "/api/dashboard/chef-performance",
+           "tenant_id": "<tenant uuid>", "count": 10, "interval_ms": 5, "expires_in": 3600}
+    """
+    try:
+        data = request.get_json() or {}
+        mode = data.get('mode', 'cprofile')
+        if mode not in PROFILE_MODES:
+            return jsonify({'error': f"mode must be one of {', '.join(PROFILE_MODES)}"}), 400
+        route = data.get('route') or '*'
+        tenant_id = data.get('tenant_id')
+        if route == '*' and tenant_id is None:
+            return jsonify({'error': 'route or tenant_id is required'}), 400
+        if tenant_id is not None:
+            # Tenant ids are UUID strings; match them exactly as the session stores them
+            tenant_id = str(tenant_id)
+            if not Tenant.query.get(tenant_id):
+                return jsonify({'error': 'Tenant not found'}), 404
+        max_requests = current_app.config.get('PROFILE_MAX_REQUESTS', 100)
+        count = int(data.get('count', 10))
+        if not 1 <= count <= max_requests:
+            return jsonify({'error': f'count must be between 1 and {max_requests}'}), 400
+        interval_ms = float(data.get('interval_ms', 5))
+        if interval_ms < 1:
+            return jsonify({'error': 'interval_ms must be at least 1'}), 400
+        expires_in = int(data.get('expires_in', 3600))
+        profiling_session = profiler.arm(
+            mode=mode, route=route, tenant_id=tenant_id,
+            count=count, interval_ms=interval_ms, expires_at=time.time() + expires_in
+        )
+        return jsonify({'message': 'Profiling armed', 'session': profiling_session.to_dict()}), 201
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid profiling options: {str(e)}'}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error arming profiling: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/profiling', methods=['DELETE'])
+@super_admin_required
+def disarm_profiling():
+    """Stop profiling; profiles already captured are kept"""
+    try:
+        disarmed = profiler.disarm()
+        return jsonify({'message': 'Profiling disarmed', 'session': disarmed.to_dict() if disarmed else None})
+    except Exception as e:
+        current_app.logger.error(f"Error disarming profiling: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/profiles', methods=['GET'])
+@super_admin_required
+def list_profiles():
+    """List captured profiles, newest first; ?session_id= narrows to one session"""
+    try:
+        return jsonify({'profiles': profiler.list_profiles(request.args.get('session_id'))})
+    except Exception as e:
+        current_app.logger.error(f"Error listing profiles: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/profiles/<profile_id>', methods=['GET'])
+@super_admin_required
+def download_profile(profile_id):
+    """Download a profile: .prof (pstats; snakeviz, flameprof) or .folded (flamegraph.pl, speedscope)"""
+    found = profiler.get_profile(profile_id)
+    if found is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    metadata, path = found
+    return send_file(path, as_attachment=True, download_name=metadata['filename'],
+                     mimetype='application/octet-stream' if metadata['mode'] == 'cprofile' else 'text/plain')
+
+@admin_bp.route('/profiles/<profile_id>', methods=['DELETE'])
+@super_admin_required
+def delete_profile(profile_id):
+    """Delete a captured profile"""
+    if not profiler.delete_profile(profile_id):
+        return jsonify({'error': 'Profile not found'}), 404
+    return jsonify({'message': 'Profile deleted'})
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from src.services.ai_service import AIService
 from src.services.dashboard_service import DashboardService
 from src.models import db
+from src.models.routing import read_replica
 from src.models.sale import Sale
 from src.models.item import Item
 from src.utils.auth import login_required
@@ -30,10 +31,11 @@ def get_sales_data_for_ai(mode='item'):
         logger.info(f"AI processing using sales data source: {data_source}, mode={mode}")
         if data_source == 'clover':
             logger.info("Fetching Clover orders for AI processing...")
-            orders = dashboard_service.clover_service.get_orders()
-            summary = dashboard_service._process_clover_orders(orders)
+            # Orders are streamed and consumed once by whichever mode needs them
+            orders = dashboard_service.clover_service.iter_orders()
             sales_list = []
             if mode == 'daily':
+                summary = dashboard_service._process_clover_orders(orders)
                 for daily in summary.get('daily_sales', []):
                     sales_list.append({
                         'line_item_date': daily['date'],
@@ -133,6 +135,7 @@ def get_inventory_data_for_ai():
 
 @ai_bp.route('/predictions/sales', methods=['GET'])
 @login_required
+@read_replica
 def get_sales_predictions():
     """Get sales predictions for next N days"""
     try:
@@ -183,6 +186,7 @@ def get_sales_predictions():
 
 @ai_bp.route('/insights/automated', methods=['GET'])
 @login_required
+@read_replica
 def get_automated_insights():
     """Get automated insights from sales data"""
     import time
@@ -260,6 +264,7 @@ def get_automated_insights():
 
 @ai_bp.route('/models/train', methods=['POST'])
 @login_required
+@read_replica
 def train_models():
     """Train AI models with current data"""
     try:
@@ -327,6 +332,7 @@ def get_model_status():
 
 @ai_bp.route('/inventory/optimize', methods=['GET'])
 @login_required
+@read_replica
 def get_inventory_optimization():
     """Get inventory optimization recommendations"""
     try:
@@ -367,6 +373,7 @@ def get_inventory_optimization():
 
 @ai_bp.route('/customers/segments', methods=['GET'])
 @login_required
+@read_replica
 def get_customer_segments():
     """Get customer segmentation analysis"""
     try:
@@ -397,6 +404,7 @@ def get_customer_segments():
 
 @ai_bp.route('/anomalies/detect', methods=['GET'])
 @login_required
+@read_replica
 def detect_anomalies():
     """Detect anomalies in sales data"""
     try:
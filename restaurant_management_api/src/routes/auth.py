@@ -4,7 +4,7 @@ from ..models.user import User
 from ..models.chef import Chef
 from ..models.item import Item
 from ..models.chef_dish_mapping import ChefDishMapping
-from ..utils.auth import login_required, admin_required
+from ..utils.auth import login_required, admin_required, current_identity
 from werkzeug.security import check_password_hash, generate_password_hash
 import os
 import pickle
@@ -230,8 +230,7 @@ def register():
             return jsonify({'error': 'Username and password are required'}), 400
         
         # Get the admin user who is creating this new user
-        requesting_user_id = session.get('user_id')
-        requesting_user = User.query.get(requesting_user_id)
+        requesting_user = current_identity()
         
         # New user should belong to the same tenant as the admin creating them
         tenant_id = requesting_user.tenant_id
@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify, current_app
-from src.services.clover_service import CloverService, CloverConfig
+from src.services.clover_registry import clover_registry, current_tenant_id
 from src.utils.auth import login_required, admin_required
 from src.models import db
 from src.models.sale import Sale
@@ -13,6 +13,7 @@ clover_bp = Blueprint('clover', __name__)
 logger = logging.getLogger(__name__)
 
 API_KEY = os.getenv('SYNC_API_KEY', 'supersecretkey1234567890')
+CLOVER_ASYNC_CLIENT = os.getenv('CLOVER_ASYNC_CLIENT', 'false').lower() == 'true'
 
 def require_api_key(f):
     @wraps(f)
@@ -24,13 +25,15 @@ def require_api_key(f):
         return jsonify({"error": "Unauthorized"}), 401
     return decorated
 
-def get_clover_service():
-    """Get Clover service instance"""
-    config = CloverConfig(
-        merchant_id=os.getenv('CLOVER_MERCHANT_ID'),
-        access_token=os.getenv('CLOVER_ACCESS_TOKEN')
-    )
-    return CloverService(config)
+def get_clover_service(tenant_id=None):
+    """Get the pooled Clover client for a tenant (defaults to the logged-in user's tenant)"""
+    return clover_registry.get(tenant_id or current_tenant_id())
+
+def get_clover_reader(tenant_id=None):
+    """Get the client used by read-only listing routes (async-backed when CLOVER_ASYNC_CLIENT is set)"""
+    if CLOVER_ASYNC_CLIENT:
+        return clover_registry.get_async(tenant_id or current_tenant_id())
+    return get_clover_service(tenant_id)
 
 @clover_bp.route('/status', methods=['GET'])
 @login_required
@@ -85,8 +88,9 @@ def sync_sales():
         
         print(f"Sync date range: {start_date} to {end_date}")
         
-        clover_service = get_clover_service()
-        result = clover_service.sync_sales_data(start_date, end_date)
+        tenant_id = data.get('tenant_id') or current_tenant_id()
+        clover_service = get_clover_service(tenant_id)
+        result = clover_service.sync_sales_data(start_date, end_date, tenant_id=tenant_id)
         
         return jsonify(result), 200 if result['status'] == 'success' else 500
         
@@ -102,8 +106,9 @@ def sync_sales():
 def sync_inventory():
     """Sync inventory data from Clover to local database"""
     try:
-        clover_service = get_clover_service()
-        result = clover_service.sync_inventory_data()
+        tenant_id = request.args.get('tenant_id') or current_tenant_id()
+        clover_service = get_clover_service(tenant_id)
+        result = clover_service.sync_inventory_data(tenant_id=tenant_id)
         
         return jsonify(result), 200 if result['status'] == 'success' else 500
         
@@ -168,7 +173,7 @@ def get_orders():
         if end_date_str:
             end_date = datetime.fromisoformat(end_date_str.replace('Z', '+00:00'))
         
-        clover_service = get_clover_service()
+        clover_service = get_clover_reader()
         orders = clover_service.get_orders(start_date, end_date, limit)
         
         return jsonify({
@@ -207,7 +212,7 @@ def get_order_details(order_id):
 def get_employees():
     """Get employees from Clover"""
     try:
-        clover_service = get_clover_service()
+        clover_service = get_clover_reader()
         employees = clover_service.get_employees()
         
         return jsonify({
@@ -226,7 +231,7 @@ def get_employees():
 def get_customers():
     """Get customers from Clover"""
     try:
-        clover_service = get_clover_service()
+        clover_service = get_clover_reader()
         customers = clover_service.get_customers()
         
         return jsonify({
@@ -246,7 +251,7 @@ def get_items():
     """Get items from Clover"""
     try:
         category_id = request.args.get('category_id')
-        clover_service = get_clover_service()
+        clover_service = get_clover_reader()
         items = clover_service.get_items(category_id)
         
         return jsonify({
@@ -267,7 +272,7 @@ def get_items():
 def get_categories():
     """Get categories from Clover"""
     try:
-        clover_service = get_clover_service()
+        clover_service = get_clover_reader()
         categories = clover_service.get_categories()
         
         return jsonify({
@@ -288,13 +293,14 @@ def get_categories():
 def sync_all():
     """Sync all data from Clover to local database"""
     try:
-        clover_service = get_clover_service()
+        tenant_id = request.args.get('tenant_id') or current_tenant_id()
+        clover_service = get_clover_service(tenant_id)
         
         # Sync sales data
-        sales_result = clover_service.sync_sales_data()
+        sales_result = clover_service.sync_sales_data(tenant_id=tenant_id)
         
         # Sync inventory data
-        inventory_result = clover_service.sync_inventory_data()
+        inventory_result = clover_service.sync_inventory_data(tenant_id=tenant_id)
         
         return jsonify({
             'status': 'success',
@@ -1,10 +1,13 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context, g
 from ..models import db, Sale, Expense, Item, Chef, ChefDishMapping, UncategorizedItem, FileUpload
 from ..routes.auth import login_required
+from ..models.routing import read_replica
+from ..services.data_version import conditional_get
 from ..services.dashboard_service import DashboardService
+from ..services.dashboard_stream import dashboard_stream, overview_snapshot, streaming_supported
+from ..services.data_source_cache import data_source_config_cache
 from sqlalchemy import func, and_, or_
 from datetime import datetime, timedelta
-import pandas as pd
 import logging
 from src.models.data_source_config import DataSourceConfig
 from flask import current_app
@@ -32,6 +35,8 @@ def parse_date(date_str, is_end=False):
 
 @dashboard_bp.route('/sales-summary', methods=['GET'])
 @login_required
+@conditional_get
+@read_replica
 def get_sales_summary():
     try:
         # Get query parameters
@@ -60,6 +65,8 @@ def get_sales_summary():
 
 @dashboard_bp.route('/chef-performance', methods=['GET'])
 @login_required
+@conditional_get
+@read_replica
 def get_chef_performance():
     print("=== CHEF PERFORMANCE ROUTE CALLED ===")
     logging.info("=== CHEF PERFORMANCE ROUTE CALLED ===")
@@ -95,6 +102,8 @@ def get_chef_performance():
 
 @dashboard_bp.route('/expenses', methods=['GET'])
 @login_required
+@conditional_get
+@read_replica
 def get_expenses_dashboard():
     try:
         # Get query parameters
@@ -116,6 +125,8 @@ def get_expenses_dashboard():
 
 @dashboard_bp.route('/overview', methods=['GET'])
 @login_required
+@conditional_get
+@read_replica
 def get_overview():
     try:
         # Get query parameters
@@ -128,8 +139,39 @@ def get_overview():
         logging.error(f"Error in dashboard overview: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@dashboard_bp.route('/stream', methods=['GET'])
+@login_required
+def stream_overview():
+    """
+    Server-sent events for today's overview: an `overview` event with the full
+    figures and low-stock items, then `delta` events (changed values, increments,
+    low-stock items added/updated/cleared) whenever the tenant's data changes.
+    Answers 503 where streams can't be held open, or when this worker already
+    holds its share of them; EventSource then gives up and the dashboard falls
+    back to polling /overview.
+    """
+    if not streaming_supported(request.environ):
+        return jsonify({'error': 'Live updates are not available on this server', 'fallback': 'poll'}), 503
+    if not dashboard_stream.claim():
+        return jsonify({'error': 'Too many live dashboards open on this server', 'fallback': 'poll'}), 503
+    try:
+        events = dashboard_stream.events(g.user.tenant_id, lambda: overview_snapshot(dashboard_service))
+        response = Response(stream_with_context(events), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            # Stop nginx-style proxies from buffering the stream
+            'X-Accel-Buffering': 'no'
+        })
+    except Exception:
+        dashboard_stream.release()
+        raise
+    # The server closes the response even when the client left before the first event
+    response.call_on_close(dashboard_stream.release)
+    return response
+
 @dashboard_bp.route('/staff-performance', methods=['GET'])
 @login_required
+@conditional_get
+@read_replica
 def get_staff_performance():
     try:
         start_date = parse_date(request.args.get('start_date'))
@@ -144,6 +186,8 @@ def get_staff_performance():
 
 @dashboard_bp.route('/profitability', methods=['GET'])
 @login_required
+@conditional_get
+@read_replica
 def get_profitability():
     try:
         start_date = parse_date(request.args.get('start_date'))
@@ -155,8 +199,31 @@ def get_profitability():
         logging.error(f"Error in profitability: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@dashboard_bp.route('/bundle', methods=['GET'])
+@login_required
+@conditional_get
+@read_replica
+def get_dashboard_bundle():
+    """Return overview, sales summary, chef performance and profitability from one shared data fetch"""
+    try:
+        start_date_raw = request.args.get('start_date')
+        start_date = parse_date(start_date_raw)
+        end_date = parse_date(request.args.get('end_date'), is_end=True)
+        if start_date and not end_date:
+            # If end_date is blank, default to end of start_date
+            end_date = parse_date(start_date_raw, is_end=True)
+        chef_ids = request.args.get('chef_ids')
+        logging.info(f"Dashboard bundle request - start_date: {start_date}, end_date: {end_date}, chef_ids: {chef_ids}")
+        bundle = dashboard_service.get_dashboard_bundle(start_date, end_date, chef_ids)
+        return jsonify(bundle), 200
+    except Exception as e:
+        logging.error(f"Error in dashboard bundle: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @dashboard_bp.route('/items/uncategorized', methods=['GET'])
 @login_required
+@conditional_get
+@read_replica
 def get_uncategorized_items():
     try:
         # Get uncategorized items from local database
@@ -223,6 +290,8 @@ def categorize_item(item_id):
 
 @dashboard_bp.route('/recent-activity', methods=['GET'])
 @login_required
+@conditional_get
+@read_replica
 def get_recent_activity():
     try:
         # Get recent activity from various sources
@@ -271,6 +340,8 @@ def get_recent_activity():
 
 @dashboard_bp.route('/quick-actions', methods=['GET'])
 @login_required
+@conditional_get
+@read_replica
 def get_quick_actions():
     try:
         # Get quick actions based on current data state
@@ -327,6 +398,8 @@ def get_quick_actions():
 
 @dashboard_bp.route('/stats', methods=['GET'])
 @login_required
+@conditional_get
+@read_replica
 def get_dashboard_stats():
     try:
         # Get stats from configured data sources
@@ -382,11 +455,7 @@ def manage_data_source_config():
         is_superadmin = session.get('is_admin', False) and not session.get('tenant_id')
         if request.method == 'GET':
             # Return current configuration from DB if available
-            configs = DataSourceConfig.query.all()
-            if configs:
-                data_sources = {f"{c.data_type}": c.source for c in configs if c.tenant_id is None}
-            else:
-                data_sources = dashboard_service.data_sources
+            data_sources = data_source_config_cache.get_global_sources() or dashboard_service.data_sources
             return jsonify({
                 'data_sources': data_sources,
                 'status': dashboard_service.get_data_source_status()
@@ -421,12 +490,14 @@ def manage_data_source_config():
                     db.session.add(config)
                 current_app.logger.info(f"[AUDIT] Data source config updated: {data_type} -> {source} by {user}")
             db.session.commit()
+            # Drop cached config snapshots in every worker
+            data_source_config_cache.invalidate()
             # Also update in-memory config for backward compatibility
             dashboard_service.data_sources.update(new_config)
             dashboard_service.clear_clover_cache()
             return jsonify({
                 'message': 'Data source configuration updated successfully',
-                'data_sources': {f"{c.data_type}": c.source for c in DataSourceConfig.query.filter_by(tenant_id=None).all()}
+                'data_sources': data_source_config_cache.get_global_sources()
             }), 200
     except Exception as e:
         logging.error(f"Error managing data source config: {str(e)}")
@@ -435,6 +506,8 @@ def manage_data_source_config():
 
 @dashboard_bp.route('/chefs', methods=['GET'])
 @login_required
+@conditional_get
+@read_replica
 def get_chefs_list():
     try:
         # If multi-tenant, filter by tenant_id from session
@@ -0,0 +1,111 @@
+from datetime import datetime, time
+
+from flask import Blueprint, jsonify, request
+
+from ..models import db, Sale, Expense, Item, FileUpload, User
+from ..utils.auth import login_required, admin_required, current_identity
+from ..utils.pagination import keyset_paginate, InvalidCursor
+from ..utils.validation import validate_request_data, CursorPaginationSchema
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Cursor-paginated raw records for the caller's tenant:
+#   GET /api/data/sales?limit=50&cursor=<next_cursor of the previous page>
+# Every listing is ordered by a composite index (see the models' __table_args__), so
+# each page costs the same however far the client has paged.
+data_bp = Blueprint('data', __name__)
+
+
+def scoped_tenant_id():
+    """The caller's tenant; super admins may pass ?tenant_id= to look at a tenant"""
+    identity = current_identity()
+    requested = request.validated_data.get('tenant_id')
+    if requested and identity.is_super_admin:
+        return requested
+    return identity.tenant_id
+
+
+def date_bounds(query, column):
+    """Apply optional start_date/end_date (inclusive, YYYY-MM-DD) to a DateTime column"""
+    params = request.validated_data
+    if params.get('start_date'):
+        query = query.filter(column >= datetime.combine(params['start_date'], time.min))
+    if params.get('end_date'):
+        query = query.filter(column <= datetime.combine(params['end_date'], time.max))
+    return query
+
+
+def page_response(query, columns, descending=False, serialize=None):
+    params = request.validated_data
+    try:
+        page = keyset_paginate(query, columns, cursor=params.get('cursor'), limit=params['limit'],
+                               descending=descending, serialize=serialize or (lambda row: row.to_dict()))
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(page), 200
+
+
+@data_bp.route('/sales', methods=['GET'])
+@login_required
+@validate_request_data(CursorPaginationSchema)
+def list_sales():
+    """Sale line items, newest first"""
+    try:
+        query = date_bounds(Sale.query.filter(Sale.tenant_id == scoped_tenant_id()), Sale.line_item_date)
+        return page_response(query, [Sale.line_item_date, Sale.id], descending=True)
+    except Exception as e:
+        logger.error(f"Error listing sales: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@data_bp.route('/expenses', methods=['GET'])
+@login_required
+@validate_request_data(CursorPaginationSchema)
+def list_expenses():
+    """Expenses, newest first"""
+    try:
+        query = date_bounds(Expense.query.filter(Expense.tenant_id == scoped_tenant_id()), Expense.date)
+        return page_response(query, [Expense.date, Expense.id], descending=True)
+    except Exception as e:
+        logger.error(f"Error listing expenses: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@data_bp.route('/items', methods=['GET'])
+@login_required
+@validate_request_data(CursorPaginationSchema)
+def list_items():
+    """Items stored locally (uploaded or synced), by name"""
+    try:
+        query = Item.query.filter(Item.tenant_id == scoped_tenant_id())
+        return page_response(query, [Item.name, Item.id])
+    except Exception as e:
+        logger.error(f"Error listing items: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@data_bp.route('/uploads', methods=['GET'])
+@login_required
+@validate_request_data(CursorPaginationSchema)
+def list_uploads():
+    """Upload history, newest first"""
+    try:
+        query = FileUpload.query.filter(FileUpload.tenant_id == scoped_tenant_id())
+        return page_response(query, [FileUpload.upload_date, FileUpload.id], descending=True)
+    except Exception as e:
+        logger.error(f"Error listing uploads: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@data_bp.route('/users', methods=['GET'])
+@admin_required
+@validate_request_data(CursorPaginationSchema)
+def list_users():
+    """Users of the caller's tenant, oldest first"""
+    try:
+        query = User.query.options(db.joinedload(User.tenant)).filter(User.tenant_id == scoped_tenant_id())
+        return page_response(query, [User.id])
+    except Exception as e:
+        logger.error(f"Error listing users: {str(e)}")
+        return jsonify({'error': str(e)}), 500
@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, current_app, request
 from sqlalchemy import func
 from ..models import db, Item
 from ..routes.auth import login_required
+from ..services.data_version import conditional_get
 from ..services.dashboard_service import DashboardService
 
 inventory_bp = Blueprint('inventory', __name__)
@@ -10,6 +11,7 @@ dashboard_service = DashboardService()
 @inventory_bp.route('', methods=['GET'])
 @inventory_bp.route('/', methods=['GET'])
 @login_required
+@conditional_get
 def get_inventory():
     try:
         # Use dashboard service to get inventory data from configured source
@@ -26,6 +28,7 @@ def get_inventory():
 
 @inventory_bp.route('/categories', methods=['GET'])
 @login_required
+@conditional_get
 def get_inventory_categories():
     try:
         # Use Clover if configured, else local
@@ -1,10 +1,10 @@
 from flask import Blueprint, request, jsonify, make_response
 from ..models import db, Item, UncategorizedItem, Sale, Expense, Chef
 from ..routes.auth import login_required, admin_required
+from ..models.routing import read_replica
 from ..services.dashboard_service import DashboardService
 from sqlalchemy import func, and_, or_
 from datetime import datetime
-import pandas as pd
 import io
 import csv
 import logging
@@ -30,7 +30,9 @@ def parse_date(date_str):
 
 @reports_bp.route('/reports/sales', methods=['GET'])
 @login_required
+@read_replica
 def export_sales_report():
+    import pandas as pd
     try:
         # Get query parameters
         start_date = parse_date(request.args.get('start_date'))
@@ -45,8 +47,8 @@ def export_sales_report():
             # Get sales data from Clover
             sales_summary = dashboard_service.get_sales_summary(start_date, end_date, category)
             
-            # For Clover data, we need to get the raw orders for detailed reporting
-            orders = dashboard_service.clover_service.get_orders(start_date, end_date)
+            # For Clover data, we need the raw orders for detailed reporting; stream them into rows
+            orders = dashboard_service.clover_service.iter_orders(start_date, end_date)
             
             data = []
             for order in orders:
@@ -142,7 +144,9 @@ def export_sales_report():
 
 @reports_bp.route('/reports/profitability', methods=['GET'])
 @login_required
+@read_replica
 def export_profitability_report():
+    import pandas as pd
     try:
         # Get query parameters
         start_date = parse_date(request.args.get('start_date'))
@@ -208,7 +212,9 @@ def export_profitability_report():
 
 @reports_bp.route('/reports/chef-performance', methods=['GET'])
 @login_required
+@read_replica
 def export_chef_performance_report():
+    import pandas as pd
     try:
         # Get query parameters
         start_date = parse_date(request.args.get('start_date'))
@@ -258,6 +264,7 @@ def export_chef_performance_report():
 
 @reports_bp.route('/items/uncategorized', methods=['GET'])
 @login_required
+@read_replica
 def get_uncategorized_items():
     try:
         # Get uncategorized items from local database
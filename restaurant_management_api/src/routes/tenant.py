@@ -3,6 +3,10 @@ from src.models import db
 from src.models.tenant import Tenant
 from src.models.user import User
 from src.utils.auth import login_required, super_admin_required
+from src.services.clover_registry import clover_registry
+from src.services.usage_meter import current_period
+from src.utils.validation import validate_request_data, CursorPaginationSchema
+from src.routes.data import page_response
 from datetime import datetime, timedelta
 import logging
 
@@ -11,9 +15,12 @@ logger = logging.getLogger(__name__)
 
 @tenant_bp.route('/tenants', methods=['GET'])
 @super_admin_required
+@validate_request_data(CursorPaginationSchema)
 def get_tenants():
-    """Get all tenants (super admin only)"""
+    """Get all tenants (super admin only); pass limit/cursor for keyset pages"""
     try:
+        if 'limit' in request.args or 'cursor' in request.args:
+            return page_response(Tenant.query, [Tenant.id])
         tenants = Tenant.query.all()
         return jsonify({
             'status': 'success',
@@ -179,6 +186,41 @@ def update_tenant(tenant_id):
             'message': 'Failed to update tenant'
         }), 500
 
+@tenant_bp.route('/tenants/<tenant_id>/clover-credentials', methods=['PUT'])
+@super_admin_required
+def update_tenant_clover_credentials(tenant_id):
+    """Set the tenant's own Clover merchant credentials (super admin only)"""
+    try:
+        tenant = Tenant.query.get(tenant_id)
+        if not tenant:
+            return jsonify({
+                'status': 'error',
+                'message': 'Tenant not found'
+            }), 404
+        
+        data = request.get_json() or {}
+        tenant.clover_merchant_id = data.get('merchant_id') or None
+        tenant.clover_access_token = data.get('access_token') or None
+        tenant.updated_at = datetime.utcnow()
+        db.session.commit()
+        
+        # Drop the pooled client so the next call uses the new credentials
+        clover_registry.invalidate(tenant_id)
+        
+        return jsonify({
+            'status': 'success',
+            'message': 'Clover credentials updated successfully',
+            'data': tenant.to_dict()
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error updating Clover credentials for tenant {tenant_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({
+            'status': 'error',
+            'message': 'Failed to update Clover credentials'
+        }), 500
+
 @tenant_bp.route('/tenants/<tenant_id>/users', methods=['GET'])
 @login_required
 def get_tenant_users(tenant_id):
@@ -228,7 +270,7 @@ def get_tenant_stats(tenant_id):
             'usage': {
                 'current_users': current_users,
                 'max_users': plan_limits['max_users'],
-                'api_calls_this_month': tenant.api_calls_this_month,
+                'api_calls_this_month': (tenant.api_calls_this_month or 0) if tenant.api_calls_period == current_period() else 0,
                 'max_api_calls_per_month': plan_limits['max_api_calls_per_month'],
                 'storage_used_mb': tenant.storage_used_mb,
                 'max_storage_mb': plan_limits['max_storage_mb']
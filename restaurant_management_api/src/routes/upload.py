@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify, g
 from ..models import db, Item, Chef, ChefDishMapping, Sale, Expense, UncategorizedItem, FileUpload, Category, Tenant
 from ..utils.auth import tenant_admin_required
-import pandas as pd
+from ..utils.metrics import observe_throughput
 import os
 from datetime import datetime
 from werkzeug.utils import secure_filename
@@ -9,8 +9,11 @@ import tempfile
 import logging
 import re
 import hashlib
+import time
 import uuid
 
+# pandas is imported in the views that need it, not at boot
+
 upload_bp = Blueprint('upload', __name__)
 logger = logging.getLogger(__name__)
 
@@ -46,6 +49,7 @@ def generate_short_clover_id(prefix, name, tenant_id, index):
 @upload_bp.route('/sales', methods=['POST'])
 @tenant_admin_required
 def upload_sales():
+    import pandas as pd
     tenant_id = request.tenant_id
     create_upload_folder()
     
@@ -60,11 +64,12 @@ def upload_sales():
     filepath = os.path.join(UPLOAD_FOLDER, filename)
     file.save(filepath)
 
-    file_upload = FileUpload(filename=filename, file_type='sales', status='processing')
+    file_upload = FileUpload(filename=filename, file_type='sales', status='processing', tenant_id=tenant_id)
     db.session.add(file_upload)
     db.session.commit()
 
     processed_records, failed_records, error_details = 0, 0, []
+    started = time.perf_counter()
     
     try:
         df = pd.read_csv(filepath, encoding='utf-8')
@@ -170,6 +175,7 @@ def upload_sales():
         db.session.commit()
 
         logger.info(f"Sales upload completed: {processed_records} processed, {failed_records} failed")
+        observe_throughput('upload_sales', processed_records + failed_records, time.perf_counter() - started)
         return jsonify({
             'message': 'Sales data processed',
             'processed_records': processed_records,
@@ -190,6 +196,7 @@ def upload_sales():
 @upload_bp.route('/inventory', methods=['POST'])
 @tenant_admin_required
 def upload_inventory():
+    import pandas as pd
     tenant_id = request.tenant_id
     create_upload_folder()
     
@@ -228,6 +235,7 @@ def upload_inventory():
             return jsonify({'error': "Upload failed. The file must contain a column for 'Name'."}), 400
             
         processed_count = 0
+        started = time.perf_counter()
         for _, row in df.iterrows():
             item_name = row.get('name')
             if not item_name:
@@ -256,6 +264,7 @@ def upload_inventory():
             processed_count += 1
         
         db.session.commit()
+        observe_throughput('upload_inventory', len(df), time.perf_counter() - started)
         
     except Exception as e:
         logger.error(f"Error processing inventory file for tenant {tenant_id}: {e}")
@@ -270,6 +279,7 @@ def upload_inventory():
 @upload_bp.route('/chef-mapping', methods=['POST'])
 @tenant_admin_required
 def upload_chef_mapping():
+    import pandas as pd
     tenant_id = request.tenant_id
     create_upload_folder()
 
@@ -309,6 +319,7 @@ def upload_chef_mapping():
         mappings_created = 0
         mappings_updated = 0
         errors = []
+        started = time.perf_counter()
         for index, row in df.iterrows():
             try:
                 chef_name = row.get('chef_name')
@@ -346,6 +357,7 @@ def upload_chef_mapping():
         try:
             db.session.commit()
             logger.info(f"Successfully committed {mappings_created} new and {mappings_updated} updated chef-dish mappings")
+            observe_throughput('upload_chef_mapping', len(df), time.perf_counter() - started)
         except Exception as e:
             logger.error(f"Database commit failed: {str(e)}")
             db.session.rollback()
@@ -368,6 +380,7 @@ def upload_chef_mapping():
 @upload_bp.route('/expenses', methods=['POST'])
 @tenant_admin_required
 def upload_expenses():
+    import pandas as pd
     tenant_id = request.tenant_id
     create_upload_folder()
 
@@ -404,6 +417,7 @@ def upload_expenses():
         return jsonify({'error': "Upload failed. The file must contain a column for description, vendor, or invoice."}), 400
 
     expenses_added = 0
+    started = time.perf_counter()
     for index, row in df.iterrows():
         try:
             # Handle missing or NaN values
@@ -436,6 +450,7 @@ def upload_expenses():
             continue
 
     db.session.commit()
+    observe_throughput('upload_expenses', len(df), time.perf_counter() - started)
 
     if os.path.exists(filepath):
         os.remove(filepath)
@@ -458,6 +473,7 @@ def get_upload_status(file_id):
 @tenant_admin_required
 def upload_tenant_data():
     """Uploads data for a specific tenant."""
+    import pandas as pd
     try:
         if 'file' not in request.files:
             return jsonify({'error': 'No file part'}), 400
@@ -493,6 +509,7 @@ def upload_tenant_data():
 
             processed_count = 0
             failed_rows = []
+            started = time.perf_counter()
 
             for index, row in df.iterrows():
                 try:
@@ -535,6 +552,7 @@ def upload_tenant_data():
                     continue
             
             db.session.commit()
+            observe_throughput('upload_tenant_data', len(df), time.perf_counter() - started)
 
             if failed_rows:
                  return jsonify({
@@ -1,6 +1,6 @@
 from flask import Blueprint, jsonify, request, session, current_app
 from src.models.user import User, db
-from src.utils.auth import admin_required
+from src.utils.auth import admin_required, current_identity
 
 user_bp = Blueprint('user', __name__)
 
@@ -37,8 +37,7 @@ def update_user(user_id):
 def delete_user(user_id):
     """Deletes a user, ensuring admins can only delete users within their own tenant."""
     try:
-        requesting_user_id = session.get('user_id')
-        requesting_user = User.query.get(requesting_user_id)
+        requesting_user = current_identity()
 
         user_to_delete = User.query.get(user_id)
 
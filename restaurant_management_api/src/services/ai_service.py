@@ -1,31 +1,32 @@
-import pandas as pd
-import numpy as np
-from sklearn.ensemble import RandomForestRegressor, IsolationForest
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-from sklearn.cluster import KMeans
-import joblib
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 import os
 import json
 
+# pandas, numpy, scikit-learn and joblib are imported inside the methods that use them:
+# together they take ~2 s and ~130 MB per process, which every gunicorn worker would
+# otherwise pay at boot whether or not anyone opens an AI page. The first AI request
+# in a worker pays the import instead (~1.4 s).
+if TYPE_CHECKING:
+    import pandas as pd
+
 class AIService:
     def __init__(self):
         self.sales_model = None
         self.inventory_model = None
         self.anomaly_detector = None
         self.customer_segmentation_model = None
-        self.scaler = StandardScaler()
+        self.scaler = None
         self.logger = logging.getLogger(__name__)
         
         # Create models directory if it doesn't exist
         self.models_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'models')
         os.makedirs(self.models_dir, exist_ok=True)
     
-    def prepare_sales_data(self, sales_data: List[Dict]) -> pd.DataFrame:
+    def prepare_sales_data(self, sales_data: List[Dict]) -> 'pd.DataFrame':
         """Prepare sales data for ML models"""
+        import pandas as pd
         if not sales_data:
             return pd.DataFrame()
             
@@ -42,6 +43,8 @@ class AIService:
     
     def train_sales_forecast_model(self, sales_data: List[Dict]) -> Dict:
         """Train sales forecasting model with all available data"""
+        from sklearn.ensemble import RandomForestRegressor
+        import joblib
         try:
             df = self.prepare_sales_data(sales_data)
             if df.empty:
@@ -118,6 +121,8 @@ class AIService:
 
     def predict_sales(self, days_ahead: int = 7) -> list:
         """Predict sales for next N days using Prophet if available, else RandomForest."""
+        import pandas as pd
+        import joblib
         try:
             # Try Prophet first
             sales_data = None
@@ -183,6 +188,7 @@ class AIService:
     
     def detect_anomalies(self, sales_data: List[Dict]) -> List[Dict]:
         """Detect anomalies in sales data"""
+        from sklearn.ensemble import IsolationForest
         try:
             df = self.prepare_sales_data(sales_data)
             if df.empty:
@@ -275,6 +281,8 @@ class AIService:
     
     def segment_customers(self, sales_data: List[Dict]) -> Dict:
         """Segment customers based on purchasing behavior"""
+        from sklearn.cluster import KMeans
+        from sklearn.preprocessing import StandardScaler
         try:
             df = self.prepare_sales_data(sales_data)
             
@@ -293,6 +301,8 @@ class AIService:
             features = customer_behavior[['total_spent', 'avg_order_value', 'order_count']].values
             
             # Normalize features
+            if self.scaler is None:
+                self.scaler = StandardScaler()
             features_scaled = self.scaler.fit_transform(features)
             
             # Perform clustering
@@ -330,6 +340,7 @@ class AIService:
     
     def _make_json_serializable(self, obj):
         """Recursively convert numpy/pandas types in obj to native Python types."""
+        import numpy as np
         if isinstance(obj, dict):
             return {self._make_json_serializable(k): self._make_json_serializable(v) for k, v in obj.items()}
         elif isinstance(obj, list):
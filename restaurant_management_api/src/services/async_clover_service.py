@@ -0,0 +1,264 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+
+from .clover_service import CloverConfig
+from .clover_stream import ORDER_FIELDS, project
+from ..utils.time_window import TimeWindow
+from ..utils.metrics import observe_clover_call
+
+logger = logging.getLogger(__name__)
+
+# Default per-request timeout for Clover calls (seconds)
+CLOVER_REQUEST_TIMEOUT = float(os.environ.get('CLOVER_REQUEST_TIMEOUT', 30))
+# Pages fetched concurrently per paginated listing
+CLOVER_PAGE_CONCURRENCY = int(os.environ.get('CLOVER_PAGE_CONCURRENCY', 4))
+# Upper bound for a whole sync-adapter call, including every page (seconds)
+CLOVER_CALL_TIMEOUT = float(os.environ.get('CLOVER_CALL_TIMEOUT', 120))
+
+PAGE_LIMIT = 100
+ORDER_EXPANDS = ['lineItems', 'lineItems.item', 'lineItems.item.categories']
+
+
+class AsyncCloverService:
+    """
+    asyncio Clover client (Read-Only) with the same listing surface as CloverService.
+
+    Paginated listings fetch CLOVER_PAGE_CONCURRENCY pages at a time; if any page
+    fails or the caller is cancelled, the remaining page requests are cancelled too.
+    Every request honours a per-request timeout, overridable per call.
+    """
+
+    def __init__(self, config: CloverConfig, timeout: float = CLOVER_REQUEST_TIMEOUT,
+                 page_concurrency: int = CLOVER_PAGE_CONCURRENCY):
+        self.config = config
+        self.timeout = timeout
+        self.page_concurrency = max(1, page_concurrency)
+        self.client = httpx.AsyncClient(
+            base_url=f"{config.api_base_url}/{config.api_version}/merchants/{config.merchant_id}/",
+            headers={
+                'Authorization': f'Bearer {config.access_token}',
+                'Content-Type': 'application/json'
+            },
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=config.pool_maxsize,
+                                max_keepalive_connections=config.pool_maxsize)
+        )
+        # Rate limiting: max 10 requests per second by default, shared by concurrent pages
+        self.min_request_interval = config.min_request_interval
+        self._last_request_time = 0
+        self._rate_lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """Close pooled connections held by this client"""
+        await self.client.aclose()
+
+    async def _rate_limit(self):
+        loop = asyncio.get_running_loop()
+        async with self._rate_lock:
+            wait = self._last_request_time + self.min_request_interval - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_request_time = loop.time()
+
+    async def _make_request(self, endpoint: str, params=None, timeout: Optional[float] = None) -> Dict:
+        """Make a rate-limited request to the Clover API, retrying once on 429"""
+        timeout = self.timeout if timeout is None else timeout
+        for attempt in range(2):
+            await self._rate_limit()
+            started = time.perf_counter()
+            response = await self.client.get(endpoint, params=params, timeout=timeout)
+            observe_clover_call(str(response.url), response.status_code, time.perf_counter() - started)
+            if response.status_code == 429 and attempt == 0:
+                logger.warning("Rate limit hit, waiting 1 second before retry")
+                await asyncio.sleep(1)
+                continue
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                logger.error(f"Clover API request failed: {e}")
+                logger.error(f"Response text: {e.response.text}")
+                raise
+            return response.json()
+
+    async def _paginate(self, endpoint: str, params: list, key: str = 'elements',
+                        timeout: Optional[float] = None) -> List[Dict]:
+        """Fetch every page of a listing, page_concurrency pages at a time"""
+        results = []
+        offset = 0
+        # Fetch the first page alone so small listings cost a single request
+        batch = 1
+        while True:
+            offsets = [offset + i * PAGE_LIMIT for i in range(batch)]
+            async with asyncio.TaskGroup() as group:
+                tasks = [
+                    group.create_task(self._make_request(
+                        endpoint,
+                        params=params + [('limit', PAGE_LIMIT), ('offset', page_offset)],
+                        timeout=timeout
+                    ))
+                    for page_offset in offsets
+                ]
+            # Pages are consumed in offset order; the first short page ends the listing
+            for task in tasks:
+                data = task.result()
+                elements = data.get(key, data.get('elements', []))
+                results.extend(elements)
+                if len(elements) < PAGE_LIMIT:
+                    return results
+            offset = offsets[-1] + PAGE_LIMIT
+            batch = self.page_concurrency
+
+    async def get_merchant_info(self, timeout: Optional[float] = None) -> Dict:
+        """Get merchant information"""
+        return await self._make_request('', timeout=timeout)
+
+    async def get_employees(self, timeout: Optional[float] = None) -> List[Dict]:
+        """Get all employees"""
+        return await self._paginate('employees', [], timeout=timeout)
+
+    async def get_categories(self, timeout: Optional[float] = None) -> List[Dict]:
+        """Get all categories"""
+        return await self._paginate('categories', [], timeout=timeout)
+
+    async def get_customers(self, timeout: Optional[float] = None) -> List[Dict]:
+        """Get all customers"""
+        return await self._paginate('customers', [], timeout=timeout)
+
+    async def get_items(self, category_id: str = None, timeout: Optional[float] = None) -> List[Dict]:
+        """Get all items, optionally filtered by category"""
+        params = [('expand', 'categories')]
+        if category_id:
+            params.append(('categoryId', category_id))
+        items = await self._paginate('items', params, timeout=timeout)
+        logger.info(f"Total items fetched from Clover: {len(items)}")
+        return items
+
+    async def get_orders(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                         limit: int = 100, timeout: Optional[float] = None,
+                         fields: Optional[Dict] = ORDER_FIELDS) -> List[Dict]:
+        """Get all orders from Clover for a date range (whole America/Chicago days), projected to `fields`"""
+        window = TimeWindow.for_days(start_date, end_date)
+        params = [('expand', expand) for expand in ORDER_EXPANDS]
+        params += [('filter', expression) for expression in window.clover_filters()]
+        orders = project(await self._paginate('orders', params, key='orders', timeout=timeout), fields)
+        logger.info(f"Fetched {len(orders)} orders from Clover for {self.config.merchant_id}")
+        return orders
+
+
+async def fetch_orders_for_merchants(configs: List[CloverConfig], start_date: Optional[datetime] = None,
+                                     end_date: Optional[datetime] = None, max_merchants: int = 10) -> Dict:
+    """
+    Fetch orders for many merchants from one event loop, at most max_merchants at a time.
+    Returns {merchant_id: orders} and {merchant_id: error message} for merchants that failed.
+    """
+    semaphore = asyncio.Semaphore(max_merchants)
+    results = {}
+    errors = {}
+
+    async def fetch(config):
+        async with semaphore:
+            async with AsyncCloverService(config) as client:
+                try:
+                    results[config.merchant_id] = await client.get_orders(start_date, end_date)
+                except (httpx.HTTPError, asyncio.TimeoutError) as e:
+                    logger.error(f"Order fetch failed for merchant {config.merchant_id}: {e}")
+                    errors[config.merchant_id] = str(e)
+
+    await asyncio.gather(*(fetch(config) for config in configs))
+    return {'orders': results, 'errors': errors}
+
+
+class _EventLoopThread:
+    """A single background event loop that sync code submits coroutines to"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+
+    def get_loop(self):
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=self._loop.run_forever, name='clover-async-loop', daemon=True)
+                thread.start()
+            return self._loop
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the background loop, cancelling it if the timeout expires"""
+        future = asyncio.run_coroutine_threadsafe(coro, self.get_loop())
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def reset(self):
+        """Forget the loop, e.g. in a freshly forked worker where its thread no longer exists"""
+        with self._lock:
+            self._loop = None
+
+
+# Create a global instance
+event_loop_thread = _EventLoopThread()
+
+
+class CloverSyncAdapter:
+    """
+    Blocking facade over AsyncCloverService for Flask routes.
+
+    Calls run on a shared background event loop, so concurrent pages are
+    fetched in parallel while the route keeps its synchronous shape. A call
+    that exceeds call_timeout is cancelled, which cancels its in-flight pages.
+    """
+
+    def __init__(self, config: CloverConfig, call_timeout: float = CLOVER_CALL_TIMEOUT):
+        self.config = config
+        self.call_timeout = call_timeout
+        self._client = event_loop_thread.run(self._create_client(config))
+
+    @staticmethod
+    async def _create_client(config):
+        # Created on the background loop so its connection pool belongs to that loop
+        return AsyncCloverService(config)
+
+    def _run(self, coro):
+        return event_loop_thread.run(coro, self.call_timeout)
+
+    def close(self):
+        """Close pooled connections held by the underlying client"""
+        try:
+            self._run(self._client.close())
+        except Exception as e:
+            logger.warning(f"Could not close async Clover client: {e}")
+
+    def get_merchant_info(self) -> Dict:
+        return self._run(self._client.get_merchant_info())
+
+    def get_employees(self) -> List[Dict]:
+        return self._run(self._client.get_employees())
+
+    def get_categories(self) -> List[Dict]:
+        return self._run(self._client.get_categories())
+
+    def get_customers(self) -> List[Dict]:
+        return self._run(self._client.get_customers())
+
+    def get_items(self, category_id: str = None) -> List[Dict]:
+        return self._run(self._client.get_items(category_id))
+
+    def get_orders(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                   limit: int = 100) -> List[Dict]:
+        return self._run(self._client.get_orders(start_date, end_date, limit))
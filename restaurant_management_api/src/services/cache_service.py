@@ -1,6 +1,10 @@
 from functools import wraps
 from flask import request, jsonify
 import logging
+import os
+import threading
+import time
+from ..utils.metrics import observe_cache
 
 class CacheService:
     def __init__(self):
@@ -16,6 +20,38 @@ class CacheService:
 # Create a global instance
 cache_service = CacheService()
 
+_redis_client = None
+_redis_checked = False
+_redis_lock = threading.Lock()
+
+def get_redis_client():
+    """
+    Return a shared Redis client built from REDIS_URL, or None when Redis is not
+    configured or unreachable. Callers must treat None as "single node mode".
+    """
+    global _redis_client, _redis_checked
+    if _redis_checked:
+        return _redis_client
+    with _redis_lock:
+        if _redis_checked:
+            return _redis_client
+        redis_url = os.environ.get('REDIS_URL')
+        if redis_url:
+            try:
+                import redis
+                if redis_url.startswith('rediss://'):
+                    client = redis.from_url(redis_url, ssl_cert_reqs=None)
+                else:
+                    client = redis.from_url(redis_url)
+                client.ping()
+                _redis_client = client
+                logging.info("Cache service connected to Redis")
+            except Exception as e:
+                logging.warning(f"Redis unavailable, falling back to in-process coordination: {e}")
+                _redis_client = None
+        _redis_checked = True
+    return _redis_client
+
 def cache_response(timeout=300, key_prefix='cache'):
     """
     Decorator to cache API responses
@@ -40,4 +76,165 @@ def invalidate_cache_on_data_change():
             # In a real implementation, you would invalidate relevant cache entries here
             return f(*args, **kwargs)
         return decorated_function
-    return decorator 
\ No newline at end of file
+    return decorator 
+
+
+class StaleWhileRevalidateCache:
+    """
+    In-process cache that serves expired entries immediately while a single
+    background refresh repopulates them.
+
+    - age < ttl: fresh, served as-is
+    - ttl <= age < max_staleness: served stale, one background refresh is started
+    - age >= max_staleness (or missing): loaded synchronously
+    An optional refresher thread reloads entries shortly before they expire so
+    requests rarely observe a stale entry at all. It drops entries nobody has
+    read for max_staleness instead, so keys that went idle (a tenant that
+    stopped opening inventory) stop being reloaded. A load or refresh that was
+    running when invalidate() was called returns its value but does not cache it.
+    """
+
+    def __init__(self, name, ttl, max_staleness, refresh_interval=None, refresh_ahead=0.8):
+        self.name = name
+        self.ttl = ttl
+        self.max_staleness = max(max_staleness, ttl)
+        self.refresh_interval = refresh_interval
+        self.refresh_ahead = refresh_ahead
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._refresher = None
+        # Advanced on every invalidation; a load that started before then is not cached
+        self._generation = 0
+        self._logger = logging.getLogger(__name__)
+
+    def get(self, key, loader):
+        """Return the cached value for key, using loader() to (re)populate it"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['loader'] = loader
+                entry['read_at'] = now
+        if entry is not None:
+            age = now - entry['fetched_at']
+            if age < self.ttl:
+                observe_cache(self.name, 'hit')
+                return entry['value']
+            if age < self.max_staleness:
+                observe_cache(self.name, 'stale')
+                self._logger.info(f"[{self.name}] Serving stale entry for {key} (age {age:.0f}s), refreshing in background")
+                self._refresh_async(key)
+                return entry['value']
+            self._logger.info(f"[{self.name}] Entry for {key} exceeded max staleness ({age:.0f}s), reloading synchronously")
+        observe_cache(self.name, 'miss')
+        return self._load(key, loader)
+
+    def invalidate(self, key=None):
+        """Drop one entry, or every entry when key is None"""
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def start_refresher(self):
+        """Start the proactive refresher thread (idempotent)"""
+        if not self.refresh_interval:
+            return
+        with self._lock:
+            if self._refresher is not None and self._refresher.is_alive():
+                return
+            self._refresher = threading.Thread(
+                target=self._refresh_loop, name=f"{self.name}-refresher", daemon=True
+            )
+            self._refresher.start()
+
+    def _load_lock(self, key):
+        with self._lock:
+            return self._load_locks.setdefault(key, threading.Lock())
+
+    def _load(self, key, loader):
+        # Only one synchronous load per key; concurrent callers reuse its result
+        started = time.monotonic()
+        with self._load_lock(key):
+            with self._lock:
+                entry = self._entries.get(key)
+                generation = self._generation
+            if entry is not None and entry['fetched_at'] >= started:
+                return entry['value']
+            value = loader()
+            now = time.monotonic()
+            with self._lock:
+                if self._generation != generation:
+                    return value
+                self._entries[key] = {
+                    'value': value,
+                    'fetched_at': now,
+                    'read_at': now,
+                    'loader': loader,
+                    'refreshing': False
+                }
+            return value
+
+    def _refresh_async(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['refreshing']:
+                return
+            entry['refreshing'] = True
+        threading.Thread(target=self._refresh, args=(key,), name=f"{self.name}-refresh", daemon=True).start()
+
+    def _refresh(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            loader = entry['loader'] if entry else None
+            generation = self._generation
+        if loader is None:
+            return
+        try:
+            value = loader()
+            with self._lock:
+                if self._generation != generation:
+                    # Invalidated mid-refresh; whatever is cached now is newer than this value
+                    current = self._entries.get(key)
+                    if current is entry:
+                        current['refreshing'] = False
+                    return
+                previous = self._entries.get(key)
+                self._entries[key] = {
+                    'value': value,
+                    'fetched_at': time.monotonic(),
+                    'read_at': previous['read_at'] if previous else time.monotonic(),
+                    'loader': loader,
+                    'refreshing': False
+                }
+            self._logger.info(f"[{self.name}] Background refresh completed for {key}")
+        except Exception as e:
+            self._logger.error(f"[{self.name}] Background refresh failed for {key}: {e}")
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry['refreshing'] = False
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            now = time.monotonic()
+            with self._lock:
+                idle = [key for key, entry in self._entries.items()
+                        if not entry['refreshing'] and now - entry['read_at'] >= self.max_staleness]
+                for key in idle:
+                    del self._entries[key]
+                    self._load_locks.pop(key, None)
+                due = [
+                    key for key, entry in self._entries.items()
+                    if not entry['refreshing'] and now - entry['fetched_at'] >= self.ttl * self.refresh_ahead
+                ]
+                for key in due:
+                    self._entries[key]['refreshing'] = True
+            if idle:
+                self._logger.info(f"[{self.name}] Dropped {len(idle)} entries idle for {self.max_staleness}s")
+            for key in due:
+                self._refresh(key)
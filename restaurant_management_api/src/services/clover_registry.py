@@ -0,0 +1,197 @@
+import logging
+import os
+import threading
+import time
+
+from flask import has_request_context, session
+
+from ..config import Config
+from .cache_service import get_redis_client
+from .clover_service import CloverService, CloverConfig
+
+logger = logging.getLogger(__name__)
+
+# Clients unused for this long are closed and dropped (seconds)
+CLOVER_CLIENT_IDLE_TTL = int(os.environ.get('CLOVER_CLIENT_IDLE_TTL', 900))
+# Connection pool size per merchant client
+CLOVER_POOL_MAXSIZE = int(os.environ.get('CLOVER_POOL_MAXSIZE', 10))
+# Redis key bumped when credentials change so other workers drop their clients
+CLOVER_CLIENTS_VERSION_KEY = 'plateiq_clover_clients_version'
+# How often a worker checks the shared version key (seconds)
+CLOVER_CLIENTS_VERSION_CHECK_INTERVAL = float(os.environ.get('CLOVER_CLIENTS_VERSION_CHECK_INTERVAL', 2))
+
+_GLOBAL = '__global__'
+
+
+class CloverClientRegistry:
+    """
+    One pooled CloverService per tenant.
+
+    Credentials come from the tenant row (clover_merchant_id/clover_access_token)
+    and fall back to the global CLOVER_MERCHANT_ID/CLOVER_ACCESS_TOKEN environment
+    variables for tenants without their own merchant. Each client keeps one
+    requests.Session with a tuned HTTPAdapter, so repeated calls for a merchant
+    reuse keep-alive connections. Clients idle longer than CLOVER_CLIENT_IDLE_TTL
+    are closed on the next lookup. invalidate() bumps a Redis version key, so other
+    workers drop their clients within CLOVER_CLIENTS_VERSION_CHECK_INTERVAL; without
+    Redis only the calling worker picks up new credentials before the idle TTL.
+    """
+
+    def __init__(self, idle_ttl=CLOVER_CLIENT_IDLE_TTL):
+        self.idle_ttl = idle_ttl
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._version = None
+        self._last_version_check = 0
+        # Advanced on every invalidation; a client built before then is not kept
+        self._generation = 0
+
+    def get(self, tenant_id=None):
+        """Return the pooled Clover client for a tenant (or the global merchant)"""
+        key = tenant_id or _GLOBAL
+        self._check_version()
+        now = time.monotonic()
+        with self._lock:
+            generation = self._generation
+            idle = self._pop_idle(now)
+            entry = self._clients.get(key)
+            if entry is not None:
+                entry['last_used'] = now
+        self._close_entries(idle)
+        if entry is not None:
+            return entry['client']
+
+        config = self._build_config(tenant_id)
+        client = CloverService(config)
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None:
+                # Another thread created it first; keep theirs
+                client.close()
+                entry['last_used'] = now
+                return entry['client']
+            if self._generation == generation:
+                self._clients[key] = {'client': client, 'last_used': now}
+        logger.info(f"Created pooled Clover client for {key} (merchant {config.merchant_id})")
+        return client
+
+    def get_async(self, tenant_id=None):
+        """Return the pooled sync adapter over the async Clover client for a tenant"""
+        from .async_clover_service import CloverSyncAdapter
+        key = ('async', tenant_id or _GLOBAL)
+        self._check_version()
+        now = time.monotonic()
+        with self._lock:
+            generation = self._generation
+            idle = self._pop_idle(now)
+            entry = self._clients.get(key)
+            if entry is not None:
+                entry['last_used'] = now
+        self._close_entries(idle)
+        if entry is not None:
+            return entry['client']
+
+        client = CloverSyncAdapter(self._build_config(tenant_id))
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None:
+                client.close()
+                entry['last_used'] = now
+                return entry['client']
+            if self._generation == generation:
+                self._clients[key] = {'client': client, 'last_used': now}
+        return client
+
+    def invalidate(self, tenant_id=None):
+        """Drop a tenant's client, e.g. after its credentials change; other workers are told through Redis"""
+        key = tenant_id or _GLOBAL
+        with self._lock:
+            self._generation += 1
+            entries = [self._clients.pop(k, None) for k in (key, ('async', key))]
+        self._close_entries(entries)
+        redis_client = get_redis_client()
+        if redis_client is not None:
+            try:
+                version = redis_client.incr(CLOVER_CLIENTS_VERSION_KEY)
+                with self._lock:
+                    self._version = int(version)
+                    self._last_version_check = time.monotonic()
+            except Exception as e:
+                logger.warning(f"Could not bump Clover client version: {e}")
+
+    def clear(self):
+        """Close and drop every client"""
+        with self._lock:
+            entries = list(self._clients.values())
+            self._clients.clear()
+        self._close_entries(entries)
+
+    def _check_version(self):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_version_check < CLOVER_CLIENTS_VERSION_CHECK_INTERVAL:
+                return
+            self._last_version_check = now
+        redis_client = get_redis_client()
+        if redis_client is None:
+            return
+        try:
+            raw = redis_client.get(CLOVER_CLIENTS_VERSION_KEY)
+            version = int(raw) if raw is not None else 0
+        except Exception as e:
+            logger.warning(f"Could not read Clover client version: {e}")
+            return
+        entries = []
+        with self._lock:
+            if version != self._version:
+                # The key does not say which tenant changed, so rebuild every client
+                if self._version is not None:
+                    entries = list(self._clients.values())
+                    self._clients.clear()
+                self._generation += 1
+                self._version = version
+        self._close_entries(entries)
+
+    def _pop_idle(self, now):
+        """Remove idle clients; the caller holds the lock and closes them after releasing it"""
+        idle = []
+        for key in [k for k, e in self._clients.items() if now - e['last_used'] > self.idle_ttl]:
+            idle.append(self._clients.pop(key))
+            logger.info(f"Evicted idle Clover client for {key}")
+        return idle
+
+    @staticmethod
+    def _close_entries(entries):
+        # Closing can block on in-flight connections, so never do it under the lock
+        for entry in entries:
+            if entry is not None:
+                entry['client'].close()
+
+    @staticmethod
+    def _build_config(tenant_id):
+        merchant_id = os.getenv('CLOVER_MERCHANT_ID', '')
+        access_token = os.getenv('CLOVER_ACCESS_TOKEN', '')
+        if tenant_id:
+            from ..models.tenant import Tenant
+            tenant = Tenant.query.get(tenant_id)
+            if tenant is not None and tenant.has_clover_credentials:
+                merchant_id = tenant.clover_merchant_id
+                access_token = tenant.clover_access_token
+        return CloverConfig(
+            merchant_id=merchant_id,
+            access_token=access_token,
+            api_base_url=Config.CLOVER_API_BASE_URL,
+            pool_maxsize=CLOVER_POOL_MAXSIZE,
+            min_request_interval=Config.CLOVER_MIN_REQUEST_INTERVAL
+        )
+
+
+def current_tenant_id():
+    """Tenant of the logged-in user, or None outside a request / for super admins"""
+    if has_request_context():
+        return session.get('tenant_id')
+    return None
+
+
+# Create a global instance
+clover_registry = CloverClientRegistry()
@@ -1,8 +1,9 @@
 import requests
+from requests.adapters import HTTPAdapter
 import logging
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 import json
 from dataclasses import dataclass
 from src.models import db
@@ -10,6 +11,9 @@ from src.models.sale import Sale
 from src.models.item import Item
 from src.models.user import User
 from src.models.chef_dish_mapping import ChefDishMapping
+from src.utils.time_window import TimeWindow
+from src.utils.metrics import clover_response_hook, observe_throughput
+from src.services.clover_stream import ORDER_FIELDS, ORDER_HEADER_FIELDS, STREAM_CHUNK_SIZE, iter_json_array, project
 import os
 import urllib.parse
 import pytz
@@ -23,6 +27,9 @@ class CloverConfig:
     access_token: str
     api_base_url: str = "https://api.clover.com"
     api_version: str = "v3"
+    pool_connections: int = 4
+    pool_maxsize: int = 10
+    min_request_interval: float = 0.1
 
 class CloverService:
     """Service for integrating with Clover POS system (Read-Only)"""
@@ -30,13 +37,24 @@ class CloverService:
     def __init__(self, config: CloverConfig):
         self.config = config
         self.session = requests.Session()
+        # Reuse TCP/TLS connections to api.clover.com across requests
+        adapter = HTTPAdapter(pool_connections=config.pool_connections, pool_maxsize=config.pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.session.headers.update({
             'Authorization': f'Bearer {config.access_token}',
-            'Content-Type': 'application/json'
+            'Content-Type': 'application/json',
+            'Connection': 'keep-alive'
         })
-        # Rate limiting: max 10 requests per second
+        # Per-endpoint call counts, latencies and 429s for /metrics
+        self.session.hooks['response'].append(clover_response_hook)
+        # Rate limiting: at most one request per min_request_interval (CLOVER_MIN_REQUEST_INTERVAL)
         self.last_request_time = 0
-        self.min_request_interval = 0.1  # 100ms between requests
+        self.min_request_interval = config.min_request_interval
+    
+    def close(self):
+        """Close pooled connections held by this client"""
+        self.session.close()
     
     def _rate_limit(self):
         """Implement rate limiting to avoid 429 errors"""
@@ -57,7 +75,7 @@ class CloverService:
             if data:
                 req = requests.Request('GET', url, params=data)
                 prepped = self.session.prepare_request(req)
-                logger.info(f"Final Clover URL: {prepped.url}")
+                logger.debug("Final Clover URL: %s", prepped.url)
                 response = self.session.send(prepped)
             else:
                 response = self.session.get(url)
@@ -73,7 +91,7 @@ class CloverService:
                 if data:
                     req = requests.Request('GET', url, params=data)
                     prepped = self.session.prepare_request(req)
-                    logger.info(f"Final Clover URL: {prepped.url}")
+                    logger.debug("Final Clover URL: %s", prepped.url)
                     response = self.session.send(prepped)
                 else:
                     response = self.session.get(url)
@@ -121,49 +139,27 @@ class CloverService:
         logger.info(f"Total items fetched from Clover: {len(all_items)}")
         return all_items
     
-    def get_orders(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None, limit: int = 100) -> list:
+    def get_orders(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None, limit: int = 100,
+                   fields: Optional[Dict] = ORDER_FIELDS) -> list:
         """Get all orders from Clover for a date range, with pagination and filtering."""
-        # Always set start_date to midnight and end_date to end of day in America/Chicago
-        if start_date:
-            central = pytz.timezone('America/Chicago')
-            start_date = start_date.astimezone(central).replace(hour=0, minute=0, second=0, microsecond=0)
-        if end_date:
-            central = pytz.timezone('America/Chicago')
-            end_date = end_date.astimezone(central).replace(hour=23, minute=59, second=59, microsecond=999000)
-        # If start_date and end_date are the same day, ensure end_date is end of that day
-        if start_date and end_date and start_date.date() == end_date.date():
-            end_date = start_date.replace(hour=23, minute=59, second=59, microsecond=999000)
-        if not start_date and not end_date:
-            start_date = datetime.now() - timedelta(days=30)
-            end_date = datetime.now()
-        elif not start_date:
-            start_date = end_date - timedelta(days=30)
-
-        # Log the local and UTC times for debugging
-        if start_date:
-            central = pytz.timezone('America/Chicago')
-            start_local = start_date.astimezone(central)
-            start_utc = start_local.astimezone(pytz.utc)
-            logging.info(f"Clover order fetch: start_date Chicago={start_local}, UTC={start_utc}, ms={int(start_utc.timestamp() * 1000)}")
-        if end_date:
-            central = pytz.timezone('America/Chicago')
-            end_local = end_date.astimezone(central)
-            end_utc = end_local.astimezone(pytz.utc)
-            logging.info(f"Clover order fetch: end_date Chicago={end_local}, UTC={end_utc}, ms={int(end_utc.timestamp() * 1000)}")
-
-        # Convert to UTC if not already
-        central = pytz.timezone('America/Chicago')
-        if start_date:
-            start_date = start_date.astimezone(pytz.utc)
-        if end_date:
-            end_date = end_date.astimezone(pytz.utc)
+        return list(self.iter_orders(start_date, end_date, fields=fields))
+    
+    def iter_orders(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                    fields: Optional[Dict] = ORDER_FIELDS) -> Iterator[Dict]:
+        """
+        Yield orders for a date range one at a time.
+        
+        Each page is streamed and decoded order by order, and only `fields`
+        (ORDER_FIELDS by default, None for the raw order) are kept, so memory
+        stays flat regardless of how many orders the range holds.
+        """
+        window = TimeWindow.for_days(start_date, end_date)
+        logger.debug("Clover order fetch window: %s (ms %s - %s)", window, window.start_ms, window.end_ms)
 
         base_url = f"{self.config.api_base_url}/{self.config.api_version}/merchants/{self.config.merchant_id}/orders"
-        all_orders = []
+        total = 0
         offset = 0
         page_limit = 100
-        start_ms = int(start_date.timestamp() * 1000)
-        end_ms = int(end_date.timestamp() * 1000)
         
         while True:
             # Build URL with multiple filter parameters (not comma-separated)
@@ -172,28 +168,28 @@ class CloverService:
                 f"offset={offset}",
                 "expand=lineItems",
                 "expand=lineItems.item",
-                "expand=lineItems.item.categories",
-                f"filter=createdTime>={start_ms}",
-                f"filter=createdTime<={end_ms}"
-            ]
+                "expand=lineItems.item.categories"
+            ] + [f"filter={expression}" for expression in window.clover_filters()]
             url = f"{base_url}?{'&'.join(params)}"
-            logger.info(f"Debug Clover Orders URL (offset={offset}): {url}")
+            logger.debug("Clover Orders URL (offset=%s): %s", offset, url)
+            page_count = 0
             try:
                 self._rate_limit()
-                response = self.session.get(url, headers={
-                    "Authorization": f"Bearer {self.config.access_token}",
-                    "Content-Type": "application/json"
-                })
-                logger.info(f"Clover Orders Response (offset={offset}): {response.status_code}")
-                response.raise_for_status()
-                data = response.json()
-                orders = data.get('orders', data.get('elements', []))
-                if not orders:
+                with self.session.get(url, stream=True) as response:
+                    logger.info(f"Clover Orders Response (offset={offset}): {response.status_code}")
+                    response.raise_for_status()
+                    chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+                    for order in iter_json_array(chunks, keys=('orders', 'elements')):
+                        page_count += 1
+                        # Clover applies the window server-side; this integer check only guards the edges
+                        if window.contains(order.get('createdTime')):
+                            yield project(order, fields)
+                if not page_count:
                     logger.info(f"No more orders found at offset {offset}.")
                     break
-                all_orders.extend(orders)
-                logger.info(f"Fetched {len(orders)} orders at offset {offset} (total so far: {len(all_orders)})")
-                if len(orders) < page_limit:
+                total += page_count
+                logger.info(f"Fetched {page_count} orders at offset {offset} (total so far: {total})")
+                if page_count < page_limit:
                     logger.info(f"Last page reached at offset {offset}.")
                     break
                 offset += page_limit
@@ -204,19 +200,6 @@ class CloverService:
             except Exception as e:
                 logger.error(f"Unexpected error in get_orders at offset {offset}: {e}")
                 break
-
-        # When filtering orders after fetching, ensure order_date is in America/Chicago and inclusive
-        filtered_orders = []
-        for order in all_orders:
-            order_time_ms = int(order.get('createdTime', 0))
-            order_dt_utc = datetime.utcfromtimestamp(order_time_ms / 1000).replace(tzinfo=pytz.utc)
-            order_dt_central = order_dt_utc.astimezone(central)
-            if start_date <= order_dt_central <= end_date:
-                logging.info(f"Including order {order.get('id')} with local date {order_dt_central.date()} and time {order_dt_central}")
-                filtered_orders.append(order)
-        orders = filtered_orders
-
-        return orders
     
     def get_order_details(self, order_id: str) -> Dict:
         """Get detailed order information including line items"""
@@ -283,16 +266,23 @@ class CloverService:
                 category = elements[0].get('name', 'Uncategorized')
         return category
     
-    def sync_sales_data(self, start_date: datetime = None, end_date: datetime = None) -> Dict:
-        """Sync sales data from Clover to local database (Read-Only) with robust logging"""
+    def sync_sales_data(self, start_date: datetime = None, end_date: datetime = None, tenant_id: str = None) -> Dict:
+        """
+        Sync sales data from Clover to local database (Read-Only) with robust logging.
+        Only the tenant's own items and chef mappings are matched, and new sales are stored under tenant_id.
+        Without a tenant (API-key syncs of a single-restaurant setup) every row is matched, as before
+        tenants existed. Clover ids are unique across tenants, so a sale already stored for another
+        tenant is skipped rather than duplicated.
+        """
         if not start_date:
             start_date = datetime.now() - timedelta(days=30)
         if not end_date:
             end_date = datetime.now()
         
+        started = time.perf_counter()
         try:
-            # Get orders from Clover
-            orders = self.get_orders(start_date, end_date)
+            # Stream orders from Clover; line items are fetched per order below, so keep only the header fields
+            orders = self.iter_orders(start_date, end_date, fields=ORDER_HEADER_FIELDS)
             
             synced_count = 0
             error_count = 0
@@ -304,11 +294,17 @@ class CloverService:
             total_processed = 0
             
             # Build item and chef mappings for logging
-            item_id_map = {item.clover_id: item.id for item in db.session.query(Item).all()}
-            chef_mappings = db.session.query(ChefDishMapping).all()
+            items = db.session.query(Item)
+            chef_mappings = db.session.query(ChefDishMapping)
+            if tenant_id is not None:
+                items = items.filter(Item.tenant_id == tenant_id)
+                chef_mappings = chef_mappings.filter(ChefDishMapping.tenant_id == tenant_id)
+            item_id_map = {item.clover_id: item.id for item in items}
             item_to_chef = {mapping.item_id: mapping.chef_id for mapping in chef_mappings}
             
             for order in orders:
+                # Counted once the order's sales are committed
+                order_synced = 0
                 try:
                     # Get detailed order information
                     order_details = self.get_order_details(order['id'])
@@ -330,7 +326,8 @@ class CloverService:
                             'discounts': float(line_item.get('discounts', {}).get('total', 0)) / 100,
                             'tax_amount': float(line_item.get('taxRates', {}).get('total', 0)) / 100,
                             'item_total_with_tax': float(line_item.get('total', 0)) / 100,
-                            'payment_state': order.get('state', 'unknown')
+                            'payment_state': order.get('state', 'unknown'),
+                            'tenant_id': tenant_id
                         }
                         clover_item_id = sale_data['item_id']
                         item_name = line_item.get('item', {}).get('name', 'Unknown')
@@ -339,14 +336,14 @@ class CloverService:
                             skipped_count += 1
                             skipped_reasons.setdefault('zero_quantity', 0)
                             skipped_reasons['zero_quantity'] += 1
-                            logger.info(f"Skipped sale (zero quantity): {sale_data}")
+                            logger.info("Skipped sale (zero quantity): %s", sale_data)
                             continue
                         # Skip if total_revenue is 0
                         if sale_data['total_revenue'] == 0:
                             skipped_count += 1
                             skipped_reasons.setdefault('zero_revenue', 0)
                             skipped_reasons['zero_revenue'] += 1
-                            logger.info(f"Skipped sale (zero revenue): {sale_data}")
+                            logger.info("Skipped sale (zero revenue): %s", sale_data)
                             continue
                         # Check if item is mapped in local DB
                         local_item_id = item_id_map.get(clover_item_id)
@@ -355,7 +352,7 @@ class CloverService:
                             skipped_reasons.setdefault('unmapped_item', 0)
                             skipped_reasons['unmapped_item'] += 1
                             unmapped_items.add(f"{clover_item_id}:{item_name}")
-                            logger.info(f"Skipped sale (unmapped item): clover_id {clover_item_id}, name '{item_name}'")
+                            logger.info("Skipped sale (unmapped item): clover_id %s, name '%s'", clover_item_id, item_name)
                             continue
                         # Check if item is mapped to a chef
                         chef_id = item_to_chef.get(local_item_id)
@@ -364,15 +361,23 @@ class CloverService:
                             skipped_reasons.setdefault('not_mapped_to_chef', 0)
                             skipped_reasons['not_mapped_to_chef'] += 1
                             not_mapped_to_chef.add(f"{clover_item_id}:{item_name}")
-                            logger.info(f"Skipped sale (item not mapped to chef): clover_id {clover_item_id}, name '{item_name}'")
+                            logger.info("Skipped sale (item not mapped to chef): clover_id %s, name '%s'", clover_item_id, item_name)
                             continue
-                        # Check if sale already exists
+                        # Check if sale already exists (clover_id is unique across all tenants)
                         existing_sale = db.session.query(Sale).filter_by(clover_id=sale_data['clover_id']).first()
+                        if existing_sale and tenant_id is not None and existing_sale.tenant_id != tenant_id:
+                            skipped_count += 1
+                            skipped_reasons.setdefault('other_tenant', 0)
+                            skipped_reasons['other_tenant'] += 1
+                            logger.warning("Skipped sale (stored for another tenant): clover_id %s", sale_data['clover_id'])
+                            continue
                         if not existing_sale:
+                            sale_data['item_id'] = local_item_id
                             sale = Sale(**sale_data)
                             db.session.add(sale)
-                            synced_count += 1
+                            order_synced += 1
                     db.session.commit()
+                    synced_count += order_synced
                 except Exception as e:
                     logger.error(f"Error syncing order {order['id']}: {e}")
                     error_count += 1
@@ -387,6 +392,7 @@ class CloverService:
             if not_mapped_to_chef:
                 logger.info(f"Items not mapped to chef: {sorted(not_mapped_to_chef)}")
             logger.info(f"Total errors: {error_count}")
+            observe_throughput('clover_sales_sync', total_processed, time.perf_counter() - started)
             return {
                 'status': 'success',
                 'synced_count': synced_count,
@@ -404,25 +410,34 @@ class CloverService:
                 'message': str(e)
             }
     
-    def sync_inventory_data(self) -> Dict:
-        """Sync inventory data from Clover to local database (Read-Only)"""
+    def sync_inventory_data(self, tenant_id: str = None) -> Dict:
+        """
+        Sync inventory data from Clover into the tenant's local items (Read-Only).
+        Without a tenant every item is matched; items stored for another tenant are skipped.
+        """
+        started = time.perf_counter()
         try:
             inventory_data = self.get_inventory_levels()
             
             updated_count = 0
             created_count = 0
+            skipped_count = 0
+            error_count = 0
             
             for item_data in inventory_data:
                 try:
-                    # Check if item exists in local database
+                    # Check if item exists in local database (clover_id is unique across all tenants)
                     existing_item = db.session.query(Item).filter_by(clover_id=item_data['item_id']).first()
                     
+                    if existing_item and tenant_id is not None and existing_item.tenant_id != tenant_id:
+                        logger.warning(f"Skipping item {item_data['item_id']}: stored for another tenant")
+                        skipped_count += 1
+                        continue
                     if existing_item:
                         # Update existing item
                         existing_item.quantity = item_data['current_stock']
                         existing_item.reorder_point = item_data['reorder_point']
                         existing_item.updated_at = datetime.utcnow()
-                        updated_count += 1
                     else:
                         # Create new item in local database
                         new_item = Item(
@@ -431,21 +446,29 @@ class CloverService:
                             category=item_data['category'],
                             quantity=item_data['current_stock'],
                             reorder_point=item_data['reorder_point'],
-                            is_active=True
+                            is_active=True,
+                            tenant_id=tenant_id
                         )
                         db.session.add(new_item)
-                        created_count += 1
                     
                     db.session.commit()
+                    if existing_item:
+                        updated_count += 1
+                    else:
+                        created_count += 1
                     
                 except Exception as e:
                     logger.error(f"Error syncing item {item_data['item_id']}: {e}")
                     db.session.rollback()
+                    error_count += 1
             
+            observe_throughput('clover_inventory_sync', len(inventory_data), time.perf_counter() - started)
             return {
                 'status': 'success',
                 'updated_count': updated_count,
                 'created_count': created_count,
+                'skipped_count': skipped_count,
+                'error_count': error_count,
                 'total_items': len(inventory_data)
             }
             
@@ -464,8 +487,15 @@ class CloverService:
             today_start = datetime.combine(today, datetime.min.time())
             today_end = datetime.combine(today, datetime.max.time())
             
-            # Get today's orders
-            today_orders = self.get_orders(today_start, today_end)
+            # Stream today's orders, keeping only the totals and the first 10 for the payload
+            total_sales = 0
+            order_count = 0
+            recent_orders = []
+            for order in self.iter_orders(today_start, today_end):
+                total_sales += order.get('total', 0)
+                order_count += 1
+                if len(recent_orders) < 10:
+                    recent_orders.append(order)
             
             # Get inventory levels
             inventory = self.get_inventory_levels()
@@ -474,8 +504,6 @@ class CloverService:
             employees = self.get_employees()
             
             # Calculate metrics
-            total_sales = sum(order.get('total', 0) for order in today_orders)
-            order_count = len(today_orders)
             low_stock_items = [item for item in inventory if item.get('current_stock', 0) < 10]
             
             return {
@@ -484,7 +512,7 @@ class CloverService:
                 'total_employees': len(employees),
                 'low_stock_items': len(low_stock_items),
                 'last_updated': datetime.now().isoformat(),
-                'orders': today_orders[:10],  # Limit to 10 most recent
+                'orders': recent_orders,  # Limit to 10 most recent
                 'inventory_alerts': low_stock_items[:5]  # Top 5 low stock items
             }
         except Exception as e:
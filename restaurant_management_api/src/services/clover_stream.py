@@ -0,0 +1,96 @@
+import codecs
+import json
+import re
+from typing import Dict, Iterable, Iterator, Optional
+
+# Read size for streamed Clover responses (bytes)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Fields of an expanded Clover order that the dashboard, reports and sync read.
+# A dict maps a key to the projection of its value; None keeps the value as-is.
+# Lists are projected element-wise.
+ORDER_FIELDS = {
+    'id': None,
+    'createdTime': None,
+    'modifiedTime': None,
+    'clientCreatedTime': None,
+    'total': None,
+    'state': None,
+    'paymentState': None,
+    'currency': None,
+    'title': None,
+    'employee': {'id': None, 'name': None},
+    'lineItems': {
+        'elements': {
+            'id': None,
+            'name': None,
+            'price': None,
+            'quantity': None,
+            'unitQty': None,
+            'total': None,
+            'modifications': None,
+            'discounts': None,
+            'taxRates': None,
+            'item': {
+                'id': None,
+                'name': None,
+                'categories': {'elements': {'id': None, 'name': None}}
+            }
+        }
+    }
+}
+
+# Order fields without line items, for callers that fetch line items separately
+ORDER_HEADER_FIELDS = {key: sub for key, sub in ORDER_FIELDS.items() if key != 'lineItems'}
+
+
+def project(value, fields: Optional[Dict]):
+    """Keep only the given fields of a decoded JSON value"""
+    if fields is None:
+        return value
+    if isinstance(value, list):
+        return [project(v, fields) for v in value]
+    if not isinstance(value, dict):
+        return value
+    return {key: project(value[key], sub) for key, sub in fields.items() if key in value}
+
+
+def iter_json_array(chunks: Iterable[bytes], keys=('elements',)) -> Iterator:
+    """
+    Incrementally decode the array stored under one of `keys` in a JSON object
+    and yield its elements one at a time.
+
+    Only the element being decoded (plus one read chunk) is held in memory, so
+    a page of expanded orders never exists as a whole parsed document.
+    """
+    array_start = re.compile(r'"(?:%s)"\s*:\s*\[' % '|'.join(re.escape(k) for k in keys))
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    in_array = False
+
+    for chunk in chunks:
+        buffer += text_decoder.decode(chunk)
+        if not in_array:
+            match = array_start.search(buffer)
+            if not match:
+                continue
+            buffer = buffer[match.end():]
+            in_array = True
+        while True:
+            buffer = buffer.lstrip(' \t\r\n,')
+            if buffer.startswith(']'):
+                return
+            if not buffer:
+                break
+            try:
+                element, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                # Element continues in the next chunk
+                break
+            yield element
+            buffer = buffer[end:]
+
+    buffer += text_decoder.decode(b'', final=True)
+    if in_array and buffer.strip():
+        raise ValueError("Truncated JSON array in Clover response")
@@ -4,19 +4,32 @@ from sqlalchemy import func, and_, or_
 from ..models import db, Sale, Expense, Item, Chef, ChefDishMapping, UncategorizedItem, FileUpload
 import logging
 from flask import current_app
-from .clover_service import CloverService, CloverConfig
-import os
+from .clover_registry import clover_registry, current_tenant_id
+from .single_flight import single_flight
+from .cache_service import StaleWhileRevalidateCache
+from .data_source_cache import data_source_config_cache
+from .data_version import data_versions, ALL_TENANTS
+from ..utils.time_window import BUSINESS_TZ, TimeWindow
+from ..utils.logger import lazy_json
+from ..config import Config
 import json
 from src.models.data_source_config import DataSourceConfig
 import pytz  # Add this import at the top if not present
 
+# Shared across every DashboardService instance so the dashboard, inventory and
+# AI blueprints (and /api/clover/clear-cache) all see the same Clover inventory
+_clover_inventory_cache = StaleWhileRevalidateCache(
+    'clover-inventory',
+    ttl=Config.CLOVER_CACHE_TTL,
+    max_staleness=Config.CLOVER_CACHE_MAX_STALENESS,
+    refresh_interval=Config.CLOVER_CACHE_REFRESH_INTERVAL
+)
+
+# Items with fewer units than this count as low stock on the overview
+LOW_STOCK_THRESHOLD = 10
+
 class DashboardService:
     def __init__(self):
-        clover_config = CloverConfig(
-            merchant_id=os.getenv('CLOVER_MERCHANT_ID', ''),
-            access_token=os.getenv('CLOVER_ACCESS_TOKEN', '')
-        )
-        self.clover_service = CloverService(clover_config)
         # Configuration for data sources
         self.data_sources = {
             'sales': 'clover',  # 'clover' or 'local'
@@ -27,25 +40,25 @@ class DashboardService:
         
         # Log the configuration
         self.log_data_source_config()
-        # In-memory cache for Clover inventory
-        self._clover_inventory_cache = None
-        self._clover_inventory_cache_time = 0
-        self._clover_inventory_cache_ttl = 600  # 10 minutes
+        # Stale-while-revalidate cache for Clover inventory
+        self._clover_inventory_cache = _clover_inventory_cache
+    
+    @property
+    def clover_service(self):
+        """Pooled Clover client for the current request's tenant (global merchant outside a request)"""
+        return clover_registry.get(current_tenant_id())
     
     def get_data_source(self, data_type, tenant_id=None):
         if data_type == 'inventory':
             return 'clover'
-        # Try DB config first
-        config = None
-        if tenant_id:
-            config = DataSourceConfig.query.filter_by(tenant_id=tenant_id, data_type=data_type).first()
-        if not config:
-            config = DataSourceConfig.query.filter_by(tenant_id=None, data_type=data_type).first()
-        if config:
-            return config.source
+        # Try DB config first (served from the versioned per-tenant snapshot)
+        source = data_source_config_cache.get_source(data_type, tenant_id)
+        if source:
+            return source
         # Fallback to in-memory config for backward compatibility
         return self.data_sources.get(data_type, 'local')
     
+    @single_flight()
     def get_sales_summary(self, start_date=None, end_date=None, category=None):
         """Get sales summary from configured data source"""
         try:
@@ -62,7 +75,7 @@ class DashboardService:
                 logging.info("Successfully called _get_local_sales_summary")
             
             # Extra logging for debugging
-            logging.info(f"Sales summary result: {json.dumps(result, default=str)}")
+            logging.debug("Sales summary result: %s", lazy_json(result))
             return result
         except Exception as e:
             logging.error(f"Exception in get_sales_summary: {str(e)}")
@@ -81,15 +94,16 @@ class DashboardService:
         else:
             result = self._get_local_inventory_data()
         
-        logging.info(f"Inventory data result: {json.dumps(result, default=str)}")
+        logging.debug("Inventory data result: %s", lazy_json(result))
         return result
     
     def get_expenses_data(self, start_date=None, end_date=None):
         """Get expenses data (always from local database)"""
         result = self._get_local_expenses_data(start_date, end_date)
-        logging.info(f"Expenses data result: {json.dumps(result, default=str)}")
+        logging.debug("Expenses data result: %s", lazy_json(result))
         return result
     
+    @single_flight()
     def get_chef_performance_data(self, start_date=None, end_date=None, chef_ids=None):
         """
         Get chef performance data using the configured data source.
@@ -116,35 +130,23 @@ class DashboardService:
             print(f"Local DB result: {result}")
             return result
     
+    def _iter_clover_orders(self, start_date=None, end_date=None):
+        """
+        Stream Clover orders for a date range, already restricted to its TimeWindow.
+        Consume it once: orders are decoded page by page and never held as a list.
+        """
+        return self.clover_service.iter_orders(start_date, end_date)
+
     def _get_clover_sales_summary(self, start_date=None, end_date=None, category=None):
         """Get sales summary from Clover API"""
         try:
             logging.info("Attempting to get sales data from Clover...")
-            # Get orders from Clover
-            orders_response = self.clover_service.get_orders(start_date, end_date)
-            logging.info(f"Retrieved orders response from Clover: {type(orders_response)}")
-            # Handle different response formats from Clover API
-            if isinstance(orders_response, dict):
-                orders = orders_response.get('orders', [])  # Use 'orders' key, not 'elements'
-            elif isinstance(orders_response, list):
-                orders = orders_response
-            else:
-                logging.warning(f"Unexpected orders response format: {type(orders_response)}")
-                orders = []
-            logging.info(f"Retrieved {len(orders) if orders else 0} orders from Clover")
-            if not orders:
-                logging.warning("No orders found in Clover, returning empty summary")
-                return self._empty_sales_summary()
-            # Filter by date range if provided
-            if start_date or end_date:
-                orders = self._filter_orders_by_date(orders, start_date, end_date)
-                logging.info(f"After date filtering: {len(orders)} orders")
             # Parse category filter as list
             category_list = None
             if category and category != 'all':
                 category_list = [c.strip() for c in category.split(',') if c.strip()]
-            # Process orders and apply category filter
-            return self._process_clover_orders(orders, category_list)
+            # Process orders as they stream in and apply category filter
+            return self._process_clover_orders(self._iter_clover_orders(start_date, end_date), category_list)
         except Exception as e:
             logging.error(f"Exception in _get_clover_sales_summary: {str(e)}")
             import traceback
@@ -152,48 +154,50 @@ class DashboardService:
             return self._empty_sales_summary()
     
     def _get_clover_inventory_data(self, inventory_enabled=True):
-        """Get inventory data from Clover API, mapping categories by item ID using item category IDs."""
+        """Get inventory data from Clover API, serving stale data while a background refresh runs."""
         try:
-            now = time.time()
-            if (
-                self._clover_inventory_cache is not None and
-                (now - self._clover_inventory_cache_time) < self._clover_inventory_cache_ttl
-            ):
-                logging.info("Using cached Clover inventory data.")
-                return self._clover_inventory_cache
-            logging.info("Refreshing Clover inventory cache...")
-            
-            # For tenants without inventory management, get items without stockCount
-            if not inventory_enabled:
-                logging.info("Tenant has no inventory management - skipping stockCount/quantity")
-                # Get items directly without inventory levels
-                items = self.clover_service.get_items()
-                logging.info(f"Retrieved {len(items) if items else 0} items from Clover (no inventory)")
-                
-                # Process items without stockCount
-                inventory_data = self._process_clover_items_no_inventory(items)
-                logging.info(f"Processed inventory data: {inventory_data.get('total', 0)} items")
-                self._clover_inventory_cache = inventory_data
-                self._clover_inventory_cache_time = now
-                return inventory_data
-            
-            # Step 1: Fetch all categories and build id->name mapping
-            categories = self.clover_service.get_categories()
-            cat_id_to_name = {cat.get('id'): cat.get('name', 'Uncategorized') for cat in categories if cat.get('id')}
-            # Step 2: Fetch all items (all pages)
-            items = self.clover_service.get_items()
-            logging.info(f"Retrieved {len(items) if items else 0} items from Clover")
-            # Step 3: Process items, using the mapping
-            inventory_data = self._process_clover_items(items, cat_id_to_name)
-            logging.info(f"Processed inventory data: {inventory_data.get('total', 0)} items")
-            self._clover_inventory_cache = inventory_data
-            self._clover_inventory_cache_time = now
-            return inventory_data
+            tenant_id = current_tenant_id()
+            cache_key = (tenant_id, 'inventory' if inventory_enabled else 'inventory_no_stock')
+            # Bind the tenant's client now: background refreshes run outside the request
+            clover_service = self.clover_service
+            self._clover_inventory_cache.start_refresher()
+            return self._clover_inventory_cache.get(
+                cache_key,
+                lambda: self._fetch_clover_inventory_data(inventory_enabled, clover_service)
+            )
         except Exception as e:
             logging.error(f"Error getting Clover inventory data: {str(e)}")
             logging.info("Falling back to local inventory data...")
             return self._get_local_inventory_data()
     
+    def _fetch_clover_inventory_data(self, inventory_enabled=True, clover_service=None):
+        """Fetch inventory from Clover, mapping categories by item ID using item category IDs."""
+        logging.info("Refreshing Clover inventory cache...")
+        clover_service = clover_service or self.clover_service
+        
+        # For tenants without inventory management, get items without stockCount
+        if not inventory_enabled:
+            logging.info("Tenant has no inventory management - skipping stockCount/quantity")
+            # Get items directly without inventory levels
+            items = clover_service.get_items()
+            logging.info(f"Retrieved {len(items) if items else 0} items from Clover (no inventory)")
+            
+            # Process items without stockCount
+            inventory_data = self._process_clover_items_no_inventory(items)
+            logging.info(f"Processed inventory data: {inventory_data.get('total', 0)} items")
+            return inventory_data
+        
+        # Step 1: Fetch all categories and build id->name mapping
+        categories = clover_service.get_categories()
+        cat_id_to_name = {cat.get('id'): cat.get('name', 'Uncategorized') for cat in categories if cat.get('id')}
+        # Step 2: Fetch all items (all pages)
+        items = clover_service.get_items()
+        logging.info(f"Retrieved {len(items) if items else 0} items from Clover")
+        # Step 3: Process items, using the mapping
+        inventory_data = self._process_clover_items(items, cat_id_to_name)
+        logging.info(f"Processed inventory data: {inventory_data.get('total', 0)} items")
+        return inventory_data
+    
     def _get_local_sales_summary(self, start_date=None, end_date=None, category=None):
         """Get sales summary from local database"""
         try:
@@ -505,37 +509,6 @@ class DashboardService:
             'daily_sales': []
         }
     
-    def _filter_orders_by_date(self, orders, start_date=None, end_date=None):
-        """Filter Clover orders by date range"""
-        filtered_orders = []
-        
-        # Ensure start_date and end_date are timezone-aware (UTC)
-        if start_date and start_date.tzinfo is None:
-            start_date = start_date.replace(tzinfo=timezone.utc)
-        if end_date and end_date.tzinfo is None:
-            end_date = end_date.replace(tzinfo=timezone.utc)
-        
-        for order in orders:
-            order_date = None
-            try:
-                # Try to parse the order date from Clover data
-                if 'createdTime' in order:
-                    order_date = datetime.fromtimestamp(order['createdTime'] / 1000, tz=timezone.utc)
-                elif 'modifiedTime' in order:
-                    order_date = datetime.fromtimestamp(order['modifiedTime'] / 1000, tz=timezone.utc)
-            except:
-                continue
-            
-            if order_date:
-                if start_date and order_date < start_date:
-                    continue
-                if end_date and order_date > end_date:
-                    continue
-            
-            filtered_orders.append(order)
-        
-        return filtered_orders
-    
     def calculate_order_revenue(self, order):
         # Try using line items first
         line_items = order.get("lineItems", {}).get("elements", [])
@@ -548,10 +521,8 @@ class DashboardService:
         return max(line_item_revenue, order_total) / 100.0  # Convert cents to dollars
 
     def _process_clover_orders(self, orders, category=None):
-        """Process Clover orders, extract categories correctly, and apply filters"""
+        """Process Clover orders (any iterable, consumed once), extract categories correctly, and apply filters"""
         try:
-            import json
-            logging.warning(f"_process_clover_orders called with {len(orders)} orders. Sample: {json.dumps(orders[0], default=str)[:1000] if orders else 'None'}")
             total_revenue = 0
             order_ids = set()
             category_order_ids = set()
@@ -559,16 +530,18 @@ class DashboardService:
             item_revenue = {}
             daily_revenue = {}
             for order in orders:
+                if not order_ids:
+                    logging.debug("_process_clover_orders first order: %s", lazy_json(order, 1000))
                 order_id = order.get('id')
                 order_ids.add(order_id)
                 order_date = datetime.fromtimestamp(order['createdTime'] / 1000).strftime('%Y-%m-%d')
                 line_items = order.get('lineItems', {}).get('elements', [])
                 if not isinstance(order.get('lineItems'), dict):
-                    logging.error(f"Order {order_id} missing or malformed lineItems: {json.dumps(order, default=str)[:1000]}")
+                    logging.error("Order %s missing or malformed lineItems: %s", order_id, lazy_json(order, 1000))
                 if not line_items:
                     # Fallback: use order-level total if no line items
                     order_total = float(order.get('total', 0)) / 100
-                    logging.warning(f"Order {order_id} has no lineItems, using order total: {order_total}")
+                    logging.warning("Order %s has no lineItems, using order total: %s", order_id, order_total)
                     total_revenue += order_total
                     daily_revenue.setdefault(order_date, 0)
                     daily_revenue[order_date] += order_total
@@ -593,10 +566,10 @@ class DashboardService:
                         revenue = float(total_cents) / 100
                     else:
                         revenue = float(price_cents) * float(quantity) / 100
-                    logging.debug(f"Processing line item: {json.dumps(li, default=str)}")
-                    logging.debug(f"Line item revenue: {revenue} (raw total: {li.get('total', None)}, price: {price_cents}, quantity: {quantity})")
+                    logging.debug("Processing line item: %s", lazy_json(li))
+                    logging.debug("Line item revenue: %s (raw total: %s, price: %s, quantity: %s)", revenue, li.get('total', None), price_cents, quantity)
                     if revenue == 0:
-                        logging.warning(f"ZERO revenue line item: {json.dumps(li, default=str)}")
+                        logging.warning("ZERO revenue line item: %s", lazy_json(li))
                     total_revenue += revenue
                     category_revenue.setdefault(cat, {'revenue': 0, 'count': 0})
                     category_revenue[cat]['revenue'] += revenue
@@ -623,7 +596,7 @@ class DashboardService:
                 {'date': date, 'revenue': float(revenue)}
                 for date, revenue in sorted(daily_revenue.items())
             ]
-            logging.info(f"Total revenue calculated from Clover orders: {total_revenue}")
+            logging.info(f"Total revenue calculated from {len(order_ids)} Clover orders: {total_revenue}")
             return {
                 'total_revenue': float(total_revenue),
                 'total_transactions': total_transactions,
@@ -641,8 +614,7 @@ class DashboardService:
             processed_items = []
             for idx, item in enumerate(items):
                 if idx < 5:
-                    import json
-                    logging.info(f"Full Clover item (no inventory): {json.dumps(item, indent=2)}")
+                    logging.debug("Full Clover item (no inventory): %s", lazy_json(item))
                 
                 # Extract category
                 category = 'Uncategorized'
@@ -682,8 +654,7 @@ class DashboardService:
             processed_items = []
             for idx, item in enumerate(items):
                 if idx < 5:
-                    import json
-                    logging.info(f"Full Clover item: {json.dumps(item, indent=2)}")
+                    logging.debug("Full Clover item: %s", lazy_json(item))
                 # Use category ID mapping if available
                 category = 'Uncategorized'
                 if cat_id_to_name and ('categories' in item or 'categoryIds' in item):
@@ -724,8 +695,9 @@ class DashboardService:
     
     def clear_clover_cache(self):
         """Clear the Clover inventory cache to force a fresh fetch"""
-        self._clover_inventory_cache = None
-        self._clover_inventory_cache_time = 0
+        self._clover_inventory_cache.invalidate()
+        # Clients holding ETags for Clover-backed responses must refetch
+        data_versions.bump([ALL_TENANTS])
         logging.info("Cleared Clover inventory cache")
     
     def update_data_source_config(self, new_config):
@@ -1052,16 +1024,126 @@ class DashboardService:
         for data_type, source in self.data_sources.items():
             logging.info(f"  {data_type}: {source}")
 
+    @staticmethod
+    def _default_overview_range():
+        """Return today's range (midnight to now) in America/Chicago"""
+        window = TimeWindow.today()
+        return window.start.astimezone(BUSINESS_TZ), window.end.astimezone(BUSINESS_TZ)
+
+    @single_flight()
+    def get_dashboard_bundle(self, start_date=None, end_date=None, chef_ids=None):
+        """
+        Compute every dashboard panel (overview, sales summary, chef performance,
+        expenses, profitability) from a single Clover orders pull and a single
+        expenses query. Returns the panels together with per-panel timings.
+        """
+        if not start_date or not end_date:
+            start_date, end_date = self._default_overview_range()
+
+        timings = {}
+        sales_source = self.get_data_source('sales')
+        logging.info(f"Building dashboard bundle from sales data source: {sales_source} | start_date={start_date}, end_date={end_date}")
+
+        def timed(panel, fn, fallback):
+            started = time.perf_counter()
+            try:
+                return fn()
+            except Exception as e:
+                logging.error(f"Error building dashboard bundle panel '{panel}': {str(e)}")
+                return fallback()
+            finally:
+                timings[panel] = round((time.perf_counter() - started) * 1000, 2)
+
+        # Shared data: one Clover pull, one expenses query, one inventory lookup
+        expenses_data = timed(
+            'expenses',
+            lambda: self._get_local_expenses_data(start_date, end_date),
+            lambda: {'total_expenses': 0.0, 'expense_count': 0, 'category_breakdown': [], 'expenses': []}
+        )
+        inventory_data = timed('inventory', self.get_inventory_data, lambda: {'items': [], 'total': 0})
+
+        orders_fetched = 0
+        if sales_source == 'clover':
+            # One streamed pass: each order feeds the sales summary and the chef attribution, then is dropped
+            chef_errors = []
+            try:
+                add_to_chefs, finish_chefs = self._chef_performance_collector(chef_ids)
+            except Exception as e:
+                chef_errors.append(e)
+
+            def orders_for_both():
+                nonlocal orders_fetched
+                for order in self._iter_clover_orders(start_date, end_date):
+                    orders_fetched += 1
+                    if not chef_errors:
+                        try:
+                            add_to_chefs(order)
+                        except Exception as e:
+                            chef_errors.append(e)
+                    yield order
+
+            def chef_results():
+                if chef_errors:
+                    raise chef_errors[0]
+                return finish_chefs()
+
+            # orders_fetch covers the Clover pull together with the sales aggregation it feeds
+            sales_summary = timed(
+                'orders_fetch',
+                lambda: self._process_clover_orders(orders_for_both()),
+                self._empty_sales_summary
+            )
+            chef_performance = timed(
+                'chef_performance',
+                chef_results,
+                lambda: self._get_local_chef_performance_data(start_date, end_date, chef_ids)
+            )
+        else:
+            sales_summary = timed(
+                'sales_summary',
+                lambda: self._get_local_sales_summary(start_date, end_date),
+                self._empty_sales_summary
+            )
+            chef_performance = timed(
+                'chef_performance',
+                lambda: self._get_local_chef_performance_data(start_date, end_date, chef_ids),
+                lambda: {'chef_performance': [], 'chef_summary': []}
+            )
+
+        overview = timed(
+            'overview',
+            lambda: self._build_overview(sales_summary, inventory_data, db.session.query(Chef).count(), sales_source),
+            lambda: self._build_overview(self._empty_sales_summary(), {'items': []}, 0, 'error')
+        )
+        profitability = timed(
+            'profitability',
+            lambda: self._build_profitability(sales_summary, expenses_data, sales_source),
+            lambda: self._build_profitability(self._empty_sales_summary(), {'total_expenses': 0}, 'error')
+        )
+
+        logging.info(f"Dashboard bundle built with timings (ms): {timings}")
+        return {
+            'overview': overview,
+            'sales_summary': sales_summary,
+            'chef_performance': chef_performance,
+            'expenses': expenses_data,
+            'profitability': profitability,
+            'date_range': {
+                'start_date': start_date.isoformat(),
+                'end_date': end_date.isoformat()
+            },
+            'orders_fetched': orders_fetched,
+            'timings_ms': timings
+        }
+
+    @single_flight()
     def get_dashboard_overview(self, start_date=None, end_date=None):
         """Get restaurant overview metrics using correct data sources"""
         logging.info("Getting dashboard overview with correct data sources")
         try:
             # If no date range is provided, default to today (midnight to now, America/Chicago timezone)
             if not start_date or not end_date:
-                tz = pytz.timezone('America/Chicago')
-                now = datetime.now(tz)
-                start_date = datetime.combine(now.date(), datetime.min.time()).replace(tzinfo=tz)
-                end_date = now
+                start_date, end_date = self._default_overview_range()
             
             # Get sales data from configured source
             sales_data = self.get_sales_summary(start_date, end_date)
@@ -1075,26 +1157,7 @@ class DashboardService:
             staff_count = db.session.query(Chef).count()
             logging.info(f"Staff count: {staff_count}")
             
-            # Calculate low stock items (quantity < 10)
-            low_stock_items = []
-            if inventory_data and 'items' in inventory_data:
-                low_stock_items = [
-                    item for item in inventory_data['items'] 
-                    if item.get('quantity') is not None and item.get('quantity', 0) < 10
-                ]
-            
-            overview = {
-                'total_revenue': round(sales_data.get('total_revenue', 0), 2),
-                'total_transactions': sales_data.get('total_transactions', 0),
-                'staff_count': staff_count,
-                'low_stock_items': len(low_stock_items),
-                'last_updated': datetime.now().isoformat(),
-                'data_sources': {
-                    'sales': self.get_data_source('sales'),
-                    'inventory': self.get_data_source('inventory'),
-                    'staff': 'local'
-                }
-            }
+            overview = self._build_overview(sales_data, inventory_data, staff_count, self.get_data_source('sales'))
             
             logging.info(f"Dashboard overview generated: {overview}")
             return overview
@@ -1115,6 +1178,30 @@ class DashboardService:
                 }
             }
 
+    def _build_overview(self, sales_data, inventory_data, staff_count, sales_source):
+        """Build the overview payload from already-fetched sales and inventory data"""
+        # Calculate low stock items (quantity < LOW_STOCK_THRESHOLD)
+        low_stock_items = []
+        if inventory_data and 'items' in inventory_data:
+            low_stock_items = [
+                item for item in inventory_data['items'] 
+                if item.get('quantity') is not None and item.get('quantity', 0) < LOW_STOCK_THRESHOLD
+            ]
+        
+        return {
+            'total_revenue': round(sales_data.get('total_revenue', 0), 2),
+            'total_transactions': sales_data.get('total_transactions', 0),
+            'staff_count': staff_count,
+            'low_stock_items': len(low_stock_items),
+            'last_updated': datetime.now().isoformat(),
+            'data_sources': {
+                'sales': sales_source,
+                'inventory': self.get_data_source('inventory'),
+                'staff': 'local'
+            }
+        }
+
+    @single_flight()
     def get_staff_performance(self, start_date=None, end_date=None):
         """Get staff performance using correct sales data source and chef mapping from local DB"""
         data_source = self.get_data_source('sales')
@@ -1126,6 +1213,7 @@ class DashboardService:
             # Use local DB
             return self._get_local_chef_performance_data(start_date, end_date)
 
+    @single_flight()
     def get_profitability(self, start_date=None, end_date=None):
         """Get profitability using configured sales data source and local expenses, with filters"""
         try:
@@ -1139,85 +1227,9 @@ class DashboardService:
             expenses_data = self.get_expenses_data(start_date, end_date)
             logging.info(f"Expenses data retrieved: total={expenses_data.get('total_expenses', 0)}")
             
-            # Calculate totals
-            total_sales = sales_data.get('total_revenue', 0)
-            total_expenses = expenses_data.get('total_expenses', 0)
-            net_profit = total_sales - total_expenses
-            profit_margin = (net_profit / total_sales * 100) if total_sales > 0 else 0
-            
-            # Get category breakdown
-            sales_categories = {item['category']: item['revenue'] for item in sales_data.get('category_breakdown', [])}
-            expenses_categories = {item['category']: item['amount'] for item in expenses_data.get('category_breakdown', [])}
-            all_categories = set(list(sales_categories.keys()) + list(expenses_categories.keys()))
-            
-            categories = []
-            for cat in all_categories:
-                sales_amt = sales_categories.get(cat, 0)
-                exp_amt = expenses_categories.get(cat, 0)
-                profit = sales_amt - exp_amt
-                margin = (profit / sales_amt * 100) if sales_amt > 0 else 0
-                categories.append({
-                    'category': cat, 
-                    'sales': sales_amt, 
-                    'expenses': exp_amt, 
-                    'profit': profit, 
-                    'profit_margin': margin
-                })
-            
-            # --- Module mapping for profitability aggregation ---
-            CATEGORY_TO_MODULE = {
-                "grocery": "Grocery",
-                "groceries": "Grocery",
-                "frozen": "Grocery",
-                "snacks": "Grocery",
-                "kaara snacks": "Grocery",
-                "meat items": "Meat",
-                "meat": "Meat",
-                "vegetables": "Vegetables",
-                # All others will be 'Kitchen'
-            }
-            MODULES = ["Grocery", "Meat", "Vegetables", "Kitchen"]
-            module_agg = {m: {"sales": 0, "expenses": 0, "profit": 0} for m in MODULES}
-
-            # Aggregate by module (case-insensitive)
-            for cat in all_categories:
-                cat_key = cat.strip().lower() if cat else ""
-                sales_amt = sales_categories.get(cat, 0)
-                exp_amt = expenses_categories.get(cat, 0)
-                profit = sales_amt - exp_amt
-                module = CATEGORY_TO_MODULE.get(cat_key, "Kitchen")
-                module_agg[module]["sales"] += sales_amt
-                module_agg[module]["expenses"] += exp_amt
-                module_agg[module]["profit"] += profit
-
-            # Calculate margin for each module
-            modules = []
-            for m in MODULES:
-                sales = module_agg[m]["sales"]
-                profit = module_agg[m]["profit"]
-                margin = (profit / sales * 100) if sales > 0 else 0
-                modules.append({
-                    "module": m,
-                    "sales": sales,
-                    "expenses": module_agg[m]["expenses"],
-                    "profit": profit,
-                    "profit_margin": margin
-                })
-
-            profitability = {
-                'total_sales': total_sales,
-                'total_expenses': total_expenses,
-                'net_profit': net_profit,
-                'profit_margin': profit_margin,
-                'categories': categories,
-                'modules': modules,
-                'data_sources': {
-                    'sales': self.get_data_source('sales'),
-                    'expenses': 'local'
-                }
-            }
+            profitability = self._build_profitability(sales_data, expenses_data, self.get_data_source('sales'))
             
-            logging.info(f"Profitability calculated: sales=${total_sales}, expenses=${total_expenses}, profit=${net_profit}")
+            logging.info(f"Profitability calculated: sales=${profitability['total_sales']}, expenses=${profitability['total_expenses']}, profit=${profitability['net_profit']}")
             return profitability
             
         except Exception as e:
@@ -1234,102 +1246,194 @@ class DashboardService:
                 }
             }
 
+    def _build_profitability(self, sales_data, expenses_data, sales_source):
+        """Build the profitability payload from already-fetched sales and expenses data"""
+        # Calculate totals
+        total_sales = sales_data.get('total_revenue', 0)
+        total_expenses = expenses_data.get('total_expenses', 0)
+        net_profit = total_sales - total_expenses
+        profit_margin = (net_profit / total_sales * 100) if total_sales > 0 else 0
+        
+        # Get category breakdown
+        sales_categories = {item['category']: item['revenue'] for item in sales_data.get('category_breakdown', [])}
+        expenses_categories = {item['category']: item['amount'] for item in expenses_data.get('category_breakdown', [])}
+        all_categories = set(list(sales_categories.keys()) + list(expenses_categories.keys()))
+        
+        categories = []
+        for cat in all_categories:
+            sales_amt = sales_categories.get(cat, 0)
+            exp_amt = expenses_categories.get(cat, 0)
+            profit = sales_amt - exp_amt
+            margin = (profit / sales_amt * 100) if sales_amt > 0 else 0
+            categories.append({
+                'category': cat, 
+                'sales': sales_amt, 
+                'expenses': exp_amt, 
+                'profit': profit, 
+                'profit_margin': margin
+            })
+        
+        # --- Module mapping for profitability aggregation ---
+        CATEGORY_TO_MODULE = {
+            "grocery": "Grocery",
+            "groceries": "Grocery",
+            "frozen": "Grocery",
+            "snacks": "Grocery",
+            "kaara snacks": "Grocery",
+            "meat items": "Meat",
+            "meat": "Meat",
+            "vegetables": "Vegetables",
+            # All others will be 'Kitchen'
+        }
+        MODULES = ["Grocery", "Meat", "Vegetables", "Kitchen"]
+        module_agg = {m: {"sales": 0, "expenses": 0, "profit": 0} for m in MODULES}
+
+        # Aggregate by module (case-insensitive)
+        for cat in all_categories:
+            cat_key = cat.strip().lower() if cat else ""
+            sales_amt = sales_categories.get(cat, 0)
+            exp_amt = expenses_categories.get(cat, 0)
+            profit = sales_amt - exp_amt
+            module = CATEGORY_TO_MODULE.get(cat_key, "Kitchen")
+            module_agg[module]["sales"] += sales_amt
+            module_agg[module]["expenses"] += exp_amt
+            module_agg[module]["profit"] += profit
+
+        # Calculate margin for each module
+        modules = []
+        for m in MODULES:
+            sales = module_agg[m]["sales"]
+            profit = module_agg[m]["profit"]
+            margin = (profit / sales * 100) if sales > 0 else 0
+            modules.append({
+                "module": m,
+                "sales": sales,
+                "expenses": module_agg[m]["expenses"],
+                "profit": profit,
+                "profit_margin": margin
+            })
+
+        return {
+            'total_sales': total_sales,
+            'total_expenses': total_expenses,
+            'net_profit': net_profit,
+            'profit_margin': profit_margin,
+            'categories': categories,
+            'modules': modules,
+            'data_sources': {
+                'sales': sales_source,
+                'expenses': 'local'
+            }
+        }
+
     def _get_clover_chef_performance_data(self, start_date=None, end_date=None, chef_ids=None, category=None):
         """Get chef performance data using Clover sales data and local chef mappings, with optional category filter, excluding 'Unassigned' chef and reporting unmapped items. Only use clover_id for mapping."""
         try:
             logging.info("Getting chef performance data from Clover sales + local chef mappings (clover_id only)")
-            # Get chef mappings from local database (always local)
-            chef_mappings = db.session.query(ChefDishMapping).all()
-            clover_id_to_chef = {mapping.clover_id: mapping.chef_id for mapping in chef_mappings if mapping.clover_id}
-            logging.info(f"Found {len(chef_mappings)} chef mappings with clover_id")
-            # Get all real chefs (exclude 'Unassigned' and only keep the 4 real chefs)
-            allowed_chefs = ["Sarva&Ram", "Savithri", "Wasim", "Chef_miscellanies"]
-            real_chefs = {chef.id: chef.name for chef in Chef.query.filter(Chef.name.in_(allowed_chefs)).all()}
-            logging.info(f"Found {len(real_chefs)} real chefs: {list(real_chefs.values())}")
-            # Filter chefs if specified
-            chefs = real_chefs.copy()
-            if chef_ids and chef_ids != 'all':
-                try:
-                    chef_id_list = [int(id_str) for id_str in chef_ids.split(',')]
-                    chefs = {k: v for k, v in real_chefs.items() if k in chef_id_list}
-                except ValueError:
-                    logging.warning(f"Invalid chef_ids format: {chef_ids}")
-            # Get orders from Clover
-            orders = self.clover_service.get_orders(start_date, end_date)
-            logging.info(f"Retrieved {len(orders) if orders else 0} orders from Clover")
-            # Filter orders by date if provided
-            if start_date or end_date:
-                orders = self._filter_orders_by_date(orders, start_date, end_date)
-                logging.info(f"After date filtering: {len(orders)} orders")
-            # Parse category filter as list
-            category_list = None
-            if category and category != 'all':
-                category_list = [c.strip() for c in category.split(',') if c.strip()]
-            # Process orders to get chef performance
-            chef_performance = {}
-            chef_summary = {}
-            unmapped_items = set()
-            processed_orders = 0
-            processed_line_items = 0
-            mapped_line_items = 0
-            for order in orders:
-                line_items = order.get('lineItems', {}).get('elements', [])
-                processed_orders += 1
-                for line_item in line_items:
-                    processed_line_items += 1
-                    item = line_item.get('item', {})
-                    clover_item_id = item.get('id')
-                    item_name = item.get('name', 'Unknown')
-                    # Only use clover_id for mapping
-                    chef_id = clover_id_to_chef.get(clover_item_id)
-                    if not chef_id or chef_id not in chefs:
-                        unmapped_items.add(f"{clover_item_id}:{item_name}")
-                        continue  # Skip items not mapped to chefs or filtered chefs
-                    mapped_line_items += 1
-                    # Extract category from item.categories
-                    cat = 'Uncategorized'
-                    categories = item.get('categories', {}).get('elements', [])
-                    if categories and isinstance(categories, list):
-                        cat = categories[0].get('name', 'Uncategorized')
-                    # Category filter: if category_list, only include if cat in list
-                    if category_list and cat not in category_list:
-                        continue
-                    chef_name = chefs[chef_id]
-                    # Revenue extraction: use total if present and >0, else price * quantity
-                    total_cents = line_item.get('total', 0)
-                    price_cents = line_item.get('price', 0)
-                    quantity = line_item.get('quantity', 1)
-                    if total_cents:
-                        revenue = float(total_cents) / 100
-                    else:
-                        revenue = float(price_cents) * float(quantity) / 100
-                    logging.debug(f"Processing line item: {json.dumps(line_item, default=str)}")
-                    logging.debug(f"Line item revenue: {revenue} (raw total: {line_item.get('total', None)}, price: {price_cents}, quantity: {quantity})")
-                    if revenue == 0:
-                        logging.warning(f"ZERO revenue line item: {json.dumps(line_item, default=str)}")
-                    # Update chef performance
-                    if chef_name not in chef_performance:
-                        chef_performance[chef_name] = {}
-                    if item_name not in chef_performance[chef_name]:
-                        chef_performance[chef_name][item_name] = {
-                            'chef_name': chef_name,
-                            'item_name': item_name,
-                            'category': cat,
-                            'revenue': 0,
-                            'count': 0
-                        }
-                    chef_performance[chef_name][item_name]['revenue'] += revenue
-                    chef_performance[chef_name][item_name]['count'] += quantity
-                    # Update chef summary
-                    if chef_id not in chef_summary:
-                        chef_summary[chef_id] = {
-                            'id': chef_id,
-                            'name': chef_name,
-                            'total_revenue': 0,
-                            'total_sales': 0
-                        }
-                    chef_summary[chef_id]['total_revenue'] += revenue
-                    chef_summary[chef_id]['total_sales'] += quantity
+            return self._process_clover_chef_performance(self._iter_clover_orders(start_date, end_date), chef_ids, category)
+        except Exception as e:
+            logging.error(f"Error getting Clover chef performance data: {str(e)}")
+            # Fallback to local data
+            return self._get_local_chef_performance_data(start_date, end_date, chef_ids)
+
+    def _process_clover_chef_performance(self, orders, chef_ids=None, category=None):
+        """Attribute Clover orders (any iterable, consumed once) to chefs via local clover_id mappings"""
+        add_order, finish = self._chef_performance_collector(chef_ids, category)
+        for order in orders:
+            add_order(order)
+        return finish()
+
+    def _chef_performance_collector(self, chef_ids=None, category=None):
+        """
+        Incremental chef attribution: returns (add_order, finish). add_order(order)
+        folds one order's line items into the totals; finish() builds the result.
+        """
+        # Get chef mappings from local database (always local)
+        chef_mappings = db.session.query(ChefDishMapping).all()
+        clover_id_to_chef = {mapping.clover_id: mapping.chef_id for mapping in chef_mappings if mapping.clover_id}
+        logging.info(f"Found {len(chef_mappings)} chef mappings with clover_id")
+        # Get all real chefs (exclude 'Unassigned' and only keep the 4 real chefs)
+        allowed_chefs = ["Sarva&Ram", "Savithri", "Wasim", "Chef_miscellanies"]
+        real_chefs = {chef.id: chef.name for chef in Chef.query.filter(Chef.name.in_(allowed_chefs)).all()}
+        logging.info(f"Found {len(real_chefs)} real chefs: {list(real_chefs.values())}")
+        # Filter chefs if specified
+        chefs = real_chefs.copy()
+        if chef_ids and chef_ids != 'all':
+            try:
+                chef_id_list = [int(id_str) for id_str in chef_ids.split(',')]
+                chefs = {k: v for k, v in real_chefs.items() if k in chef_id_list}
+            except ValueError:
+                logging.warning(f"Invalid chef_ids format: {chef_ids}")
+        # Parse category filter as list
+        category_list = None
+        if category and category != 'all':
+            category_list = [c.strip() for c in category.split(',') if c.strip()]
+        # Process orders to get chef performance
+        chef_performance = {}
+        chef_summary = {}
+        unmapped_items = set()
+        counts = {'orders': 0, 'line_items': 0, 'mapped_line_items': 0}
+
+        def add_order(order):
+            line_items = order.get('lineItems', {}).get('elements', [])
+            counts['orders'] += 1
+            for line_item in line_items:
+                counts['line_items'] += 1
+                item = line_item.get('item', {})
+                clover_item_id = item.get('id')
+                item_name = item.get('name', 'Unknown')
+                # Only use clover_id for mapping
+                chef_id = clover_id_to_chef.get(clover_item_id)
+                if not chef_id or chef_id not in chefs:
+                    unmapped_items.add(f"{clover_item_id}:{item_name}")
+                    continue  # Skip items not mapped to chefs or filtered chefs
+                counts['mapped_line_items'] += 1
+                # Extract category from item.categories
+                cat = 'Uncategorized'
+                categories = item.get('categories', {}).get('elements', [])
+                if categories and isinstance(categories, list):
+                    cat = categories[0].get('name', 'Uncategorized')
+                # Category filter: if category_list, only include if cat in list
+                if category_list and cat not in category_list:
+                    continue
+                chef_name = chefs[chef_id]
+                # Revenue extraction: use total if present and >0, else price * quantity
+                total_cents = line_item.get('total', 0)
+                price_cents = line_item.get('price', 0)
+                quantity = line_item.get('quantity', 1)
+                if total_cents:
+                    revenue = float(total_cents) / 100
+                else:
+                    revenue = float(price_cents) * float(quantity) / 100
+                logging.debug("Processing line item: %s", lazy_json(line_item))
+                logging.debug("Line item revenue: %s (raw total: %s, price: %s, quantity: %s)", revenue, line_item.get('total', None), price_cents, quantity)
+                if revenue == 0:
+                    logging.warning("ZERO revenue line item: %s", lazy_json(line_item))
+                # Update chef performance
+                if chef_name not in chef_performance:
+                    chef_performance[chef_name] = {}
+                if item_name not in chef_performance[chef_name]:
+                    chef_performance[chef_name][item_name] = {
+                        'chef_name': chef_name,
+                        'item_name': item_name,
+                        'category': cat,
+                        'revenue': 0,
+                        'count': 0
+                    }
+                chef_performance[chef_name][item_name]['revenue'] += revenue
+                chef_performance[chef_name][item_name]['count'] += quantity
+                # Update chef summary
+                if chef_id not in chef_summary:
+                    chef_summary[chef_id] = {
+                        'id': chef_id,
+                        'name': chef_name,
+                        'total_revenue': 0,
+                        'total_sales': 0
+                    }
+                chef_summary[chef_id]['total_revenue'] += revenue
+                chef_summary[chef_id]['total_sales'] += quantity
+
+        def finish():
             # Convert to grouped list: one entry per chef, with a list of their dishes
             chef_performance_grouped = []
             for chef_id, chef_name in chefs.items():
@@ -1350,9 +1454,9 @@ class DashboardService:
                 })
             summary_list = list(chef_summary.values())
             logging.info(f"Clover chef performance processing complete:")
-            logging.info(f"  - Processed {processed_orders} orders")
-            logging.info(f"  - Processed {processed_line_items} line items")
-            logging.info(f"  - Mapped {mapped_line_items} line items to chefs via clover_id")
+            logging.info(f"  - Processed {counts['orders']} orders")
+            logging.info(f"  - Processed {counts['line_items']} line items")
+            logging.info(f"  - Mapped {counts['mapped_line_items']} line items to chefs via clover_id")
             logging.info(f"  - Found {len(chef_performance_grouped)} chefs with performance data")
             logging.info(f"  - Total dishes across all chefs: {sum(len(c['dishes']) for c in chef_performance_grouped)}")
             logging.info(f"  - Unmapped items: {len(unmapped_items)}")
@@ -1362,7 +1466,5 @@ class DashboardService:
                 'chef_performance': chef_performance_grouped,
                 'chef_summary': summary_list
             }
-        except Exception as e:
-            logging.error(f"Error getting Clover chef performance data: {str(e)}")
-            # Fallback to local data
-            return self._get_local_chef_performance_data(start_date, end_date, chef_ids) 
\ No newline at end of file
+
+        return add_order, finish
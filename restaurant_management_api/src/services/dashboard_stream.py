@@ -0,0 +1,252 @@
+import logging
+import os
+import threading
+import time
+
+from flask import current_app
+
+from ..models import db
+from .dashboard_service import LOW_STOCK_THRESHOLD
+from .data_version import data_versions, version_scope, ALL_TENANTS
+from ..utils.time_window import BUSINESS_TZ, TimeWindow
+
+logger = logging.getLogger(__name__)
+
+# Off: the stream answers 503 and the dashboard polls /overview instead
+DASHBOARD_STREAM_ENABLED = os.environ.get('DASHBOARD_STREAM_ENABLED', 'true').lower() != 'false'
+# Comment line sent when nothing changed, so proxies keep the connection open (seconds)
+DASHBOARD_STREAM_HEARTBEAT = float(os.environ.get('DASHBOARD_STREAM_HEARTBEAT', 15))
+# Recompute at least this often even without local writes: Clover sales change on the POS (seconds)
+DASHBOARD_STREAM_REFRESH_INTERVAL = float(os.environ.get('DASHBOARD_STREAM_REFRESH_INTERVAL', 60))
+# Bursts of writes (an upload commits in batches) are folded into one recompute per interval (seconds)
+DASHBOARD_STREAM_MIN_INTERVAL = float(os.environ.get('DASHBOARD_STREAM_MIN_INTERVAL', 1))
+# Streams end after this long and the browser reconnects
+DASHBOARD_STREAM_MAX_DURATION = float(os.environ.get('DASHBOARD_STREAM_MAX_DURATION', 100))
+# How long EventSource waits before reconnecting (milliseconds)
+DASHBOARD_STREAM_RETRY_MS = int(os.environ.get('DASHBOARD_STREAM_RETRY_MS', 3000))
+# Open streams per worker; keep it below the worker's threads so other requests still get one
+# (gunicorn.conf.py sets it to half the threads unless given)
+DASHBOARD_STREAM_MAX_PER_WORKER = int(os.environ.get('DASHBOARD_STREAM_MAX_PER_WORKER', 2))
+
+
+def streaming_supported(environ):
+    """
+    Whether this request may hold a stream open. Not when streams are disabled, nor
+    on gunicorn sync workers, where one open dashboard would take a whole worker.
+    """
+    if not DASHBOARD_STREAM_ENABLED:
+        return False
+    return not (environ.get('SERVER_SOFTWARE', '').startswith('gunicorn/') and not environ.get('wsgi.multithread'))
+
+
+def overview_snapshot(service):
+    """Today's overview plus the low-stock items behind its count"""
+    day = TimeWindow.today().start.astimezone(BUSINESS_TZ).date()
+    overview = service.get_dashboard_overview()
+    if overview.get('data_sources', {}).get('sales') == 'error':
+        # The service answers failures with zeros; don't push those as a drop in revenue
+        raise RuntimeError('Dashboard overview is unavailable')
+    inventory = service.get_inventory_data()
+    low_stock = {
+        str(item.get('id')): {'id': item.get('id'), 'name': item.get('name'), 'quantity': item['quantity']}
+        for item in inventory.get('items', [])
+        if item.get('quantity') is not None and item['quantity'] < LOW_STOCK_THRESHOLD
+    }
+    return {'day': day.isoformat(), 'overview': overview, 'low_stock': low_stock}
+
+
+def overview_delta(previous, current):
+    """What changed between two snapshots of the same day, or None if nothing did"""
+    changed = {key: value for key, value in current['overview'].items()
+               if key != 'last_updated' and previous['overview'].get(key) != value}
+    increments = {}
+    for key, value in changed.items():
+        before = previous['overview'].get(key)
+        if isinstance(value, (int, float)) and isinstance(before, (int, float)) and not isinstance(value, bool):
+            increments[key] = round(value - before, 2)
+    added = [item for key, item in current['low_stock'].items() if key not in previous['low_stock']]
+    updated = [item for key, item in current['low_stock'].items()
+               if key in previous['low_stock'] and previous['low_stock'][key] != item]
+    cleared = [item['id'] for key, item in previous['low_stock'].items() if key not in current['low_stock']]
+    if not (changed or added or updated or cleared):
+        return None
+    return {
+        'changed': changed,
+        'increments': increments,
+        'low_stock': {'added': added, 'updated': updated, 'cleared': cleared},
+        'last_updated': current['overview'].get('last_updated')
+    }
+
+
+def overview_event(snapshot):
+    return {'day': snapshot['day'], 'overview': snapshot['overview'], 'low_stock': list(snapshot['low_stock'].values())}
+
+
+def sse_event(event, data):
+    payload = current_app.json.dumps(data)
+    return f"event: {event}\n" + ''.join(f"data: {line}\n" for line in payload.splitlines()) + "\n"
+
+
+class _TenantFeed:
+    """Change counter and latest snapshot shared by one tenant's streams in this worker"""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.subscribers = 0
+        self.generation = 0
+        self.snapshot = None
+        self.snapshot_generation = -1
+        self.snapshot_at = 0.0
+        self.computing = False
+
+    def changed(self):
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+    def wait(self, generation, timeout):
+        """Block until the feed moves past `generation` or the timeout passes; returns the current generation"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.generation != generation, timeout)
+            return self.generation
+
+    def latest(self, compute, max_age):
+        """
+        A snapshot reflecting every change so far and at most max_age seconds old.
+        Only one stream computes it; the others wait for and share its result.
+        """
+        with self.condition:
+            wanted = self.generation
+            not_before = time.monotonic() - max_age
+            while True:
+                if (self.snapshot is not None and self.snapshot_generation >= wanted
+                        and self.snapshot_at >= not_before):
+                    return self.snapshot, self.snapshot_generation
+                if not self.computing:
+                    break
+                self.condition.wait()
+            self.computing = True
+            delay = self.snapshot_at + DASHBOARD_STREAM_MIN_INTERVAL - time.monotonic()
+        try:
+            if delay > 0:
+                time.sleep(delay)
+            with self.condition:
+                generation = self.generation
+            snapshot = compute()
+        except BaseException:
+            with self.condition:
+                self.computing = False
+                self.condition.notify_all()
+            raise
+        with self.condition:
+            self.snapshot, self.snapshot_generation, self.snapshot_at = snapshot, generation, time.monotonic()
+            self.computing = False
+            self.condition.notify_all()
+        return snapshot, generation
+
+
+class DashboardStream:
+    """
+    Live overview updates pushed as server-sent events.
+
+    Writes that bump a tenant's data version (uploads, Clover syncs, edits) wake
+    that tenant's streams through DataVersions' pub/sub. The first stream to wake
+    recomputes the snapshot and the rest reuse it, so every open dashboard in a
+    worker costs one computation per change; concurrent recomputes in other
+    workers are coalesced by the service's single-flight.
+
+    Each stream holds a worker thread, so a worker keeps at most
+    DASHBOARD_STREAM_MAX_PER_WORKER open (claim/release); past that the route
+    answers 503 and the dashboard polls.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._feeds = {}
+        self._open = 0
+        data_versions.add_listener(self.notify)
+
+    def notify(self, scopes):
+        with self._lock:
+            if ALL_TENANTS in scopes:
+                feeds = list(self._feeds.values())
+            else:
+                feeds = [self._feeds[scope] for scope in scopes if scope in self._feeds]
+        for feed in feeds:
+            feed.changed()
+
+    def claim(self):
+        """Take one of this worker's stream slots; False when all are in use"""
+        with self._lock:
+            if self._open >= DASHBOARD_STREAM_MAX_PER_WORKER:
+                return False
+            self._open += 1
+            return True
+
+    def release(self):
+        """Give back a slot taken with claim()"""
+        with self._lock:
+            self._open = max(0, self._open - 1)
+
+    def _join(self, tenant_id):
+        data_versions.listen()
+        with self._lock:
+            feed = self._feeds.setdefault(version_scope(tenant_id), _TenantFeed())
+            feed.subscribers += 1
+            return feed
+
+    def _leave(self, tenant_id, feed):
+        with self._lock:
+            feed.subscribers -= 1
+            if feed.subscribers == 0:
+                self._feeds.pop(version_scope(tenant_id), None)
+
+    def _latest(self, feed, compute):
+        try:
+            return feed.latest(compute, DASHBOARD_STREAM_REFRESH_INTERVAL)
+        finally:
+            # Don't pin a pooled connection while the stream sits idle
+            db.session.remove()
+
+    def events(self, tenant_id, compute):
+        """
+        Generator of SSE messages for one client: an `overview` event with the full
+        snapshot, then a `delta` event whenever it changes. Run it inside the
+        request context (stream_with_context); `compute` builds a snapshot.
+        """
+        feed = self._join(tenant_id)
+        deadline = time.monotonic() + DASHBOARD_STREAM_MAX_DURATION
+        try:
+            yield f"retry: {DASHBOARD_STREAM_RETRY_MS}\n\n"
+            snapshot, seen = self._latest(feed, compute)
+            fetched_at = time.monotonic()
+            yield sse_event('overview', overview_event(snapshot))
+            while True:
+                now = time.monotonic()
+                if now >= deadline:
+                    return
+                timeout = min(DASHBOARD_STREAM_HEARTBEAT, deadline - now,
+                              max(0.0, fetched_at + DASHBOARD_STREAM_REFRESH_INTERVAL - now))
+                if feed.wait(seen, timeout) == seen and time.monotonic() < fetched_at + DASHBOARD_STREAM_REFRESH_INTERVAL:
+                    yield ": keepalive\n\n"
+                    continue
+                try:
+                    current, seen = self._latest(feed, compute)
+                except Exception as e:
+                    logger.error(f"Dashboard stream update failed for tenant {tenant_id}: {e}")
+                    yield sse_event('error', {'error': str(e)})
+                    seen, fetched_at = feed.generation, time.monotonic()
+                    continue
+                fetched_at = time.monotonic()
+                if current['day'] != snapshot['day']:
+                    yield sse_event('overview', overview_event(current))
+                else:
+                    delta = overview_delta(snapshot, current)
+                    yield sse_event('delta', delta) if delta else ": keepalive\n\n"
+                snapshot = current
+        finally:
+            self._leave(tenant_id, feed)
+
+
+# Create a global instance
+dashboard_stream = DashboardStream()
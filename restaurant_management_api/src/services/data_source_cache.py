@@ -0,0 +1,116 @@
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import or_
+
+from ..models.data_source_config import DataSourceConfig
+from .cache_service import get_redis_client
+from ..utils.metrics import observe_cache
+
+logger = logging.getLogger(__name__)
+
+# Redis key bumped on every config write so other workers drop their snapshots
+DATA_SOURCE_VERSION_KEY = 'plateiq_data_source_config_version'
+# How often a worker checks the shared version key (seconds)
+DATA_SOURCE_VERSION_CHECK_INTERVAL = float(os.environ.get('DATA_SOURCE_VERSION_CHECK_INTERVAL', 2))
+
+
+class DataSourceConfigCache:
+    """
+    Versioned in-memory snapshot of DataSourceConfig rows per tenant.
+
+    Each snapshot holds the tenant's own rows and the global (tenant_id=None)
+    rows, loaded with a single query. Snapshots are dropped when the version
+    changes: locally on invalidate(), and across workers through a Redis
+    version key checked at most every DATA_SOURCE_VERSION_CHECK_INTERVAL.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshots = {}
+        self._version = None
+        self._last_version_check = 0
+        # Advanced whenever snapshots are dropped; a load that started before then is discarded
+        self._generation = 0
+
+    def get_source(self, data_type, tenant_id=None):
+        """Return the configured source for data_type, or None if nothing is configured"""
+        snapshot = self._get_snapshot(tenant_id)
+        if tenant_id and (tenant_id, data_type) in snapshot:
+            return snapshot[(tenant_id, data_type)]
+        return snapshot.get((None, data_type))
+
+    def get_global_sources(self):
+        """Return {data_type: source} for the global (tenant_id=None) configuration"""
+        snapshot = self._get_snapshot(None)
+        return {data_type: source for (tenant, data_type), source in snapshot.items() if tenant is None}
+
+    def _drop_snapshots(self):
+        # Caller holds self._lock
+        self._snapshots.clear()
+        self._generation += 1
+
+    def invalidate(self):
+        """Drop every snapshot in this worker and bump the shared version for the others"""
+        with self._lock:
+            self._drop_snapshots()
+        redis_client = get_redis_client()
+        if redis_client is not None:
+            try:
+                version = redis_client.incr(DATA_SOURCE_VERSION_KEY)
+                with self._lock:
+                    self._version = int(version)
+                    self._last_version_check = time.monotonic()
+            except Exception as e:
+                logger.warning(f"Could not bump data source config version: {e}")
+        logger.info("Data source config cache invalidated")
+
+    def _check_version(self):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_version_check < DATA_SOURCE_VERSION_CHECK_INTERVAL:
+                return
+            self._last_version_check = now
+        redis_client = get_redis_client()
+        if redis_client is None:
+            return
+        try:
+            raw = redis_client.get(DATA_SOURCE_VERSION_KEY)
+            version = int(raw) if raw is not None else 0
+        except Exception as e:
+            logger.warning(f"Could not read data source config version: {e}")
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            if self._version is not None:
+                logger.info(f"Data source config version changed ({self._version} -> {version}), dropping snapshots")
+            self._drop_snapshots()
+            self._version = version
+
+    def _get_snapshot(self, tenant_id):
+        self._check_version()
+        with self._lock:
+            snapshot = self._snapshots.get(tenant_id)
+            if snapshot is not None:
+                observe_cache('data-source-config', 'hit')
+                return snapshot
+            generation = self._generation
+        observe_cache('data-source-config', 'miss')
+        query = DataSourceConfig.query
+        if tenant_id:
+            query = query.filter(or_(DataSourceConfig.tenant_id == tenant_id, DataSourceConfig.tenant_id.is_(None)))
+        else:
+            query = query.filter(DataSourceConfig.tenant_id.is_(None))
+        snapshot = {(row.tenant_id, row.data_type): row.source for row in query.all()}
+        with self._lock:
+            # Keep it only if nothing was invalidated while the query ran
+            if self._generation == generation:
+                self._snapshots[tenant_id] = snapshot
+        return snapshot
+
+
+# Create a global instance
+data_source_config_cache = DataSourceConfigCache()
@@ -0,0 +1,259 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import nullcontext
+from functools import wraps
+
+from flask import g, make_response, request
+from sqlalchemy import event
+
+from ..models.routing import RoutingSession, primary_reads
+from ..models.sale import Sale
+from ..models.item import Item
+from ..models.expense import Expense
+from ..models.chef import Chef
+from ..models.chef_dish_mapping import ChefDishMapping
+from ..models.category import Category
+from ..models.uncategorized_item import UncategorizedItem
+from ..models.file_upload import FileUpload
+from ..models.data_source_config import DataSourceConfig
+from ..models.tenant import Tenant
+from .cache_service import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Redis keys holding the version counters: one per tenant scope plus one for changes affecting everyone
+DATA_VERSION_KEY_PREFIX = 'plateiq_data_version:'
+# Pub/sub channel announcing which scopes were bumped, so other workers can react at once
+DATA_VERSION_CHANNEL = 'plateiq_data_version_events'
+ALL_TENANTS = 'all'
+# How long a worker reuses versions read from Redis (seconds)
+DATA_VERSION_CHECK_INTERVAL = float(os.environ.get('DATA_VERSION_CHECK_INTERVAL', 1))
+# ETags also roll over this often, bounding staleness for data the versions can't see
+# (Clover-backed figures, "today" windows); 0 disables the time component
+ETAG_MAX_AGE = int(os.environ.get('ETAG_MAX_AGE', 60))
+# After a tenant's version changes, conditional_get views read the primary for this long,
+# so a lagging replica can't return old data under the new ETag (seconds; cover the replica lag)
+REPLICA_LAG_WINDOW = float(os.environ.get('REPLICA_LAG_WINDOW', 5))
+
+# Models whose writes change what dashboard and inventory endpoints return
+TRACKED_MODELS = (Sale, Item, Expense, Chef, ChefDishMapping, Category, UncategorizedItem, FileUpload, DataSourceConfig)
+
+
+def version_scope(tenant_id):
+    """Key of a tenant's version counter (and of its change notifications)"""
+    return str(tenant_id) if tenant_id is not None else 'none'
+
+
+class DataVersions:
+    """
+    Per-tenant data version counters used to build ETags.
+
+    Versions live in Redis so every worker agrees; without Redis each worker keeps its
+    own counters and mixes a per-process nonce into them, so workers never hand out
+    ETags that another worker would wrongly match (clients just see fewer 304s).
+
+    Every bump is also announced to listeners (see add_listener): through Redis
+    pub/sub to every worker that called listen(), or directly within this process
+    when there is no Redis (single node).
+
+    Each worker also remembers when it first saw every version (see changed_within),
+    which tells conditional_get whether a replica could still be behind it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = {}
+        self._cached = {}
+        self._first_seen = {}
+        self._nonce = uuid.uuid4().hex[:8]
+        self._listeners = []
+        self._listener_pid = None
+
+    def get(self, tenant_id):
+        """Opaque version string covering the tenant's own data and changes to all tenants"""
+        keys = (ALL_TENANTS, version_scope(tenant_id))
+        redis_client = get_redis_client()
+        now = time.monotonic()
+        if redis_client is None:
+            with self._lock:
+                version = f"{self._nonce}.{self._local.get(keys[0], 0)}.{self._local.get(keys[1], 0)}"
+                self._note(keys, version, now)
+                return version
+        with self._lock:
+            cached = self._cached.get(keys)
+            if cached is not None and cached[1] > now:
+                return cached[0]
+        try:
+            values = redis_client.mget([DATA_VERSION_KEY_PREFIX + key for key in keys])
+        except Exception as e:
+            logger.warning(f"Could not read data versions: {e}")
+            return f"{self._nonce}.unavailable.{int(time.time())}"
+        version = '.'.join(v.decode() if isinstance(v, bytes) else str(v or 0) for v in values)
+        with self._lock:
+            self._cached[keys] = (version, now + DATA_VERSION_CHECK_INTERVAL)
+            self._note(keys, version, now)
+        return version
+
+    def changed_within(self, tenant_id, seconds):
+        """True if this worker saw the tenant's version change (or has not seen it yet) in the last seconds"""
+        seen = self._first_seen.get((ALL_TENANTS, version_scope(tenant_id)))
+        return seen is None or time.monotonic() - seen[1] < seconds
+
+    def _note(self, keys, version, now):
+        # Caller holds the lock
+        seen = self._first_seen.get(keys)
+        if seen is None or seen[0] != version:
+            self._first_seen[keys] = (version, now)
+
+    def bump(self, tenant_ids):
+        """Advance the versions of the given tenant ids (None = no-tenant data, ALL_TENANTS = everyone)"""
+        keys = {key if key == ALL_TENANTS else version_scope(key) for key in tenant_ids}
+        if not keys:
+            return
+        with self._lock:
+            for key in keys:
+                self._local[key] = self._local.get(key, 0) + 1
+            # Versions cached from Redis are stale now; the next get() in this worker re-reads them
+            self._cached.clear()
+        redis_client = get_redis_client()
+        if redis_client is not None:
+            try:
+                pipeline = redis_client.pipeline(transaction=False)
+                for key in keys:
+                    pipeline.incr(DATA_VERSION_KEY_PREFIX + key)
+                pipeline.publish(DATA_VERSION_CHANNEL, json.dumps(sorted(keys)))
+                pipeline.execute()
+                return
+            except Exception as e:
+                logger.warning(f"Could not bump data versions {sorted(keys)}: {e}")
+        self._deliver(keys)
+
+    # Change notifications
+
+    def add_listener(self, callback):
+        """Call callback(scopes) after every bump; it runs on the notifying thread and must return quickly"""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def listen(self):
+        """Receive bumps made by other workers too (starts this process's Redis subscriber once)"""
+        if self._listener_pid == os.getpid() or get_redis_client() is None:
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            threading.Thread(target=self._subscribe, name='data-version-listener', daemon=True).start()
+
+    def _subscribe(self):
+        redis_client = get_redis_client()
+        missed = False
+        while True:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(DATA_VERSION_CHANNEL)
+                if missed:
+                    # Bumps published while disconnected are lost; assume everything changed
+                    self._deliver({ALL_TENANTS})
+                    missed = False
+                for message in pubsub.listen():
+                    self._deliver(set(json.loads(message['data'])))
+            except Exception as e:
+                logger.warning(f"Data version subscription lost, reconnecting: {e}")
+                missed = True
+                time.sleep(1)
+            finally:
+                pubsub.close()
+
+    def _deliver(self, keys):
+        with self._lock:
+            self._cached.clear()
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(keys)
+            except Exception as e:
+                logger.warning(f"Data version listener failed for {sorted(keys)}: {e}")
+
+
+# Create a global instance
+data_versions = DataVersions()
+
+
+def _tenants_touched(obj):
+    if isinstance(obj, Tenant):
+        return obj.id
+    if isinstance(obj, DataSourceConfig) and obj.tenant_id is None:
+        # Global source settings apply to every tenant without its own
+        return ALL_TENANTS
+    # Category and UncategorizedItem are shared by every tenant
+    return getattr(obj, 'tenant_id', ALL_TENANTS)
+
+
+@event.listens_for(RoutingSession, 'before_flush')
+def _collect_changed_tenants(session, flush_context, instances):
+    touched = {_tenants_touched(obj) for obj in (*session.new, *session.dirty, *session.deleted)
+               if isinstance(obj, TRACKED_MODELS + (Tenant,))}
+    if touched:
+        session.info.setdefault('data_version_tenants', set()).update(touched)
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _collect_bulk_changes(orm_execute_state):
+    # query.update()/delete() don't say which tenants they hit; treat them as touching everyone
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and any(
+            mapper.class_ in TRACKED_MODELS for mapper in orm_execute_state.all_mappers):
+        orm_execute_state.session.info.setdefault('data_version_tenants', set()).add(ALL_TENANTS)
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _bump_changed_tenants(session):
+    touched = session.info.pop('data_version_tenants', None)
+    if touched:
+        data_versions.bump(touched)
+
+
+def current_etag(identity):
+    """Weak validator for the current request: path and query, user, representation, data version, time bucket"""
+    bucket = int(time.time() // ETAG_MAX_AGE) if ETAG_MAX_AGE > 0 else 0
+    representation = request.accept_mimetypes.best_match(['application/json', 'application/msgpack'])
+    seed = '|'.join(str(part) for part in (
+        request.full_path, identity.id, representation, data_versions.get(identity.tenant_id), bucket
+    ))
+    return hashlib.sha1(seed.encode('utf-8')).hexdigest()[:20]
+
+
+def conditional_get(f):
+    """
+    Tag GET responses with a weak ETag from the tenant's data version and answer
+    If-None-Match hits with 304 before the view runs. Apply below login_required.
+
+    For REPLICA_LAG_WINDOW seconds after the version changes the view reads the
+    primary even under @read_replica: the tag already names the new version, and a
+    body read from a lagging replica would be cached under it until the next bump.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        identity = g.get('user')
+        if request.method != 'GET' or identity is None:
+            return f(*args, **kwargs)
+        # Read before the view runs, so a write racing with it produces a newer tag next time
+        etag = current_etag(identity)
+        if request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+        else:
+            recent = data_versions.changed_within(identity.tenant_id, REPLICA_LAG_WINDOW)
+            with primary_reads() if recent else nullcontext():
+                response = make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag, weak=True)
+        # Let browsers keep the body but revalidate on every use
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return decorated_function
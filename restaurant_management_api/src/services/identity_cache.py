@@ -0,0 +1,173 @@
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+
+from ..models import db
+from ..models.routing import RoutingSession
+from ..models.tenant import Tenant
+from ..models.user import User
+from .cache_service import get_redis_client
+from .usage_meter import usage_meter
+from ..utils.metrics import observe_cache
+
+logger = logging.getLogger(__name__)
+
+# How long a resolved identity is reused without touching the database (seconds)
+IDENTITY_CACHE_TTL = float(os.environ.get('IDENTITY_CACHE_TTL', 30))
+# Redis key bumped on every user/tenant write so other workers drop their entries
+IDENTITY_VERSION_KEY = 'plateiq_identity_version'
+# How often a worker checks the shared version key (seconds)
+IDENTITY_VERSION_CHECK_INTERVAL = float(os.environ.get('IDENTITY_VERSION_CHECK_INTERVAL', 2))
+
+
+@dataclass(frozen=True)
+class Identity:
+    """What authorization needs about the logged-in user and their tenant, detached from any DB session"""
+    id: int
+    username: str
+    role: str
+    is_admin: bool
+    tenant_id: Optional[str] = None
+    subscription_plan: Optional[str] = None
+
+    @property
+    def is_super_admin(self):
+        return self.is_admin and self.tenant_id is None
+
+    @property
+    def is_tenant_admin(self):
+        return self.is_admin and self.tenant_id is not None
+
+
+class IdentityCache:
+    """
+    Identity snapshots per session user, reused for IDENTITY_CACHE_TTL seconds.
+
+    A user and their tenant are loaded with one query. Committed writes to User or
+    Tenant drop the affected entries in this worker and bump a Redis version key so
+    other workers drop theirs within IDENTITY_VERSION_CHECK_INTERVAL; without Redis
+    other workers see changes once the TTL expires.
+    """
+
+    def __init__(self, ttl=IDENTITY_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._version = None
+        self._last_version_check = 0
+        # Advanced on every invalidation; a load that started before then is not cached
+        self._generation = 0
+
+    def get(self, user_id):
+        """Identity for user_id, or None if the user no longer exists"""
+        self._check_version()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                observe_cache('identity', 'hit')
+                return entry[0]
+            generation = self._generation
+        observe_cache('identity', 'miss')
+        identity = self._load(user_id)
+        if identity is not None and self.ttl > 0:
+            with self._lock:
+                if self._generation == generation:
+                    self._entries[user_id] = (identity, now + self.ttl)
+        return identity
+
+    def invalidate(self, user_id=None, tenant_id=None, user_ids=None, tenant_ids=None):
+        """Drop users' entries, tenants' users, or everything; other workers are told through Redis"""
+        user_ids = set(user_ids or ()) | ({user_id} if user_id is not None else set())
+        tenant_ids = set(tenant_ids or ()) | ({tenant_id} if tenant_id is not None else set())
+        with self._lock:
+            self._generation += 1
+            if not user_ids and not tenant_ids:
+                self._entries.clear()
+            else:
+                for key in [k for k, (identity, _) in self._entries.items()
+                            if k in user_ids or identity.tenant_id in tenant_ids]:
+                    del self._entries[key]
+        redis_client = get_redis_client()
+        if redis_client is not None:
+            try:
+                version = redis_client.incr(IDENTITY_VERSION_KEY)
+                with self._lock:
+                    self._version = int(version)
+                    self._last_version_check = time.monotonic()
+            except Exception as e:
+                logger.warning(f"Could not bump identity cache version: {e}")
+
+    def _check_version(self):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_version_check < IDENTITY_VERSION_CHECK_INTERVAL:
+                return
+            self._last_version_check = now
+        redis_client = get_redis_client()
+        if redis_client is None:
+            return
+        try:
+            raw = redis_client.get(IDENTITY_VERSION_KEY)
+            version = int(raw) if raw is not None else 0
+        except Exception as e:
+            logger.warning(f"Could not read identity cache version: {e}")
+            return
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._generation += 1
+                self._version = version
+
+    @staticmethod
+    def _load(user_id):
+        row = db.session.query(
+            User.id, User.username, User.role, User.is_admin, User.tenant_id, Tenant.subscription_plan,
+            Tenant.api_calls_this_month, Tenant.api_calls_period
+        ).outerjoin(Tenant, User.tenant_id == Tenant.id).filter(User.id == user_id).first()
+        if row is None:
+            return None
+        if row[4] is not None:
+            # The same row carries the tenant's API usage; quotas need it before this worker's first flush
+            usage_meter.seed(row[4], row[6], row[7])
+        return Identity(
+            id=row[0], username=row[1], role=row[2] or 'user', is_admin=bool(row[3]), tenant_id=row[4],
+            subscription_plan=row[5]
+        )
+
+
+# Create a global instance
+identity_cache = IdentityCache()
+
+
+def _collect(target, key):
+    # Flush-time: only note what changed; the cache is dropped once the commit is durable
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(key, set()).add(target.id)
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _user_changed(mapper, connection, target):
+    _collect(target, 'identity_users')
+
+
+@event.listens_for(Tenant, 'after_update')
+@event.listens_for(Tenant, 'after_delete')
+def _tenant_changed(mapper, connection, target):
+    _collect(target, 'identity_tenants')
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _invalidate_changed_identities(session):
+    users = session.info.pop('identity_users', None)
+    tenants = session.info.pop('identity_tenants', None)
+    if users or tenants:
+        identity_cache.invalidate(user_ids=users, tenant_ids=tenants)
@@ -0,0 +1,206 @@
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import date, datetime
+from functools import wraps
+
+from flask import has_request_context, session
+
+from .cache_service import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# How long a follower waits for the leader before computing on its own
+SINGLE_FLIGHT_WAIT_TIMEOUT = float(os.environ.get('SINGLE_FLIGHT_WAIT_TIMEOUT', 60))
+# How long the cross-worker lock is held at most (protects against crashed leaders)
+SINGLE_FLIGHT_LOCK_TTL = float(os.environ.get('SINGLE_FLIGHT_LOCK_TTL', 90))
+# How long a finished result stays in Redis for followers in other workers
+SINGLE_FLIGHT_RESULT_TTL = float(os.environ.get('SINGLE_FLIGHT_RESULT_TTL', 5))
+SINGLE_FLIGHT_POLL_INTERVAL = 0.05
+SINGLE_FLIGHT_ENABLED = os.environ.get('SINGLE_FLIGHT_ENABLED', 'true').lower() != 'false'
+
+_KEY_PREFIX = 'plateiq_sf'
+
+
+def _normalize(value):
+    """Normalize call arguments so equivalent calls produce the same key"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items())}
+    return value
+
+
+def _current_tenant():
+    if has_request_context():
+        return session.get('tenant_id') or 'global'
+    return 'global'
+
+
+def build_key(method_name, args=(), kwargs=None):
+    """Build the (tenant, method, normalized args) key for a call"""
+    payload = json.dumps(
+        {'args': _normalize(list(args)), 'kwargs': _normalize(kwargs or {})},
+        sort_keys=True,
+        default=str
+    )
+    digest = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    return f"{_current_tenant()}:{method_name}:{digest}"
+
+
+def _json_payload(result):
+    """
+    The result as JSON if it decodes back to an equal value, else None.
+    Datetimes, tuples and non-string keys would reach other workers changed, so
+    such results are only shared within the process.
+    """
+    try:
+        payload = json.dumps(result)
+    except (TypeError, ValueError):
+        return None
+    return payload if json.loads(payload) == result else None
+
+
+class _Call:
+    """An in-flight computation shared by every caller in this process"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls into one computation.
+
+    Within a process, followers block on the leader's threading.Event. Across
+    gunicorn workers, the leader holds a Redis lock and publishes its result to
+    a short-lived Redis key that followers in other workers poll for. Every
+    follower gets its own copy of the result, with the same types the leader saw.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not is_leader:
+            logger.debug(f"Single-flight: waiting on in-process leader for {key}")
+            if call.done.wait(SINGLE_FLIGHT_WAIT_TIMEOUT):
+                if call.error is not None:
+                    raise call.error
+                # Each follower gets its own copy; callers may mutate what they are handed
+                return copy.deepcopy(call.result)
+            logger.warning(f"Single-flight: leader timed out for {key}, computing locally")
+            return fn()
+
+        try:
+            result = self._do_across_workers(key, fn)
+            # Kept apart from the leader's object, which its caller is free to change
+            call.result = copy.deepcopy(result)
+            return result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def _do_across_workers(self, key, fn):
+        redis_client = get_redis_client()
+        if redis_client is None:
+            return fn()
+
+        lock_key = f"{_KEY_PREFIX}:lock:{key}"
+        result_key = f"{_KEY_PREFIX}:result:{key}"
+        token = uuid.uuid4().hex
+        try:
+            acquired = redis_client.set(lock_key, token, nx=True, px=int(SINGLE_FLIGHT_LOCK_TTL * 1000))
+        except Exception as e:
+            logger.warning(f"Single-flight: Redis lock failed for {key}: {e}")
+            return fn()
+
+        if acquired:
+            try:
+                result = fn()
+                payload = _json_payload(result)
+                if payload is None:
+                    # Followers in other workers see the lock go away and compute their own
+                    logger.debug(f"Single-flight: result for {key} does not survive JSON, not sharing it")
+                    return result
+                try:
+                    redis_client.set(result_key, payload, px=int(SINGLE_FLIGHT_RESULT_TTL * 1000))
+                except Exception as e:
+                    logger.warning(f"Single-flight: could not publish result for {key}: {e}")
+                return result
+            finally:
+                self._release(redis_client, lock_key, token)
+
+        # Another worker is computing this key: wait for its result
+        logger.debug(f"Single-flight: waiting on another worker for {key}")
+        deadline = time.monotonic() + SINGLE_FLIGHT_WAIT_TIMEOUT
+        try:
+            while time.monotonic() < deadline:
+                cached = redis_client.get(result_key)
+                if cached is not None:
+                    return json.loads(cached)
+                if not redis_client.exists(lock_key):
+                    cached = redis_client.get(result_key)
+                    if cached is not None:
+                        return json.loads(cached)
+                    break
+                time.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+        except Exception as e:
+            logger.warning(f"Single-flight: Redis wait failed for {key}: {e}")
+        return fn()
+
+    @staticmethod
+    def _release(redis_client, lock_key, token):
+        """Release the lock only if this worker still owns it"""
+        try:
+            redis_client.eval(
+                "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end",
+                1, lock_key, token
+            )
+        except Exception as e:
+            logger.warning(f"Single-flight: could not release {lock_key}: {e}")
+
+
+# Create a global instance
+single_flight_group = SingleFlight()
+
+
+def single_flight(method_name=None):
+    """
+    Decorator that coalesces concurrent identical calls to a service method.
+    The first positional argument (self) is excluded from the key.
+    """
+    def decorator(f):
+        name = method_name or f.__name__
+
+        @wraps(f)
+        def decorated_function(self, *args, **kwargs):
+            if not SINGLE_FLIGHT_ENABLED:
+                return f(self, *args, **kwargs)
+            key = build_key(name, args, kwargs)
+            return single_flight_group.do(key, lambda: f(self, *args, **kwargs))
+        return decorated_function
+    return decorator
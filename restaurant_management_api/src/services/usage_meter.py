@@ -0,0 +1,173 @@
+import atexit
+import logging
+import os
+import threading
+from collections import Counter
+from datetime import datetime
+
+from flask import g, jsonify, request
+from sqlalchemy import bindparam, case, func, select, update
+
+from ..models import db
+from ..models.tenant import Tenant, PLAN_LIMITS
+
+logger = logging.getLogger(__name__)
+
+# Never metered: logging in/out, health probes and the usage stats must work for tenants over quota
+UNMETERED_PREFIXES = ('/api/auth/', '/api/health')
+UNMETERED_ENDPOINTS = {'tenant.get_tenant_stats'}
+
+
+def current_period():
+    return datetime.utcnow().strftime('%Y-%m')
+
+
+class UsageMeter:
+    """
+    Per-tenant API call counts, aggregated in memory and written to
+    Tenant.api_calls_this_month in batches.
+
+    record() only bumps a counter under a lock. A background thread in each worker
+    adds the accumulated counts to the tenants' rows every `flush_interval` seconds
+    (one UPDATE per tenant, resetting the counter when the month rolls over) and reads
+    back the totals, which now include every worker's flushes. A tenant's total is
+    seeded from its row the first time this worker sees it (see seed), so quotas
+    hold before the first flush. Quota checks compare that cached total plus this
+    worker's unflushed calls against the plan limit, so they never touch the
+    database; the total can trail the true count by about one flush interval per
+    worker.
+    """
+
+    def __init__(self, flush_interval=10.0):
+        self.flush_interval = flush_interval
+        self._app = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = Counter()
+        self._totals = {}
+        self._thread = None
+        self._thread_pid = None
+        self._stop_event = threading.Event()
+
+    def configure(self, app, flush_interval=10.0):
+        self._app = app
+        self.flush_interval = flush_interval
+
+    # Counting
+
+    def record(self, tenant_id, calls=1):
+        with self._lock:
+            self._pending[tenant_id] += calls
+        self._ensure_thread()
+
+    def seed(self, tenant_id, calls, period):
+        """Take a tenant's stored counter (api_calls_this_month, api_calls_period) unless a flush already did"""
+        with self._lock:
+            self._totals.setdefault(tenant_id, (period, calls or 0))
+
+    def usage(self, tenant_id):
+        """Calls this month: the last total read from the database plus this worker's unflushed calls"""
+        period = current_period()
+        with self._lock:
+            total_period, total = self._totals.get(tenant_id, (period, 0))
+            return (total if total_period == period else 0) + self._pending.get(tenant_id, 0)
+
+    def over_quota(self, tenant_id, plan):
+        limit = PLAN_LIMITS.get(plan, PLAN_LIMITS['free'])['max_api_calls_per_month']
+        return limit >= 0 and self.usage(tenant_id) >= limit
+
+    # Flushing
+
+    def _ensure_thread(self):
+        # Started on first use in each process, so a preloading gunicorn master forks without it
+        if self._thread_pid == os.getpid() or self.flush_interval <= 0:
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(target=self._run, name='usage-meter', daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write pending counts to the database and refresh the cached totals; returns calls written"""
+        if self._app is None:
+            return 0
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, Counter()
+                tenant_ids = set(pending) | set(self._totals)
+            if not tenant_ids:
+                return 0
+            period = current_period()
+            tenants = Tenant.__table__
+            try:
+                with self._app.app_context(), db.engine.begin() as connection:
+                    if pending:
+                        # Core UPDATE: no ORM events, so identity caches aren't invalidated by metering
+                        connection.execute(
+                            update(tenants)
+                            .where(tenants.c.id == bindparam('b_tenant_id'))
+                            .values(
+                                api_calls_this_month=case(
+                                    (tenants.c.api_calls_period == bindparam('b_period'),
+                                     func.coalesce(tenants.c.api_calls_this_month, 0) + bindparam('b_calls')),
+                                    else_=bindparam('b_calls')
+                                ),
+                                api_calls_period=bindparam('b_period')
+                            ),
+                            [{'b_tenant_id': tenant_id, 'b_calls': calls, 'b_period': period}
+                             for tenant_id, calls in pending.items()]
+                        )
+                    rows = connection.execute(
+                        select(tenants.c.id, tenants.c.api_calls_this_month, tenants.c.api_calls_period)
+                        .where(tenants.c.id.in_(tenant_ids))
+                    ).all()
+            except Exception as e:
+                logger.warning(f"Could not flush API usage for {len(pending)} tenant(s): {e}")
+                with self._lock:
+                    self._pending.update(pending)
+                return 0
+            with self._lock:
+                for tenant_id, calls, row_period in rows:
+                    self._totals[tenant_id] = (row_period or period, calls or 0)
+            return sum(pending.values())
+
+    def stop(self):
+        """Stop the flush thread and write what is left (worker shutdown)"""
+        self._stop_event.set()
+        if self._thread_pid == os.getpid():
+            self.flush()
+
+
+# Create a global instance
+usage_meter = UsageMeter()
+atexit.register(usage_meter.stop)
+
+
+def init_usage_metering(app):
+    """Count API calls per tenant and, with API_QUOTA_ENFORCED, answer 429 once the plan's monthly limit is used"""
+    usage_meter.configure(app, flush_interval=app.config.get('USAGE_FLUSH_INTERVAL', 10.0))
+
+    @app.before_request
+    def meter_api_call():
+        identity = g.get('user')
+        if identity is None or identity.tenant_id is None or request.method == 'OPTIONS':
+            return
+        if not request.path.startswith('/api/') or request.path.startswith(UNMETERED_PREFIXES):
+            return
+        if request.endpoint in UNMETERED_ENDPOINTS:
+            return
+        if app.config.get('API_QUOTA_ENFORCED', False) and usage_meter.over_quota(identity.tenant_id, identity.subscription_plan):
+            limit = PLAN_LIMITS.get(identity.subscription_plan, PLAN_LIMITS['free'])['max_api_calls_per_month']
+            return jsonify({
+                'error': 'Monthly API call limit reached for your plan',
+                'subscription_plan': identity.subscription_plan,
+                'max_api_calls_per_month': limit
+            }), 429
+        usage_meter.record(identity.tenant_id)
@@ -1,6 +1,13 @@
 from functools import wraps
-from flask import session, jsonify, current_app, request
-from ..models.user import User
+from flask import session, jsonify, current_app, request, g
+from ..services.identity_cache import identity_cache
+
+def current_identity():
+    """The logged-in user's Identity, resolved once per request (None when logged out or deleted)"""
+    if 'identity' not in g:
+        user_id = session.get('user_id')
+        g.identity = identity_cache.get(user_id) if user_id else None
+    return g.identity
 
 def login_required(f):
     @wraps(f)
@@ -16,7 +23,7 @@ def admin_required(f):
         user_id = session.get('user_id')
         if not user_id:
             return jsonify({'error': 'Authentication required'}), 401
-        user = User.query.get(user_id)
+        user = current_identity()
         if not user:
             session.clear()
             return jsonify({'error': 'User not found'}), 401
@@ -31,7 +38,7 @@ def tenant_admin_required(f):
         user_id = session.get('user_id')
         if not user_id:
             return jsonify({'error': 'Authentication required'}), 401
-        user = User.query.get(user_id)
+        user = current_identity()
         if not user:
             session.clear()
             return jsonify({'error': 'User not found'}), 401
@@ -47,7 +54,7 @@ def super_admin_required(f):
         user_id = session.get('user_id')
         if not user_id:
             return jsonify({'error': 'Authentication required'}), 401
-        user = User.query.get(user_id)
+        user = current_identity()
         if not user:
             session.clear()
             return jsonify({'error': 'User not found'}), 401
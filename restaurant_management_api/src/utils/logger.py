@@ -1,30 +1,195 @@
+import atexit
+import json
 import logging
 import logging.handlers
 import os
-from datetime import datetime
+import queue
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
 from flask import request, g, has_request_context
 
+# Module-level so a forked worker can restart the listener thread (threads do not survive fork)
+_log_listener = None
+
+def _stamp_request_info(record):
+    """Copy request details onto the record while still in the request's thread."""
+    if hasattr(record, 'request_id'):
+        return
+    if has_request_context() and hasattr(g, 'request_id'):
+        record.request_id = g.request_id
+    else:
+        record.request_id = 'N/A'
+        
+    if has_request_context() and request:
+        record.method = request.method
+        record.url = request.url
+        record.remote_addr = request.remote_addr
+    else:
+        record.method = 'N/A'
+        record.url = 'N/A'
+        record.remote_addr = 'N/A'
+
 class RequestFormatter(logging.Formatter):
     """Custom formatter that includes request information."""
     
     def format(self, record):
-        # Add request information if available
-        if has_request_context() and hasattr(g, 'request_id'):
-            record.request_id = g.request_id
-        else:
-            record.request_id = 'N/A'
-            
-        if has_request_context() and request:
-            record.method = request.method
-            record.url = request.url
-            record.remote_addr = request.remote_addr
-        else:
-            record.method = 'N/A'
-            record.url = 'N/A'
-            record.remote_addr = 'N/A'
-            
+        # Records from the queue were stamped by RequestContextFilter before leaving the request thread
+        _stamp_request_info(record)
         return super().format(record)
 
+class RequestContextFilter(logging.Filter):
+    """Stamp request information on records before they are handed to the log queue."""
+    
+    def filter(self, record):
+        _stamp_request_info(record)
+        return True
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per call site (logger, file, line) for records below ERROR.
+    
+    A site may log `burst` records at once and `rate` per second after that;
+    the next record let through reports how many were dropped in between.
+    """
+    
+    def __init__(self, rate=10.0, burst=50):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._buckets = {}
+    
+    def filter(self, record):
+        if self.rate <= 0 or record.levelno >= logging.ERROR:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            tokens, last, suppressed = self._buckets.get(key, (self.burst, now, 0))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now, suppressed + 1)
+                return False
+            self._buckets[key] = (tokens - 1, now, 0)
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} similar messages suppressed)"
+        return True
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep one in every N records below WARNING for selected loggers.
+    
+    `rates` maps a logger name (or prefix) to the fraction of records kept,
+    e.g. {'root': 0.1} keeps every 10th INFO/DEBUG record logged via logging.info().
+    """
+    
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = {name: max(1, round(1 / rate)) for name, rate in rates.items() if rate > 0}
+        self._lock = threading.Lock()
+        self._counters = {}
+    
+    def _every(self, name):
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition('.')[0]
+        return 1
+    
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        every = self._every(record.name)
+        if every == 1:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        with self._lock:
+            count = self._counters.get(key, 0)
+            self._counters[key] = count + 1
+        return count % every == 0
+
+class FanoutHandler(logging.Handler):
+    """Synchronous counterpart of the queue listener: hands each record to every handler."""
+    
+    def __init__(self, handlers):
+        super().__init__()
+        self.handlers = handlers
+    
+    def emit(self, record):
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+class LazyJSON:
+    """Defers json.dumps until the log record is actually formatted."""
+    
+    __slots__ = ('obj', 'limit')
+    
+    def __init__(self, obj, limit=None):
+        self.obj = obj
+        self.limit = limit
+    
+    def __str__(self):
+        text = json.dumps(self.obj, default=str)
+        return text[:self.limit] if self.limit else text
+
+def lazy_json(obj, limit=None):
+    """Log argument rendering obj as JSON only if the record is emitted: logger.debug("Item: %s", lazy_json(item))"""
+    return LazyJSON(obj, limit)
+
+# Argument types that cannot change between the log call and the listener rendering them
+_IMMUTABLE_ARGS = (str, bytes, int, float, complex, bool, type(None), Decimal, date, LazyJSON)
+
+def _deferrable(args):
+    """True if every log argument is immutable (tuples are checked element-wise)."""
+    if isinstance(args, tuple):
+        return all(_deferrable(arg) for arg in args)
+    if isinstance(args, dict):
+        return all(_deferrable(value) for value in args.values())
+    return isinstance(args, _IMMUTABLE_ARGS)
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves message formatting to the listener thread when that is safe.
+    
+    The stock handler renders msg % args in the caller before enqueueing. Records
+    whose arguments are all immutable (or lazy_json wrappers) are queued as-is and
+    rendered off the request path; any other argument could change before the
+    listener gets to it, so those messages are rendered here, as the stock handler does.
+    """
+    
+    def prepare(self, record):
+        if record.args and not _deferrable(record.args):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+def parse_sampling(spec):
+    """Parse 'name=rate,name=rate' (e.g. 'root=0.1,src.services=0.5') into a dict."""
+    rates = {}
+    for part in (spec or '').split(','):
+        name, _, rate = part.partition('=')
+        if name.strip() and rate.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+def start_log_listener():
+    """(Re)start the queue listener, e.g. in a gunicorn worker after fork."""
+    global _log_listener
+    if _log_listener is None:
+        return
+    thread = _log_listener._thread
+    if thread is None or not thread.is_alive():
+        _log_listener._thread = None
+        _log_listener.start()
+
+def stop_log_listener():
+    """Flush queued records and stop the listener thread."""
+    if _log_listener is not None and _log_listener._thread is not None:
+        _log_listener.stop()
+
 def setup_logger(app):
     """Setup comprehensive logging for the application."""
     
@@ -38,6 +203,9 @@ def setup_logger(app):
     
     # Clear existing handlers
     root_logger.handlers.clear()
+    global _log_listener
+    stop_log_listener()
+    _log_listener = None
     
     # Console handler
     console_handler = logging.StreamHandler()
@@ -46,7 +214,6 @@ def setup_logger(app):
         '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(method)s %(url)s - %(message)s'
     )
     console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
     
     # File handler with rotation
     file_handler = logging.handlers.RotatingFileHandler(
@@ -59,7 +226,6 @@ def setup_logger(app):
         '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(method)s %(url)s - %(remote_addr)s - %(message)s'
     )
     file_handler.setFormatter(file_formatter)
-    root_logger.addHandler(file_handler)
     
     # Error file handler
     error_handler = logging.handlers.RotatingFileHandler(
@@ -72,7 +238,26 @@ def setup_logger(app):
         '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(method)s %(url)s - %(remote_addr)s - %(message)s\n%(exc_info)s'
     )
     error_handler.setFormatter(error_formatter)
-    root_logger.addHandler(error_handler)
+    handlers = [console_handler, file_handler, error_handler]
+    
+    # Hot-loop protection: per-call-site rate limit plus optional per-logger sampling
+    log_filters = [RateLimitFilter(app.config.get('LOG_RATE_LIMIT', 10), app.config.get('LOG_RATE_BURST', 50))]
+    sampling = parse_sampling(app.config.get('LOG_SAMPLING'))
+    if sampling:
+        log_filters.append(SamplingFilter(sampling))
+    log_filters.append(RequestContextFilter())
+    
+    if app.config.get('LOG_ASYNC', True):
+        # Requests only enqueue records; a listener thread does the formatting and file I/O
+        front_handler = DeferredQueueHandler(queue.SimpleQueue())
+        _log_listener = logging.handlers.QueueListener(front_handler.queue, *handlers, respect_handler_level=True)
+        _log_listener.start()
+        atexit.register(stop_log_listener)
+    else:
+        front_handler = FanoutHandler(handlers)
+    for log_filter in log_filters:
+        front_handler.addFilter(log_filter)
+    root_logger.addHandler(front_handler)
     
     # Set specific logger levels
     logging.getLogger('werkzeug').setLevel(logging.WARNING)
@@ -83,7 +268,7 @@ def setup_logger(app):
 def log_request_info():
     """Log request information for debugging."""
     logger = logging.getLogger(__name__)
-    logger.info(f"Request started: {request.method} {request.path}")
+    logger.info("Request started: %s %s", request.method, request.path)
 
 def log_request_error(error):
     """Log request errors with context."""
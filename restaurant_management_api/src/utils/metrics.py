@@ -0,0 +1,177 @@
+import os
+import re
+import time
+
+from flask import Blueprint, Response, abort, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+
+from .query_stats import current_query_stats
+
+# With several gunicorn workers, set PROMETHEUS_MULTIPROC_DIR to an empty, writable
+# directory before the app is imported; every worker then writes its samples there
+# and /metrics aggregates them. Without it, metrics are per process.
+MULTIPROCESS = bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+# Optional bearer token required to scrape /metrics
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+REQUEST_LATENCY = Histogram(
+    'plateiq_http_request_duration_seconds',
+    'HTTP request latency by blueprint, route and status',
+    ['method', 'blueprint', 'route', 'status'],
+    buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'plateiq_http_requests_in_flight',
+    'Requests currently being handled, summed over live workers; saturation = in_flight / worker slots',
+    multiprocess_mode='livesum'
+)
+CLOVER_REQUESTS = Counter(
+    'plateiq_clover_requests_total',
+    'Clover API calls by endpoint and HTTP status',
+    ['endpoint', 'status']
+)
+CLOVER_LATENCY = Histogram(
+    'plateiq_clover_request_duration_seconds',
+    'Clover API call latency (time to response headers) by endpoint',
+    ['endpoint'],
+    buckets=LATENCY_BUCKETS
+)
+CLOVER_RATE_LIMITED = Counter(
+    'plateiq_clover_rate_limited_total',
+    'Clover API calls answered with 429 by endpoint',
+    ['endpoint']
+)
+DB_QUERIES = Histogram(
+    'plateiq_db_queries_per_request',
+    'SQL statements executed per request by route',
+    ['route'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+)
+DB_TIME = Histogram(
+    'plateiq_db_time_per_request_seconds',
+    'Total SQL execution time per request by route',
+    ['route'],
+    buckets=LATENCY_BUCKETS
+)
+CACHE_REQUESTS = Counter(
+    'plateiq_cache_requests_total',
+    'Cache lookups by cache and result (hit, stale, miss); hit ratio = hit / all',
+    ['cache', 'result']
+)
+ROWS_PROCESSED = Counter(
+    'plateiq_rows_processed_total',
+    'Rows processed by uploads and syncs; rows/sec = rate(rows) / rate(duration_sum)',
+    ['operation']
+)
+OPERATION_DURATION = Histogram(
+    'plateiq_operation_duration_seconds',
+    'Wall time of uploads and syncs',
+    ['operation'],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+)
+STARTUP_DURATION = Gauge(
+    'plateiq_app_startup_seconds',
+    'Cold start of src.main by phase (imports, create_app)',
+    ['phase'],
+    multiprocess_mode='max'
+)
+
+metrics_bp = Blueprint('metrics', __name__)
+
+_ID_SEGMENT = re.compile(r'^[A-Za-z0-9]{8,}$|^\d+$')
+
+
+def clover_endpoint(url):
+    """Collapse a Clover URL to a low-cardinality endpoint label, e.g. orders/:id/line_items"""
+    path = url.split('?', 1)[0]
+    _, _, tail = path.partition('/merchants/')
+    segments = [s for s in tail.split('/')[1:] if s]
+    if not segments:
+        return 'merchant'
+    return '/'.join(':id' if i % 2 and _ID_SEGMENT.match(s) else s for i, s in enumerate(segments))
+
+
+def observe_clover_call(url, status, seconds):
+    endpoint = clover_endpoint(url)
+    CLOVER_REQUESTS.labels(endpoint, str(status)).inc()
+    CLOVER_LATENCY.labels(endpoint).observe(seconds)
+    if status == 429:
+        CLOVER_RATE_LIMITED.labels(endpoint).inc()
+
+
+def clover_response_hook(response, *args, **kwargs):
+    """requests response hook recording every Clover call made through a session"""
+    observe_clover_call(response.url, response.status_code, response.elapsed.total_seconds())
+    return response
+
+
+def observe_cache(cache, result):
+    CACHE_REQUESTS.labels(cache, result).inc()
+
+
+def observe_throughput(operation, rows, seconds):
+    ROWS_PROCESSED.labels(operation).inc(rows)
+    OPERATION_DURATION.labels(operation).observe(seconds)
+
+
+def observe_startup(phase, seconds):
+    STARTUP_DURATION.labels(phase).set(seconds)
+
+
+def _route_label():
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def init_metrics(app):
+    """Record request latency and per-request DB usage, and register /metrics"""
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started_at = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.get('request_started_at')
+        if started is None or request.endpoint == 'metrics.metrics':
+            return response
+        route = _route_label()
+        REQUEST_LATENCY.labels(
+            request.method, request.blueprint or 'app', route, str(response.status_code)
+        ).observe(time.perf_counter() - started)
+        stats = current_query_stats()
+        if stats is not None:
+            DB_QUERIES.labels(route).observe(stats.count)
+            DB_TIME.labels(route).observe(stats.total_time)
+        return response
+
+    @app.teardown_request
+    def finish_in_flight(exc):
+        # teardown runs even when the view raised, so the gauge can't drift upwards
+        if g.pop('request_started_at', None) is not None:
+            REQUESTS_IN_FLIGHT.dec()
+
+    app.register_blueprint(metrics_bp)
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint"""
+    if METRICS_TOKEN and request.headers.get('Authorization') != f'Bearer {METRICS_TOKEN}':
+        abort(401)
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+def mark_worker_dead(pid):
+    """Drop a dead gunicorn worker's live samples (call from the child_exit hook)"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,67 @@
+import base64
+import json
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, tuple_
+
+
+class InvalidCursor(ValueError):
+    """The cursor is malformed or was issued for a different ordering"""
+
+
+def encode_cursor(values):
+    """Opaque, URL-safe cursor for the sort-key values of the last row on a page"""
+    payload = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    """Sort-key values from a cursor, converted back to each column's Python type"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor('Malformed cursor') from e
+    if not isinstance(payload, list) or len(payload) != len(columns):
+        raise InvalidCursor('Cursor does not match this listing')
+    values = []
+    for column, value in zip(columns, payload):
+        try:
+            if value is not None and isinstance(column.type, DateTime):
+                value = datetime.fromisoformat(value)
+            elif value is not None and isinstance(column.type, Date):
+                value = date.fromisoformat(value)
+        except (ValueError, TypeError) as e:
+            raise InvalidCursor('Malformed cursor') from e
+        values.append(value)
+    return values
+
+
+def keyset_paginate(query, columns, cursor=None, limit=50, descending=False, serialize=None):
+    """
+    One page of `query` ordered by `columns`, continuing after `cursor`.
+
+    The last column must be unique (normally the primary key) so the order is total,
+    and the columns should match an index that starts with the query's equality filters
+    (e.g. tenant_id, line_item_date, id): each page is then a single index range scan
+    no matter how deep it is, unlike OFFSET which reads and discards every earlier row.
+    Sort-key columns must not be NULL. Returns {'data', 'next_cursor', 'has_more', 'limit'}.
+    """
+    if cursor:
+        key, after = tuple_(*columns), tuple_(*decode_cursor(cursor, columns))
+        query = query.filter(key < after if descending else key > after)
+    order = [c.desc() for c in columns] if descending else [c.asc() for c in columns]
+    # One extra row tells whether another page exists without a COUNT
+    rows = query.order_by(*order).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+    return {
+        'data': [serialize(row) for row in rows] if serialize else rows,
+        'next_cursor': next_cursor,
+        'has_more': has_more,
+        'limit': limit
+    }
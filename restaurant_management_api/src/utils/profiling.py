@@ -0,0 +1,333 @@
+import cProfile
+import fnmatch
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+from flask import g, request, session
+
+logger = logging.getLogger(__name__)
+
+MODES = ('cprofile', 'sampling')
+# Output file extension per mode: pstats dumps for snakeviz/flameprof, collapsed stacks for flamegraph.pl/speedscope
+EXTENSIONS = {'cprofile': 'prof', 'sampling': 'folded'}
+# Paths never profiled, so arming a broad pattern can't capture the profiling API or scrapes
+EXCLUDED_PREFIXES = ('/api/admin/profil', '/metrics')
+
+PROFILE_ID = re.compile(r'^[0-9a-f]{12}-\d{3}$')
+
+_ARMED_FILE = 'armed.json'
+
+
+class ProfilingSession:
+    """Profile the next `count` requests whose path matches `route` (fnmatch) and, if set, `tenant_id`."""
+
+    def __init__(self, mode='cprofile', route='*', tenant_id=None, count=10, interval_ms=5.0,
+                 expires_at=None, id=None, created_at=None):
+        self.id = id or uuid.uuid4().hex[:12]
+        self.mode = mode
+        self.route = route
+        self.tenant_id = tenant_id
+        self.count = count
+        self.interval_ms = interval_ms
+        self.expires_at = expires_at
+        self.created_at = created_at or datetime.utcnow().isoformat()
+
+    def matches(self, path, tenant_id):
+        if self.expires_at is not None and time.time() > self.expires_at:
+            return False
+        if self.tenant_id is not None and tenant_id != self.tenant_id:
+            return False
+        return fnmatch.fnmatchcase(path, self.route)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'mode': self.mode,
+            'route': self.route,
+            'tenant_id': self.tenant_id,
+            'count': self.count,
+            'interval_ms': self.interval_ms,
+            'expires_at': self.expires_at,
+            'created_at': self.created_at
+        }
+
+
+class StackSampler(threading.Thread):
+    """Samples one thread's Python stack every `interval` seconds into collapsed-stack counts."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name='profile-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def collapsed(self):
+        """Brendan Gregg's folded format: 'root;child;leaf count' per line"""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+class Profiler:
+    """
+    Arms profiling sessions and saves the profiles they produce.
+
+    The armed session lives in <folder>/armed.json so every gunicorn worker picks it up;
+    a worker re-reads it at most every `check_interval` seconds, so while nothing is armed
+    a request costs one clock read. Each profiled request claims a slot by creating its
+    metadata file exclusively, which keeps the total at `count` across workers.
+    """
+
+    def __init__(self):
+        self.folder = None
+        self.max_requests = 100
+        self.check_interval = 1.0
+        self._session = None
+        self._exhausted = set()
+        self._next_check = 0.0
+        self._armed_mtime = None
+        self._lock = threading.Lock()
+
+    def configure(self, folder, max_requests=100, check_interval=1.0):
+        self.folder = os.path.abspath(folder)
+        self.max_requests = max_requests
+        self.check_interval = check_interval
+        os.makedirs(self.folder, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.folder, name)
+
+    # Arming
+
+    def arm(self, **options):
+        profiling_session = ProfilingSession(**options)
+        temp_path = self._path(f'.{_ARMED_FILE}.{os.getpid()}')
+        with open(temp_path, 'w') as f:
+            json.dump(profiling_session.to_dict(), f)
+        os.replace(temp_path, self._path(_ARMED_FILE))
+        with self._lock:
+            self._session = profiling_session
+            self._next_check = 0.0
+        logger.info("Profiling armed: %s", profiling_session.to_dict())
+        return profiling_session
+
+    def disarm(self, session_id=None):
+        """Remove the armed session (only if it is still `session_id`, when given)"""
+        current = self._read_armed()
+        if current is not None and (session_id is None or current.id == session_id):
+            try:
+                os.remove(self._path(_ARMED_FILE))
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._session = None
+            self._armed_mtime = None
+            self._next_check = 0.0
+        return current
+
+    def _read_armed(self):
+        try:
+            with open(self._path(_ARMED_FILE)) as f:
+                return ProfilingSession(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except (ValueError, TypeError) as e:
+            logger.warning("Ignoring unreadable %s: %s", _ARMED_FILE, e)
+            return None
+
+    def armed_session(self):
+        """The armed session for this worker, refreshed from disk every check_interval"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return self._session
+        with self._lock:
+            self._next_check = now + self.check_interval
+            try:
+                mtime = os.stat(self._path(_ARMED_FILE)).st_mtime_ns
+            except (FileNotFoundError, TypeError):
+                self._session, self._armed_mtime = None, None
+                return None
+            if mtime != self._armed_mtime:
+                self._armed_mtime = mtime
+                self._session = self._read_armed()
+            return self._session
+
+    def status(self):
+        current = self._read_armed()
+        if current is None:
+            return None
+        status = current.to_dict()
+        status['captured'] = len(self.list_profiles(current.id))
+        status['remaining'] = max(current.count - status['captured'], 0)
+        return status
+
+    # Capturing
+
+    def claim(self, profiling_session):
+        """Reserve the next free slot of the session; None once all `count` are taken"""
+        if profiling_session.id in self._exhausted:
+            return None
+        for index in range(profiling_session.count):
+            profile_id = f"{profiling_session.id}-{index:03d}"
+            try:
+                fd = os.open(self._path(f'{profile_id}.json'), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                continue
+            os.close(fd)
+            return profile_id
+        self._exhausted.add(profiling_session.id)
+        self.disarm(profiling_session.id)
+        logger.info("Profiling session %s captured all %d requests", profiling_session.id, profiling_session.count)
+        return None
+
+    def release(self, profile_id):
+        try:
+            os.remove(self._path(f'{profile_id}.json'))
+        except FileNotFoundError:
+            pass
+
+    def save(self, profile_id, mode, data, metadata):
+        filename = f"{profile_id}.{EXTENSIONS[mode]}"
+        if mode == 'cprofile':
+            data.dump_stats(self._path(filename))
+        else:
+            with open(self._path(filename), 'w') as f:
+                f.write(data.collapsed())
+        metadata = dict(metadata, id=profile_id, mode=mode, filename=filename,
+                        size=os.path.getsize(self._path(filename)))
+        with open(self._path(f'{profile_id}.json'), 'w') as f:
+            json.dump(metadata, f)
+        return metadata
+
+    # Stored profiles
+
+    def list_profiles(self, session_id=None):
+        """Metadata of saved profiles, newest first (claimed slots still running are skipped)"""
+        profiles = []
+        for name in os.listdir(self.folder):
+            if not name.endswith('.json') or not PROFILE_ID.match(name[:-5]):
+                continue
+            if session_id is not None and not name.startswith(f'{session_id}-'):
+                continue
+            try:
+                with open(self._path(name)) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        profiles.sort(key=lambda p: p.get('started_at', ''), reverse=True)
+        return profiles
+
+    def get_profile(self, profile_id):
+        """(metadata, absolute file path) of a saved profile, or None"""
+        if not PROFILE_ID.match(profile_id):
+            return None
+        try:
+            with open(self._path(f'{profile_id}.json')) as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return metadata, self._path(metadata['filename'])
+
+    def delete_profile(self, profile_id):
+        found = self.get_profile(profile_id)
+        if found is None:
+            return False
+        metadata, path = found
+        for target in (path, self._path(f'{profile_id}.json')):
+            try:
+                os.remove(target)
+            except FileNotFoundError:
+                pass
+        return True
+
+
+# Create a global instance
+profiler = Profiler()
+
+
+def init_profiling(app):
+    """Profile requests matching the armed session; see src/routes/admin.py for the API"""
+    profiler.configure(
+        app.config.get('PROFILE_FOLDER', 'profiles'),
+        max_requests=app.config.get('PROFILE_MAX_REQUESTS', 100),
+        check_interval=app.config.get('PROFILE_CHECK_INTERVAL', 1.0)
+    )
+
+    @app.before_request
+    def start_profile():
+        profiling_session = profiler.armed_session()
+        if profiling_session is None or request.path.startswith(EXCLUDED_PREFIXES):
+            return
+        if not profiling_session.matches(request.path, session.get('tenant_id')):
+            return
+        profile_id = profiler.claim(profiling_session)
+        if profile_id is None:
+            return
+        if profiling_session.mode == 'cprofile':
+            collector = cProfile.Profile()
+            try:
+                collector.enable()
+            except ValueError:
+                # Another thread of this worker is already being profiled (one cProfile at a time on 3.12+)
+                profiler.release(profile_id)
+                return
+        else:
+            collector = StackSampler(threading.get_ident(), profiling_session.interval_ms / 1000)
+            collector.start()
+        g.profile = (profile_id, profiling_session, collector, time.perf_counter(), datetime.utcnow())
+
+    @app.after_request
+    def record_profile_status(response):
+        if 'profile' in g:
+            g.profile_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def finish_profile(exc):
+        active = g.pop('profile', None)
+        if active is None:
+            return
+        profile_id, profiling_session, collector, started, started_at = active
+        if profiling_session.mode == 'cprofile':
+            collector.disable()
+        else:
+            collector.stop()
+        try:
+            profiler.save(profile_id, profiling_session.mode, collector, {
+                'session_id': profiling_session.id,
+                'method': request.method,
+                'path': request.path,
+                'query_string': request.query_string.decode('utf-8', 'replace'),
+                'route': request.url_rule.rule if request.url_rule is not None else None,
+                'tenant_id': session.get('tenant_id'),
+                'user_id': session.get('user_id'),
+                'status': g.pop('profile_status', 500),
+                'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+                'started_at': started_at.isoformat(),
+                'pid': os.getpid()
+            })
+        except Exception as e:
+            logger.error("Failed to save profile %s: %s", profile_id, e)
+            profiler.release(profile_id)
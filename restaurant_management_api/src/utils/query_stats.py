@@ -0,0 +1,150 @@
+import heapq
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Number of slowest statements kept per request
+SLOWEST_KEPT = 5
+# Statements are truncated to this many characters in logs and assertion messages
+STATEMENT_PREVIEW = 300
+
+_local = threading.local()
+# Statements slower than this are logged individually; set by init_query_stats
+_slow_query_ms = None
+
+
+class QueryStats:
+    """Query count, total DB time and the slowest statements for one request (or capture)."""
+
+    def __init__(self, keep_statements=False):
+        self.count = 0
+        self.total_time = 0.0
+        self._slowest = []
+        self.statements = [] if keep_statements else None
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.total_time += duration
+        entry = (duration, self.count, statement[:STATEMENT_PREVIEW])
+        if len(self._slowest) < SLOWEST_KEPT:
+            heapq.heappush(self._slowest, entry)
+        elif duration > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+        if self.statements is not None:
+            self.statements.append(statement[:STATEMENT_PREVIEW])
+
+    @property
+    def slowest(self):
+        """[(duration_ms, statement)] slowest first"""
+        return [(round(d * 1000, 2), s) for d, _, s in sorted(self._slowest, reverse=True)]
+
+    def to_dict(self):
+        return {
+            'query_count': self.count,
+            'db_time_ms': round(self.total_time * 1000, 2),
+            'slowest': self.slowest
+        }
+
+
+def current_query_stats():
+    """QueryStats for the current request, or None outside a request."""
+    if has_request_context():
+        return g.get('query_stats')
+    return None
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get('query_start_time')
+    if not start_times:
+        return
+    duration = time.perf_counter() - start_times.pop()
+
+    stats = current_query_stats()
+    if stats is not None:
+        stats.record(statement, duration)
+    for capture in getattr(_local, 'captures', ()):
+        capture.record(statement, duration)
+
+    if _slow_query_ms and duration * 1000 >= _slow_query_ms:
+        logger.warning("Slow query (%.1f ms) [%s]: %s", duration * 1000,
+                       g.get('request_id', 'N/A') if has_request_context() else 'N/A',
+                       statement[:STATEMENT_PREVIEW])
+
+
+def init_query_stats(app):
+    """Track queries per request; log requests over the thresholds and expose stats as headers outside production."""
+    global _slow_query_ms
+    _slow_query_ms = app.config.get('SLOW_QUERY_MS', 200)
+    max_queries = app.config.get('REQUEST_QUERY_COUNT_THRESHOLD', 50)
+    max_db_time_ms = app.config.get('REQUEST_DB_TIME_THRESHOLD_MS', 500)
+    send_headers = app.config.get('QUERY_STATS_HEADERS', False)
+
+    @app.before_request
+    def start_query_stats():
+        g.query_stats = QueryStats()
+
+    @app.after_request
+    def finish_query_stats(response):
+        stats = g.get('query_stats')
+        if stats is None:
+            return response
+        db_time_ms = stats.total_time * 1000
+        if stats.count > max_queries or db_time_ms > max_db_time_ms:
+            logger.warning(
+                "Request %s %s [%s] ran %d queries in %.1f ms; slowest: %s",
+                request.method, request.path, g.get('request_id', 'N/A'),
+                stats.count, db_time_ms, stats.slowest
+            )
+        if send_headers:
+            response.headers['X-DB-Query-Count'] = str(stats.count)
+            response.headers['X-DB-Time-Ms'] = f"{db_time_ms:.1f}"
+            response.headers['X-Request-ID'] = g.get('request_id', '')
+        return response
+
+
+@contextmanager
+def count_queries():
+    """
+    Capture every statement run in this thread inside the block.
+
+        with count_queries() as stats:
+            client.get('/api/tenant/tenants/abc/stats')
+        print(stats.count, stats.statements)
+    """
+    stats = QueryStats(keep_statements=True)
+    captures = getattr(_local, 'captures', None)
+    if captures is None:
+        captures = _local.captures = []
+    captures.append(stats)
+    try:
+        yield stats
+    finally:
+        captures.remove(stats)
+
+
+@contextmanager
+def assert_max_queries(limit):
+    """
+    Fail if the block runs more than `limit` SQL statements, listing them.
+
+        with assert_max_queries(5):
+            response = client.get('/api/dashboard/overview')
+    """
+    with count_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        listing = '\n'.join(f"  {i}. {s}" for i, s in enumerate(stats.statements, 1))
+        raise AssertionError(f"Expected at most {limit} queries, ran {stats.count}:\n{listing}")
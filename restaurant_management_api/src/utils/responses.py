@@ -0,0 +1,132 @@
+"""
+Response layer: fast JSON encoding, optional MessagePack and gzip/brotli compression.
+
+- jsonify() and dict/list returns are encoded with orjson when it is installed.
+  The output matches Flask's default provider (sorted keys, HTTP dates, Decimal as
+  string), and the encoder falls back to it for anything orjson rejects.
+- Clients that prefer `Accept: application/msgpack` get the same payload as
+  MessagePack when msgpack is installed (RESPONSE_MSGPACK_ENABLED).
+- Bodies of at least COMPRESS_MIN_SIZE bytes are compressed with brotli (if
+  installed) or gzip, following the client's Accept-Encoding.
+"""
+
+import gzip
+import logging
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional format
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional encoding
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+# Text-like bodies worth compressing; images, archives and already-encoded bodies are left alone
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', MSGPACK_MIMETYPE, 'text/csv', 'text/plain', 'text/html', 'application/javascript'
+}
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, with MessagePack responses for clients that ask for them"""
+
+    msgpack_enabled = True
+
+    def _orjson_options(self):
+        # Datetimes go through `default` so they stay HTTP dates, as with Flask's encoder
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._dumps_bytes(obj).decode('utf-8')
+
+    def _dumps_bytes(self, obj):
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._orjson_options())
+        except TypeError:
+            # Integers beyond 64 bits, non-string subclasses as keys, etc.
+            return super().dumps(obj).encode('utf-8')
+
+    def _wants_msgpack(self):
+        return (self.msgpack_enabled and msgpack is not None and
+                request.accept_mimetypes.best_match([self.mimetype, MSGPACK_MIMETYPE]) == MSGPACK_MIMETYPE)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if self._wants_msgpack():
+            body = msgpack.packb(obj, default=self.default, use_bin_type=True, datetime=False)
+            response = self._app.response_class(body, mimetype=MSGPACK_MIMETYPE)
+        elif orjson is not None:
+            response = self._app.response_class(self._dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
+        else:
+            response = super().response(*args, **kwargs)
+        if self.msgpack_enabled and msgpack is not None:
+            response.vary.add('Accept')
+        return response
+
+
+def negotiate_encoding():
+    """'br', 'gzip' or None, by the client's Accept-Encoding quality and what is installed"""
+    accepted = request.accept_encodings
+    candidates = [('br', accepted['br'])] if brotli is not None else []
+    candidates.append(('gzip', accepted['gzip']))
+    encoding, quality = max(candidates, key=lambda c: c[1])
+    return encoding if quality > 0 else None
+
+
+def init_responses(app):
+    """Install the fast JSON provider and compress large responses"""
+    provider = FastJSONProvider(app)
+    provider.msgpack_enabled = app.config.get('RESPONSE_MSGPACK_ENABLED', True)
+    app.json = provider
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+    gzip_level = app.config.get('COMPRESS_GZIP_LEVEL', 6)
+    brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', 4)
+    logger.info("Responses: json=%s, msgpack=%s, brotli=%s, compress >= %s bytes",
+                'orjson' if orjson is not None else 'stdlib', provider.msgpack_enabled and msgpack is not None,
+                brotli is not None, min_size if min_size > 0 else 'off')
+    if min_size <= 0:
+        return
+
+    @app.after_request
+    def compress_response(response):
+        if (response.direct_passthrough or response.is_streamed or response.status_code < 200
+                or response.status_code in (204, 206, 304) or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+        response.vary.add('Accept-Encoding')
+        body = response.get_data()
+        if len(body) < min_size:
+            return response
+        encoding = negotiate_encoding()
+        if encoding is None:
+            return response
+        if encoding == 'br':
+            compressed = brotli.compress(body, quality=brotli_quality)
+        else:
+            compressed = gzip.compress(body, compresslevel=gzip_level, mtime=0)
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        # Strong validators describe the uncompressed body; the encoded one is a different representation
+        if response.headers.get('ETag') and not response.headers['ETag'].startswith('W/'):
+            response.headers['ETag'] = 'W/' + response.headers['ETag']
+        return response
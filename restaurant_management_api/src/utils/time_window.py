@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import pytz
+
+# Business day boundaries for Clover data are taken in the restaurant's timezone
+BUSINESS_TZ = pytz.timezone('America/Chicago')
+
+DEFAULT_RANGE_DAYS = 30
+
+
+def to_epoch_ms(value: datetime) -> int:
+    """Epoch milliseconds for a datetime; naive datetimes are taken as UTC"""
+    if value.tzinfo is None:
+        value = pytz.utc.localize(value)
+    return int(value.timestamp() * 1000)
+
+
+class TimeWindow:
+    """
+    Inclusive [start_ms, end_ms] window in epoch milliseconds.
+
+    Bounds are computed once, when the window is built; membership is a plain
+    integer comparison against a Clover createdTime, so filtering an order never
+    builds a datetime. A missing bound leaves that side of the window open.
+    """
+
+    __slots__ = ('start_ms', 'end_ms')
+
+    def __init__(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None):
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+
+    @classmethod
+    def for_days(cls, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                 tz=BUSINESS_TZ) -> 'TimeWindow':
+        """
+        Window covering whole business days, from midnight of start_date to the
+        last millisecond of end_date in `tz`. Defaults to the last 30 days; a
+        missing end defaults to now and a missing start to 30 days before the end.
+        """
+        # localize() picks the right UTC offset for the boundary itself, even on DST change days
+        if start_date:
+            day = start_date.astimezone(tz).date()
+            start_date = tz.localize(datetime.combine(day, datetime.min.time()))
+        if end_date:
+            day = end_date.astimezone(tz).date()
+            end_date = tz.localize(datetime.combine(day, datetime.max.time().replace(microsecond=999000)))
+        if not start_date and not end_date:
+            end_date = datetime.now(pytz.utc)
+            start_date = end_date - timedelta(days=DEFAULT_RANGE_DAYS)
+        elif not start_date:
+            start_date = end_date - timedelta(days=DEFAULT_RANGE_DAYS)
+        elif not end_date:
+            end_date = datetime.now(pytz.utc)
+        return cls(to_epoch_ms(start_date), to_epoch_ms(end_date))
+
+    @classmethod
+    def today(cls, tz=BUSINESS_TZ) -> 'TimeWindow':
+        """Window from today's midnight in `tz` up to now"""
+        now = datetime.now(tz)
+        midnight = tz.localize(datetime.combine(now.date(), datetime.min.time()))
+        return cls(to_epoch_ms(midnight), to_epoch_ms(now))
+
+    @property
+    def start(self) -> Optional[datetime]:
+        """Start bound as an aware UTC datetime"""
+        if self.start_ms is None:
+            return None
+        return datetime.fromtimestamp(self.start_ms / 1000, tz=pytz.utc)
+
+    @property
+    def end(self) -> Optional[datetime]:
+        """End bound as an aware UTC datetime"""
+        if self.end_ms is None:
+            return None
+        return datetime.fromtimestamp(self.end_ms / 1000, tz=pytz.utc)
+
+    def contains(self, ms) -> bool:
+        if ms is None:
+            return False
+        ms = int(ms)
+        if self.start_ms is not None and ms < self.start_ms:
+            return False
+        if self.end_ms is not None and ms > self.end_ms:
+            return False
+        return True
+
+    def filter(self, orders: Iterable[Dict], field: str = 'createdTime') -> List[Dict]:
+        """Orders whose `field` timestamp falls inside the window; orders without one are dropped, as in contains()"""
+        return [order for order in orders if self.contains(order.get(field))]
+
+    def clover_filters(self, field: str = 'createdTime') -> List[str]:
+        """Clover `filter=` expressions restricting `field` to the window"""
+        filters = []
+        if self.start_ms is not None:
+            filters.append(f"{field}>={self.start_ms}")
+        if self.end_ms is not None:
+            filters.append(f"{field}<={self.end_ms}")
+        return filters
+
+    def __repr__(self):
+        return f"TimeWindow({self.start} -> {self.end})"
@@ -1,4 +1,4 @@
-from marshmallow import Schema, fields, validate, ValidationError
+from marshmallow import Schema, fields, validate, ValidationError, EXCLUDE
 from flask import request, jsonify
 from functools import wraps
 import logging
@@ -21,6 +21,17 @@ class PaginationSchema(Schema):
     page = fields.Int(validate=validate.Range(min=1), load_default=1)
     per_page = fields.Int(validate=validate.Range(min=1, max=100), load_default=20)
 
+class CursorPaginationSchema(Schema):
+    """Schema for keyset (cursor) pagination parameters; other query parameters are ignored."""
+    class Meta:
+        unknown = EXCLUDE
+
+    cursor = fields.Str(validate=validate.Length(max=500))
+    limit = fields.Int(validate=validate.Range(min=1, max=200), load_default=50)
+    start_date = fields.Date()
+    end_date = fields.Date()
+    tenant_id = fields.Str(validate=validate.Length(max=36))
+
 class FileUploadSchema(Schema):
     """Schema for file upload validation."""
     file_type = fields.Str(required=True, validate=validate.OneOf(['sales', 'inventory', 'chef-mapping', 'expenses']))
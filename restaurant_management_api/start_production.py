@@ -98,7 +98,9 @@ def main():
     # Import and create app
     try:
         from src.main import create_app
+        from src.bootstrap import bootstrap_database
         app = create_app('production')
+        bootstrap_database(app)
         
         # Get configuration
         config = app.config
@@ -0,0 +1,53 @@
+import os
+import sys
+import uuid
+
+import pytest
+
+# Make `src` importable however pytest is invoked
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# src.main builds its app at import time
+os.environ.setdefault('FLASK_CONFIG', 'testing')
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    # Flask-Session files and logs are written relative to the working directory
+    os.chdir(tmp_path_factory.mktemp('app'))
+    from src.main import app
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def tenant_user(app):
+    """(tenant_id, user_id) of a new tenant with one tenant-admin user"""
+    from src.models import db
+    from src.models.tenant import Tenant
+    from src.models.user import User
+    suffix = uuid.uuid4().hex[:8]
+    # Requests push their own app context, so nothing here shares their session
+    with app.app_context():
+        tenant = Tenant(name=f'Test {suffix}', business_type='restaurant', contact_email=f'{suffix}@example.com')
+        db.session.add(tenant)
+        db.session.flush()
+        user = User(username=f'user-{suffix}', role='tenant_admin', tenant_id=tenant.id)
+        user.set_password('secret')
+        db.session.add(user)
+        db.session.commit()
+        return tenant.id, user.id
+
+
+@pytest.fixture
+def login(client):
+    """Put a user in the test client's session, as /api/auth/login does"""
+    def login(user_id, tenant_id=None):
+        with client.session_transaction() as session:
+            session['user_id'] = user_id
+            session['tenant_id'] = tenant_id
+        return client
+    return login
@@ -0,0 +1,35 @@
+from flask import Flask
+from flask_migrate import Migrate
+from sqlalchemy import inspect, text
+
+from src.bootstrap import migrate_database
+from src.models import db
+
+
+def make_app(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'release.db'}"
+    db.init_app(app)
+    Migrate(app, db)
+    return app
+
+
+def current_revision(app):
+    with app.app_context():
+        return db.session.execute(text('SELECT version_num FROM alembic_version')).scalar()
+
+
+def test_empty_database_is_created_and_stamped_at_head(app, tmp_path):
+    release_app = make_app(tmp_path)
+
+    migrate_database(release_app)
+
+    with release_app.app_context():
+        tables = set(inspect(db.engine).get_table_names())
+    assert {'user', 'tenants', 'chef', 'sale', 'alembic_version'} <= tables
+    head = current_revision(release_app)
+    assert head is not None
+
+    # A second release finds alembic_version and upgrades, which is a no-op at head
+    migrate_database(release_app)
+    assert current_revision(release_app) == head
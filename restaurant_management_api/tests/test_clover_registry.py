@@ -0,0 +1,52 @@
+from src.services import clover_registry as registry_module
+from src.services.clover_registry import CloverClientRegistry
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+
+def test_invalidate_in_one_worker_drops_clients_in_another(app, monkeypatch):
+    redis_client = FakeRedis()
+    monkeypatch.setattr(registry_module, 'get_redis_client', lambda: redis_client)
+    monkeypatch.setattr(registry_module, 'CLOVER_CLIENTS_VERSION_CHECK_INTERVAL', 0)
+    worker_a, worker_b = CloverClientRegistry(), CloverClientRegistry()
+
+    with app.app_context():
+        client_a = worker_a.get()
+        client_b = worker_b.get()
+        assert worker_b.get() is client_b
+
+        worker_a.invalidate()
+
+        assert worker_a.get() is not client_a
+        assert worker_b.get() is not client_b
+        # The worker that bumped the key keeps the client it rebuilt
+        rebuilt = worker_a.get()
+        assert worker_a.get() is rebuilt
+
+    worker_a.clear()
+    worker_b.clear()
+
+
+def test_idle_clients_are_evicted_and_closed(app, monkeypatch):
+    monkeypatch.setattr(registry_module, 'get_redis_client', lambda: None)
+    registry = CloverClientRegistry(idle_ttl=-1)
+    closed = []
+
+    with app.app_context():
+        first = registry.get()
+        monkeypatch.setattr(first, 'close', lambda: closed.append(first))
+        second = registry.get()
+
+    assert second is not first
+    assert closed == [first]
+    registry.clear()
@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from src.services.clover_stream import iter_json_array, project
+
+ORDERS = [
+    {'id': 'A1', 'total': 1250, 'note': 'naïve crème brûlée ✓',
+     'lineItems': {'elements': [{'id': 'L1', 'name': 'Chai, "masala"'}, {'id': 'L2', 'name': ']}'}]}},
+    {'id': 'B2', 'total': 0, 'lineItems': {'elements': []}},
+    {'id': 'C3', 'total': -5, 'title': None},
+]
+DOCUMENT = json.dumps({'href': 'x', 'elements': ORDERS, 'more': True}, ensure_ascii=False).encode('utf-8')
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_whole_document_in_one_chunk():
+    assert list(iter_json_array([DOCUMENT])) == ORDERS
+
+
+def test_every_two_chunk_split():
+    # Includes splits inside keys, strings, escapes and multi-byte characters
+    for cut in range(1, len(DOCUMENT)):
+        assert list(iter_json_array([DOCUMENT[:cut], DOCUMENT[cut:]])) == ORDERS, cut
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64])
+def test_small_chunks(size):
+    assert list(iter_json_array(chunked(DOCUMENT, size))) == ORDERS
+
+
+def test_elements_are_yielded_before_the_response_ends():
+    chunks = iter(chunked(DOCUMENT, 16))
+    first = next(iter_json_array(chunks))
+    assert first == ORDERS[0]
+    assert next(chunks, None) is not None
+
+
+def test_other_array_keys_and_empty_arrays():
+    assert list(iter_json_array([b'{"items": [{"id": 1}]}'], keys=('items',))) == [{'id': 1}]
+    assert list(iter_json_array([b'{"elements": []}'])) == []
+    assert list(iter_json_array([b'{"href": "x"}'])) == []
+
+
+def test_truncated_array_raises():
+    with pytest.raises(ValueError):
+        list(iter_json_array(chunked(DOCUMENT[:len(DOCUMENT) // 2], 10)))
+
+
+def test_project_keeps_only_listed_fields():
+    fields = {'id': None, 'lineItems': {'elements': {'name': None}}}
+    assert project(ORDERS[0], fields) == {'id': 'A1', 'lineItems': {'elements': [
+        {'name': 'Chai, "masala"'}, {'name': ']}'}]}}
+    assert project(ORDERS[2], fields) == {'id': 'C3'}
@@ -0,0 +1,88 @@
+import uuid
+
+from src.models import db
+from src.models.chef import Chef
+from src.models.chef_dish_mapping import ChefDishMapping
+from src.models.item import Item
+from src.models.sale import Sale
+from src.services.clover_service import CloverConfig, CloverService
+
+
+class StubClover(CloverService):
+    """CloverService answering from fixed data instead of the Clover API"""
+
+    def __init__(self, inventory=(), orders=()):
+        super().__init__(CloverConfig(merchant_id='M', access_token='T'))
+        self.inventory = list(inventory)
+        self.orders = list(orders)
+
+    def get_inventory_levels(self):
+        return self.inventory
+
+    def iter_orders(self, start_date=None, end_date=None, fields=None):
+        return iter(self.orders)
+
+    def get_order_details(self, order_id):
+        return next(order for order in self.orders if order['id'] == order_id)
+
+
+def clover_id():
+    return uuid.uuid4().hex[:13].upper()
+
+
+def stock(item_id, quantity):
+    return {'item_id': item_id, 'name': f'Item {item_id}', 'current_stock': quantity,
+            'reorder_point': 2, 'category': 'Entrees'}
+
+
+def test_inventory_sync_updates_own_and_skips_other_tenants_items(app, tenant_user):
+    tenant_id, _ = tenant_user
+    own, foreign, new = clover_id(), clover_id(), clover_id()
+    with app.app_context():
+        db.session.add_all([Item(clover_id=own, name='Own', tenant_id=tenant_id),
+                            Item(clover_id=foreign, name='Foreign', tenant_id=None)])
+        db.session.commit()
+        result = StubClover([stock(own, 7), stock(foreign, 9), stock(new, 3)]).sync_inventory_data(tenant_id)
+        assert (result['updated_count'], result['created_count'], result['skipped_count'],
+                result['error_count']) == (1, 1, 1, 0)
+        assert Item.query.filter_by(clover_id=own).one().quantity == 7
+        assert Item.query.filter_by(clover_id=foreign).one().quantity == 0
+        assert Item.query.filter_by(clover_id=new).one().tenant_id == tenant_id
+
+
+def test_inventory_sync_without_tenant_matches_every_item(app, tenant_user):
+    tenant_id, _ = tenant_user
+    owned = clover_id()
+    with app.app_context():
+        db.session.add(Item(clover_id=owned, name='Owned', tenant_id=tenant_id))
+        db.session.commit()
+        result = StubClover([stock(owned, 4)]).sync_inventory_data()
+        assert (result['updated_count'], result['created_count']) == (1, 0)
+        assert Item.query.filter_by(clover_id=owned).one().quantity == 4
+
+
+def test_sales_sync_counts_only_committed_sales(app, tenant_user):
+    tenant_id, _ = tenant_user
+    item_clover_id, taken = clover_id(), clover_id()
+    with app.app_context():
+        item = Item(clover_id=item_clover_id, name='Dal', tenant_id=tenant_id)
+        chef = Chef(clover_id=clover_id(), name='Chef', tenant_id=tenant_id)
+        db.session.add_all([item, chef])
+        db.session.flush()
+        db.session.add(ChefDishMapping(chef_id=chef.id, item_id=item.id, tenant_id=tenant_id))
+        # A line item already stored for another tenant
+        db.session.add(Sale(clover_id=taken, item_id=item.id, line_item_date=item.created_at, quantity=1,
+                            item_revenue=1, total_revenue=1, item_total_with_tax=1, tenant_id=None))
+        db.session.commit()
+        item_id = item.id
+
+        def line(line_id):
+            return {'id': line_id, 'item': {'id': item_clover_id, 'name': 'Dal'}, 'quantity': 1,
+                    'price': 1200, 'total': 1200}
+        orders = [{'id': 'O1', 'createdTime': 1700000000000, 'state': 'locked',
+                   'line_items': [line(clover_id()), line(taken)]}]
+        result = StubClover(orders=orders).sync_sales_data(tenant_id=tenant_id)
+        assert result['synced_count'] == 1
+        assert result['skipped_reasons'] == {'other_tenant': 1}
+        synced = Sale.query.filter_by(tenant_id=tenant_id).one()
+        assert synced.item_id == item_id
@@ -0,0 +1,61 @@
+import pytest
+
+from src.services import dashboard_stream
+from src.services.dashboard_stream import streaming_supported
+
+GUNICORN = 'gunicorn/21.2.0'
+
+
+@pytest.mark.parametrize('environ, supported', [
+    ({'SERVER_SOFTWARE': GUNICORN, 'wsgi.multithread': False}, False),
+    ({'SERVER_SOFTWARE': GUNICORN, 'wsgi.multithread': True}, True),
+    ({'SERVER_SOFTWARE': 'Werkzeug/2.3.7', 'wsgi.multithread': True}, True),
+])
+def test_streaming_needs_a_threaded_or_async_worker(environ, supported):
+    assert streaming_supported(environ) is supported
+
+
+def test_streaming_can_be_switched_off(monkeypatch):
+    monkeypatch.setattr(dashboard_stream, 'DASHBOARD_STREAM_ENABLED', False)
+    assert not streaming_supported({'SERVER_SOFTWARE': GUNICORN, 'wsgi.multithread': True})
+
+
+def test_stream_refuses_sync_workers_so_the_dashboard_polls(tenant_user, login):
+    tenant_id, user_id = tenant_user
+    client = login(user_id, tenant_id)
+    response = client.get('/api/dashboard/stream',
+                          environ_overrides={'SERVER_SOFTWARE': GUNICORN, 'wsgi.multithread': False})
+    assert response.status_code == 503
+    assert response.get_json()['fallback'] == 'poll'
+
+
+def test_stream_slots_are_capped_per_worker(monkeypatch):
+    monkeypatch.setattr(dashboard_stream, 'DASHBOARD_STREAM_MAX_PER_WORKER', 1)
+    stream = dashboard_stream.DashboardStream()
+    assert stream.claim()
+    assert not stream.claim()
+    stream.release()
+    assert stream.claim()
+
+
+def test_stream_past_the_worker_cap_falls_back_to_polling(tenant_user, login, monkeypatch):
+    monkeypatch.setattr(dashboard_stream, 'DASHBOARD_STREAM_MAX_PER_WORKER', 0)
+    tenant_id, user_id = tenant_user
+    client = login(user_id, tenant_id)
+    response = client.get('/api/dashboard/stream',
+                          environ_overrides={'SERVER_SOFTWARE': GUNICORN, 'wsgi.multithread': True})
+    assert response.status_code == 503
+    assert response.get_json()['fallback'] == 'poll'
+
+
+def test_closing_a_stream_frees_its_slot(tenant_user, login, monkeypatch):
+    monkeypatch.setattr(dashboard_stream, 'DASHBOARD_STREAM_MAX_PER_WORKER', 1)
+    tenant_id, user_id = tenant_user
+    client = login(user_id, tenant_id)
+    environ = {'SERVER_SOFTWARE': GUNICORN, 'wsgi.multithread': True}
+    response = client.get('/api/dashboard/stream', environ_overrides=environ, buffered=False)
+    assert response.status_code == 200
+    # Closed before the first event was sent
+    response.close()
+    assert dashboard_stream.dashboard_stream.claim()
+    dashboard_stream.dashboard_stream.release()
@@ -0,0 +1,126 @@
+import uuid
+from datetime import datetime
+
+import pytest
+
+from src.models import db
+from src.models.category import Category
+from src.models.chef import Chef
+from src.models.chef_dish_mapping import ChefDishMapping
+from src.models.data_source_config import DataSourceConfig
+from src.models.expense import Expense
+from src.models.file_upload import FileUpload
+from src.models.item import Item
+from src.models.sale import Sale
+from src.models.uncategorized_item import UncategorizedItem
+from src.services.data_version import TRACKED_MODELS, data_versions
+
+
+def unique():
+    return uuid.uuid4().hex[:12]
+
+
+def make_item(tenant_id):
+    return Item(clover_id=unique(), name=f'Item {unique()}', tenant_id=tenant_id)
+
+
+def make_chef(tenant_id):
+    return Chef(clover_id=unique(), name='Chef', tenant_id=tenant_id)
+
+
+def make_sale(tenant_id):
+    item = make_item(tenant_id)
+    db.session.add(item)
+    db.session.flush()
+    return Sale(clover_id=unique(), item_id=item.id, line_item_date=datetime(2024, 1, 1), quantity=1,
+                item_revenue=10, total_revenue=10, item_total_with_tax=10.8, tenant_id=tenant_id)
+
+
+def make_mapping(tenant_id):
+    chef = make_chef(tenant_id)
+    db.session.add(chef)
+    db.session.flush()
+    return ChefDishMapping(chef_id=chef.id, item_name='Item', tenant_id=tenant_id)
+
+
+FACTORIES = {
+    Sale: make_sale,
+    Item: make_item,
+    Expense: lambda tenant_id: Expense(amount=5, date=datetime(2024, 1, 1), tenant_id=tenant_id),
+    Chef: make_chef,
+    ChefDishMapping: make_mapping,
+    Category: lambda tenant_id: Category(name=f'Category {unique()}'),
+    UncategorizedItem: lambda tenant_id: UncategorizedItem(item_name=f'Item {unique()}'),
+    FileUpload: lambda tenant_id: FileUpload(filename='sales.csv', file_type='sales', tenant_id=tenant_id),
+    DataSourceConfig: lambda tenant_id: DataSourceConfig(tenant_id=tenant_id, data_type='sales',
+                                                         source='local', updated_by='test'),
+}
+
+
+def test_every_tracked_model_has_a_factory():
+    assert set(FACTORIES) == set(TRACKED_MODELS)
+
+
+@pytest.mark.parametrize('model', TRACKED_MODELS, ids=lambda model: model.__name__)
+def test_committing_a_tracked_model_bumps_the_version(app, tenant_user, model):
+    tenant_id, _ = tenant_user
+    with app.app_context():
+        before = data_versions.get(tenant_id)
+        obj = FACTORIES[model](tenant_id)
+        db.session.add(obj)
+        db.session.commit()
+        created = data_versions.get(tenant_id)
+        assert created != before
+
+        db.session.delete(obj)
+        db.session.commit()
+        assert data_versions.get(tenant_id) != created
+
+
+def test_tenant_scoped_writes_leave_other_tenants_alone(app, tenant_user):
+    tenant_id, _ = tenant_user
+    other = str(uuid.uuid4())
+    with app.app_context():
+        before = data_versions.get(other)
+        db.session.add(make_item(tenant_id))
+        db.session.commit()
+        assert data_versions.get(other) == before
+
+
+def test_conditional_get_reads_the_primary_right_after_a_bump(app, monkeypatch):
+    from flask import g
+    from src.models.routing import _replica_requested, read_replica
+    from src.services import data_version
+    from src.services.data_version import conditional_get
+    from src.services.identity_cache import Identity
+
+    monkeypatch.setattr(data_version, 'get_redis_client', lambda: None)
+    monkeypatch.setattr(data_version, 'ETAG_MAX_AGE', 0)
+    tenant_id = unique()
+    routed = []
+
+    @conditional_get
+    @read_replica
+    def view():
+        routed.append('replica' if _replica_requested() else 'primary')
+        return {'ok': True}
+
+    def request_view():
+        with app.test_request_context('/api/dashboard/sales-summary'):
+            g.user = Identity(id=1, username='u', role='admin', is_admin=True, tenant_id=tenant_id)
+            return view()
+
+    data_versions.bump({tenant_id})
+    etag = request_view().get_etag()[0]
+    assert routed == ['primary']
+
+    # Once the window has passed, the same version is served from the replica
+    monkeypatch.setattr(data_version, 'REPLICA_LAG_WINDOW', 0)
+    assert request_view().get_etag()[0] == etag
+    assert routed == ['primary', 'replica']
+
+    # A new version sends the next read back to the primary
+    monkeypatch.setattr(data_version, 'REPLICA_LAG_WINDOW', 60)
+    data_versions.bump({tenant_id})
+    assert request_view().get_etag()[0] != etag
+    assert routed == ['primary', 'replica', 'primary']
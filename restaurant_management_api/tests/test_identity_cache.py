@@ -0,0 +1,36 @@
+from src.models import db
+from src.models.tenant import Tenant
+from src.models.user import User
+from src.services.identity_cache import identity_cache
+
+
+def test_committed_user_change_drops_the_cached_identity(app, tenant_user):
+    _, user_id = tenant_user
+    with app.app_context():
+        assert identity_cache.get(user_id).role == 'tenant_admin'
+        db.session.get(User, user_id).role = 'user'
+        db.session.flush()
+        # Still cached until the change is committed
+        assert user_id in identity_cache._entries
+        db.session.commit()
+        assert user_id not in identity_cache._entries
+        assert identity_cache.get(user_id).role == 'user'
+
+
+def test_rolled_back_change_keeps_the_cached_identity(app, tenant_user):
+    _, user_id = tenant_user
+    with app.app_context():
+        identity_cache.get(user_id)
+        db.session.get(User, user_id).role = 'user'
+        db.session.flush()
+        db.session.rollback()
+        assert identity_cache.get(user_id).role == 'tenant_admin'
+
+
+def test_committed_tenant_change_drops_its_users(app, tenant_user):
+    tenant_id, user_id = tenant_user
+    with app.app_context():
+        assert identity_cache.get(user_id).subscription_plan == 'free'
+        db.session.get(Tenant, tenant_id).subscription_plan = 'premium'
+        db.session.commit()
+        assert identity_cache.get(user_id).subscription_plan == 'premium'
@@ -0,0 +1,25 @@
+import pytest
+
+from src.models.user import User
+
+
+@pytest.fixture
+def super_admin(app, login):
+    with app.app_context():
+        admin = User.query.filter_by(username=app.config['ADMIN_USERNAME']).one()
+        client = login(admin.id)
+    yield client
+    client.delete('/api/admin/profiling')
+
+
+def test_arm_profiling_for_a_tenant(super_admin, tenant_user):
+    tenant_id, _ = tenant_user
+    response = super_admin.post('/api/admin/profiling', json={'tenant_id': tenant_id, 'count': 2})
+    assert response.status_code == 201
+    assert response.get_json()['session']['tenant_id'] == tenant_id
+
+
+def test_arm_profiling_rejects_unknown_tenants(super_admin):
+    response = super_admin.post('/api/admin/profiling', json={'tenant_id': 'no-such-tenant'})
+    assert response.status_code == 404
+    assert super_admin.get('/api/admin/profiling').get_json()['armed'] is None
@@ -0,0 +1,23 @@
+from src.services.identity_cache import identity_cache
+from src.utils.query_stats import assert_max_queries, count_queries
+
+
+def test_tenant_stats_runs_a_bounded_number_of_queries(tenant_user, login):
+    tenant_id, user_id = tenant_user
+    client = login(user_id, tenant_id)
+    # identity, tenant, its users
+    with assert_max_queries(3):
+        response = client.get(f'/api/tenant/tenants/{tenant_id}/stats')
+    assert response.status_code == 200
+    assert response.get_json()['data']['usage']['current_users'] == 1
+
+
+def test_request_stats_include_the_identity_lookup(tenant_user, login):
+    tenant_id, user_id = tenant_user
+    client = login(user_id, tenant_id)
+    identity_cache.invalidate(user_id=user_id)
+    with count_queries() as captured:
+        response = client.get(f'/api/tenant/tenants/{tenant_id}')
+    assert response.status_code == 200
+    assert any('user.username' in statement for statement in captured.statements)
+    assert int(response.headers['X-DB-Query-Count']) == captured.count
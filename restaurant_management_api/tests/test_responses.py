@@ -0,0 +1,115 @@
+import gzip
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from flask import Flask, Response, jsonify, request
+
+from src.utils import responses
+from src.utils.responses import MSGPACK_MIMETYPE, init_responses
+
+MIN_SIZE = 100
+
+
+def make_app(**config):
+    app = Flask(__name__)
+    app.config.update({'COMPRESS_MIN_SIZE': MIN_SIZE, **config})
+    init_responses(app)
+
+    @app.route('/json')
+    def payload():
+        return jsonify({'b': 2, 'a': 1, 'when': datetime(2024, 1, 2, 3, 4, 5), 'day': date(2024, 1, 2),
+                        'amount': Decimal('12.50')})
+
+    @app.route('/text')
+    def text():
+        response = Response('x' * int(request.args['size']), mimetype='text/plain')
+        response.set_etag('abc')
+        return response
+
+    return app
+
+
+@pytest.fixture
+def client():
+    return make_app().test_client()
+
+
+def test_json_matches_flasks_default_encoding(client):
+    body = client.get('/json').get_data(as_text=True)
+    assert list(json.loads(body)) == ['a', 'amount', 'b', 'day', 'when']
+    assert json.loads(body) == {
+        'a': 1, 'b': 2, 'amount': '12.50',
+        'when': 'Tue, 02 Jan 2024 03:04:05 GMT', 'day': 'Tue, 02 Jan 2024 00:00:00 GMT'
+    }
+
+
+def test_json_is_the_same_without_orjson(client, monkeypatch):
+    fast = client.get('/json').get_json()
+    monkeypatch.setattr(responses, 'orjson', None)
+    assert client.get('/json').get_json() == fast
+
+
+def test_values_orjson_rejects_fall_back_to_the_stdlib_encoder():
+    app = make_app()
+    assert json.loads(app.json.dumps({'n': 2 ** 70})) == {'n': 2 ** 70}
+    # Keyword arguments are only understood by the stdlib encoder
+    assert app.json.dumps({'b': 1, 'a': 2}, indent=2) == '{\n  "a": 2,\n  "b": 1\n}'
+
+
+def test_msgpack_is_served_to_clients_that_prefer_it(client):
+    msgpack = pytest.importorskip('msgpack')
+    response = client.get('/json', headers={'Accept': MSGPACK_MIMETYPE})
+    assert response.mimetype == MSGPACK_MIMETYPE
+    assert 'Accept' in response.vary
+    assert msgpack.unpackb(response.get_data())['amount'] == '12.50'
+    assert client.get('/json', headers={'Accept': f'application/json, {MSGPACK_MIMETYPE};q=0.5'}).is_json
+
+
+def test_msgpack_requests_get_json_without_msgpack(client, monkeypatch):
+    monkeypatch.setattr(responses, 'msgpack', None)
+    response = client.get('/json', headers={'Accept': MSGPACK_MIMETYPE})
+    assert response.is_json
+    assert 'Accept' not in response.vary
+
+
+def test_msgpack_can_be_switched_off(monkeypatch):
+    monkeypatch.setattr(responses, 'msgpack', object())
+    client = make_app(RESPONSE_MSGPACK_ENABLED=False).test_client()
+    assert client.get('/json', headers={'Accept': MSGPACK_MIMETYPE}).is_json
+
+
+def test_bodies_from_the_size_threshold_are_gzipped(client):
+    small = client.get(f'/text?size={MIN_SIZE - 1}', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+    assert 'Accept-Encoding' in small.vary
+    assert small.headers['ETag'] == '"abc"'
+
+    large = client.get(f'/text?size={MIN_SIZE}', headers={'Accept-Encoding': 'gzip'})
+    assert large.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(large.get_data()) == b'x' * MIN_SIZE
+    # The compressed body is another representation, so its validator turns weak
+    assert large.headers['ETag'] == 'W/"abc"'
+
+    assert 'Content-Encoding' not in client.get(f'/text?size={MIN_SIZE}').headers
+
+
+def test_brotli_is_preferred_when_installed(client):
+    brotli = pytest.importorskip('brotli')
+    response = client.get(f'/text?size={MIN_SIZE}', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(response.get_data()) == b'x' * MIN_SIZE
+
+
+def test_br_only_clients_get_identity_without_brotli(client, monkeypatch):
+    monkeypatch.setattr(responses, 'brotli', None)
+    assert 'Content-Encoding' not in client.get(f'/text?size={MIN_SIZE}', headers={'Accept-Encoding': 'br'}).headers
+    response = client.get(f'/text?size={MIN_SIZE}', headers={'Accept-Encoding': 'br, gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+
+
+def test_compression_can_be_switched_off():
+    client = make_app(COMPRESS_MIN_SIZE=0).test_client()
+    response = client.get(f'/text?size={MIN_SIZE * 10}', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
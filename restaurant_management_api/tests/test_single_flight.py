@@ -0,0 +1,93 @@
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from src.services import single_flight
+from src.services.single_flight import SingleFlight, build_key
+
+
+@pytest.fixture(autouse=True)
+def no_redis(monkeypatch):
+    monkeypatch.setattr(single_flight, 'get_redis_client', lambda: None)
+
+
+def test_concurrent_identical_calls_share_one_computation():
+    group = SingleFlight()
+    entered, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        entered.set()
+        release.wait(5)
+        return {'revenue': 100, 'items': [1, 2]}
+
+    results = []
+
+    def caller():
+        results.append(group.do('key', compute))
+
+    leader = threading.Thread(target=caller)
+    leader.start()
+    assert entered.wait(5)
+    followers = [threading.Thread(target=caller) for _ in range(5)]
+    for thread in followers:
+        thread.start()
+    # Let the followers reach the in-flight call before the leader finishes
+    time.sleep(0.2)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == [{'revenue': 100, 'items': [1, 2]}] * 6
+    # Every caller got its own copy
+    assert len({id(result) for result in results}) == 6
+    assert len({id(result['items']) for result in results}) == 6
+
+
+def test_followers_see_the_leaders_error():
+    group = SingleFlight()
+    entered, release = threading.Event(), threading.Event()
+    errors = []
+
+    def compute():
+        entered.set()
+        release.wait(5)
+        raise RuntimeError('upstream down')
+
+    def caller():
+        try:
+            group.do('key', compute)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=caller)]
+    threads[0].start()
+    assert entered.wait(5)
+    threads += [threading.Thread(target=caller) for _ in range(3)]
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert errors == ['upstream down'] * 4
+
+
+def test_sequential_calls_are_not_cached():
+    group = SingleFlight()
+    calls = []
+    group.do('key', lambda: calls.append(1))
+    group.do('key', lambda: calls.append(1))
+    assert len(calls) == 2
+
+
+def test_equivalent_arguments_build_the_same_key():
+    day = datetime(2024, 1, 1)
+    assert build_key('overview', (day, ' Entrees '), {'b': 1, 'a': 2}) == \
+        build_key('overview', (day.isoformat(), 'Entrees'), {'a': 2, 'b': 1})
+    assert build_key('overview', ('Entrees',)) != build_key('overview', ('Breads',))
+    assert build_key('overview', ('Entrees',)) != build_key('sales', ('Entrees',))
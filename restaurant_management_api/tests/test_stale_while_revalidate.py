@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+from src.services import cache_service
+from src.services.cache_service import StaleWhileRevalidateCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_service.time, 'monotonic', clock)
+    return clock
+
+
+class Loader:
+    def __init__(self):
+        self.calls = 0
+        self.refreshed = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.refreshed.set()
+        return {'version': self.calls}
+
+
+def test_fresh_entries_are_served_without_reloading(clock):
+    cache, loader = StaleWhileRevalidateCache('test', ttl=10, max_staleness=60), Loader()
+    assert cache.get('k', loader) == {'version': 1}
+    clock.now += 9
+    assert cache.get('k', loader) == {'version': 1}
+    assert loader.calls == 1
+
+
+def test_stale_entry_is_served_while_one_background_refresh_runs(clock):
+    cache, loader = StaleWhileRevalidateCache('test', ttl=10, max_staleness=60), Loader()
+    cache.get('k', loader)
+    loader.refreshed.clear()
+    clock.now += 30
+    assert cache.get('k', loader) == {'version': 1}
+    assert loader.refreshed.wait(5)
+    # The loader returned; wait for the refresh to store its value
+    deadline = time.perf_counter() + 5
+    while cache._entries['k']['refreshing'] and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    assert cache.get('k', loader) == {'version': 2}
+    assert loader.calls == 2
+
+
+def test_entry_past_max_staleness_is_reloaded_synchronously(clock):
+    cache, loader = StaleWhileRevalidateCache('test', ttl=10, max_staleness=60), Loader()
+    cache.get('k', loader)
+    clock.now += 60
+    assert cache.get('k', loader) == {'version': 2}
+
+
+def test_max_staleness_is_never_below_ttl():
+    assert StaleWhileRevalidateCache('test', ttl=30, max_staleness=5).max_staleness == 30
+
+
+def test_invalidate_forces_a_reload(clock):
+    cache, loader = StaleWhileRevalidateCache('test', ttl=10, max_staleness=60), Loader()
+    cache.get('k', loader)
+    cache.invalidate('k')
+    assert cache.get('k', loader) == {'version': 2}
+
+
+def test_load_overlapping_an_invalidation_is_not_cached(clock):
+    cache = StaleWhileRevalidateCache('test', ttl=10, max_staleness=60)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        if len(calls) == 1:
+            # Data changed while the first load was reading it
+            cache.invalidate()
+        return {'version': len(calls)}
+
+    assert cache.get('k', loader) == {'version': 1}
+    assert cache.get('k', loader) == {'version': 2}
+
+
+def test_refresh_overlapping_an_invalidation_is_dropped(clock):
+    cache, loader = StaleWhileRevalidateCache('test', ttl=10, max_staleness=60), Loader()
+    cache.get('k', loader)
+
+    def invalidating_loader():
+        cache.invalidate()
+        return {'version': 'stale'}
+
+    cache._entries['k']['loader'] = invalidating_loader
+    cache._refresh('k')
+    assert 'k' not in cache._entries
+    assert cache.get('k', loader) == {'version': 2}
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pytz
+
+from src.utils.time_window import BUSINESS_TZ, TimeWindow, to_epoch_ms
+
+
+def local_ms(*args):
+    return to_epoch_ms(BUSINESS_TZ.localize(datetime(*args)))
+
+
+def test_for_days_covers_whole_business_days():
+    window = TimeWindow.for_days(datetime(2024, 3, 5, 15, 30, tzinfo=pytz.utc),
+                                 datetime(2024, 3, 7, 2, 0, tzinfo=pytz.utc))
+    # 2024-03-07 02:00 UTC is still the evening of the 6th in Chicago
+    assert window.start_ms == local_ms(2024, 3, 5)
+    assert window.end_ms == local_ms(2024, 3, 6, 23, 59, 59, 999000)
+
+
+def test_for_days_uses_each_boundary_offset_across_dst():
+    # DST starts on 2024-03-10: midnight is CST (-6), the end of the day CDT (-5)
+    day = datetime(2024, 3, 10, 12, tzinfo=pytz.utc)
+    window = TimeWindow.for_days(day, day)
+    assert window.start == datetime(2024, 3, 10, 6, tzinfo=pytz.utc)
+    assert window.end == datetime(2024, 3, 11, 4, 59, 59, 999000, tzinfo=pytz.utc)
+
+
+def test_for_days_defaults_to_last_thirty_days():
+    window = TimeWindow.for_days()
+    assert window.end_ms - window.start_ms == 30 * 24 * 3600 * 1000
+
+
+def test_contains_is_inclusive_and_open_ended():
+    window = TimeWindow(100, 200)
+    assert window.contains(100) and window.contains('200')
+    assert not window.contains(99) and not window.contains(201)
+    assert not window.contains(None)
+    assert TimeWindow(start_ms=100).contains(10 ** 15)
+    assert TimeWindow(end_ms=200).contains(0)
+
+
+def test_filter_keeps_orders_inside_the_window():
+    orders = [{'id': 'a', 'createdTime': 99}, {'id': 'b', 'createdTime': 100},
+              {'id': 'c', 'createdTime': 200}, {'id': 'd', 'createdTime': 201},
+              {'id': 'e'}, {'id': 'f', 'modifiedTime': 150}]
+    assert [o['id'] for o in TimeWindow(100, 200).filter(orders)] == ['b', 'c']
+    assert [o['id'] for o in TimeWindow(100, 200).filter(orders, field='modifiedTime')] == ['f']
+    # Orders without the timestamp are dropped even when the window is open-ended
+    assert [o['id'] for o in TimeWindow(end_ms=200).filter(orders)] == ['a', 'b', 'c']
+    assert [o['id'] for o in TimeWindow().filter(orders + [{'id': 'g', 'createdTime': None}])] == ['a', 'b', 'c', 'd']
+
+
+def test_clover_filters_match_the_bounds():
+    assert TimeWindow(100, 200).clover_filters() == ['createdTime>=100', 'createdTime<=200']
+    assert TimeWindow(start_ms=100).clover_filters('modifiedTime') == ['modifiedTime>=100']
+    assert TimeWindow().clover_filters() == []
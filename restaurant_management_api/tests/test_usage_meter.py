@@ -0,0 +1,95 @@
+import pytest
+
+from src.models import db
+from src.models.tenant import Tenant, PLAN_LIMITS
+from src.services import usage_meter as usage_meter_module
+from src.services.usage_meter import UsageMeter, current_period, usage_meter
+
+
+@pytest.fixture
+def meter(app):
+    meter = UsageMeter()
+    meter.configure(app, flush_interval=0)
+    return meter
+
+
+def set_counter(app, tenant_id, calls, period):
+    with app.app_context():
+        tenant = db.session.get(Tenant, tenant_id)
+        tenant.api_calls_this_month, tenant.api_calls_period = calls, period
+        db.session.commit()
+
+
+def stored_counter(app, tenant_id):
+    with app.app_context():
+        tenant = db.session.get(Tenant, tenant_id)
+        return tenant.api_calls_this_month, tenant.api_calls_period
+
+
+def test_flush_adds_pending_calls_to_the_tenant_row(app, meter, tenant_user):
+    tenant_id, _ = tenant_user
+    set_counter(app, tenant_id, 5, current_period())
+    meter.record(tenant_id, 3)
+    assert meter.usage(tenant_id) == 3
+
+    assert meter.flush() == 3
+    assert stored_counter(app, tenant_id) == (8, current_period())
+    # The total read back after the flush replaces the unflushed count
+    assert meter.usage(tenant_id) == 8
+    assert meter.flush() == 0
+
+
+def test_flush_restarts_the_counter_when_the_month_rolls_over(app, meter, tenant_user):
+    tenant_id, _ = tenant_user
+    set_counter(app, tenant_id, 900, '2000-01')
+    meter.record(tenant_id, 2)
+    meter.flush()
+    assert stored_counter(app, tenant_id) == (2, current_period())
+    assert meter.usage(tenant_id) == 2
+
+
+def test_failed_flush_puts_the_calls_back(app, meter, tenant_user, monkeypatch):
+    tenant_id, _ = tenant_user
+    set_counter(app, tenant_id, 5, current_period())
+    meter.record(tenant_id, 3)
+
+    def broken_select(*args, **kwargs):
+        raise RuntimeError('database went away')
+
+    monkeypatch.setattr(usage_meter_module, 'select', broken_select)
+    assert meter.flush() == 0
+    # The UPDATE ran in the same transaction and was rolled back
+    assert stored_counter(app, tenant_id) == (5, current_period())
+    assert meter.usage(tenant_id) == 3
+
+    monkeypatch.undo()
+    assert meter.flush() == 3
+    assert stored_counter(app, tenant_id) == (8, current_period())
+
+
+def test_seed_never_overwrites_a_flushed_total(meter):
+    meter.seed('t1', 40, current_period())
+    assert meter.usage('t1') == 40
+    meter.seed('t1', 10, current_period())
+    assert meter.usage('t1') == 40
+    meter.seed('t2', 40, '2000-01')
+    assert meter.usage('t2') == 0
+
+
+def test_tenant_over_quota_gets_429_before_any_flush(app, tenant_user, login, monkeypatch):
+    tenant_id, user_id = tenant_user
+    limit = PLAN_LIMITS['free']['max_api_calls_per_month']
+    # Used up in other workers; this worker has never flushed for the tenant
+    set_counter(app, tenant_id, limit, current_period())
+    monkeypatch.setitem(app.config, 'API_QUOTA_ENFORCED', True)
+    client = login(user_id, tenant_id)
+
+    response = client.get('/api/dashboard/overview')
+    assert response.status_code == 429
+    body = response.get_json()
+    assert body['subscription_plan'] == 'free'
+    assert body['max_api_calls_per_month'] == limit
+    assert usage_meter.usage(tenant_id) == limit
+
+    # The usage stats stay reachable over quota
+    assert client.get(f'/api/tenant/tenants/{tenant_id}/stats').status_code != 429